@@ -0,0 +1 @@
+# API middleware package
@@ -0,0 +1,125 @@
+"""
+Admission control in front of the routes (see api/services/admission.py).
+Each request is put in a lane by what it will cost, judged from the path
+alone: telemetry and car data go to the telemetry lane, season
+aggregations and historical data to the season lane, requests for a session
+that is not in the session cache to the session lane, the rest to the light
+lane. Requests refused by their lane get 503 with Retry-After.
+Installed inside the response cache, so cached responses are never queued.
+"""
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+
+from api.middleware.http_cache import API_PREFIX
+from api.services.admission import admission_controller
+from api.services.session_cache import session_cache
+
+TELEMETRY_RESOURCES = {"telemetry", "car-data"}
+# Session type as the fourth path segment: /{resource}/{year}/{event}/{session_type}/...
+SESSION_IN_PATH = {"gaps", "pit-stops", "positions", "race-control", "sectors", "sessions", "track-status", "tyres", "weather"}
+# Session type as ?session_type=, defaulting to the race
+SESSION_IN_QUERY = {"laps"}
+# Fixed session per route
+RESULTS_SESSIONS = {"qualifying": "Q", "sprint": "S", "sprint-qualifying": "SQ"}
+RACE_RESOURCES = {"grid", "circuits"}
+# Cheap routes under /historical; everything else there may aggregate or call Ergast
+HISTORICAL_LIGHT = {"status"}
+# Routes that queue nowhere: a batch's sub-requests are admitted one by one
+_EXEMPT = {"batch"}
+
+
+def _session_of(segments, query_string: bytes) -> Optional[tuple]:
+    """(year, event, session type) a session route will load, None for other routes."""
+    resource = segments[0]
+    if len(segments) < 3 or not segments[1].isdigit():
+        return None
+    year, event = int(segments[1]), segments[2]
+    if resource in SESSION_IN_PATH:
+        return (year, event, segments[3]) if len(segments) > 3 else None
+    if resource in SESSION_IN_QUERY:
+        session_type = parse_qs(query_string.decode("latin-1")).get("session_type", ["R"])[0]
+        return year, event, session_type
+    if resource == "results":
+        session_type = RESULTS_SESSIONS.get(segments[3], "R") if len(segments) > 3 else "R"
+        return year, event, session_type
+    if resource in RACE_RESOURCES or (resource in ("drivers", "teams") and len(segments) == 3):
+        return year, event, "R"
+    return None
+
+
+def _season_aggregation(segments) -> bool:
+    """Routes that read every round of a season, or the historical database and Ergast."""
+    resource = segments[0]
+    if resource == "historical":
+        return len(segments) > 1 and segments[1] not in HISTORICAL_LIGHT
+    if len(segments) < 2 or not segments[1].isdigit():
+        return False
+    if len(segments) == 2:
+        # Season driver and team lists are built from every race and sprint of the season
+        return resource in ("drivers", "teams")
+    if len(segments) < 4:
+        return False
+    if resource == "standings":
+        return segments[3] == "progression"
+    if resource == "drivers":
+        return segments[2] == "head-to-head"
+    if resource == "teams":
+        return segments[3] == "results"
+    return False
+
+
+def lane_of(path: str, query_string: bytes) -> Optional[str]:
+    """Admission lane of a request; None for requests that are not admission controlled."""
+    if not path.startswith(API_PREFIX + "/"):
+        return None
+    segments = path[len(API_PREFIX) + 1:].split("/")
+    if segments[0] in _EXEMPT:
+        return None
+    if segments[0] in TELEMETRY_RESOURCES:
+        return "telemetry"
+    if _season_aggregation(segments):
+        return "season"
+    session = _session_of(segments, query_string)
+    if session is not None and not session_cache.is_loaded(*session):
+        return "session"
+    return "light"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller=admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        lane = lane_of(scope["path"], scope["query_string"])
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(lane):
+            retry_after = self.controller.retry_after(lane)
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error": {
+                        "code": "SERVER_BUSY",
+                        "message": f"Too many {lane} requests in progress, retry in {retry_after}s",
+                        "details": {"lane": lane, "retry_after": retry_after}
+                    }
+                },
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane, time.monotonic() - started)
@@ -0,0 +1,63 @@
+"""
+Binds a CancelToken (see api/services/cancellation.py) to every HTTP request
+and cancels it when the client disconnects before the response is complete.
+The request's messages are read by a watcher task and relayed to the app, so
+the watcher sees the disconnect while the app is still busy in the thread
+pool. Requests stopped at a checkpoint end without a response; the client is
+gone. Installed innermost, so an abandoned request keeps its admission slot
+until its work has actually stopped.
+"""
+import asyncio
+
+from api.services.cancellation import CancelToken, RequestCancelled, bound, cancellation, current_token
+
+_DISCONNECT = {"type": "http.disconnect"}
+
+
+class CancellationMiddleware:
+    def __init__(self, app, tracker=cancellation):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracker.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        token = CancelToken(parent=current_token())
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    if not response_complete:
+                        token.cancel()
+                        self.tracker.record_disconnect()
+                messages.put_nowait(message)
+                if disconnected:
+                    return
+
+        async def relay():
+            if disconnected and messages.empty():
+                return _DISCONNECT
+            return await messages.get()
+
+        async def tracked_send(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        watcher = asyncio.create_task(watch())
+        try:
+            with bound(token):
+                await self.app(scope, relay, tracked_send)
+        except RequestCancelled as e:
+            self.tracker.record_abort(scope["path"], e.stage)
+        finally:
+            watcher.cancel()
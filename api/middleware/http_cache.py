@@ -0,0 +1,179 @@
+"""
+ETag and Cache-Control headers for historical data.
+Sessions from past seasons never change, so their responses get a strong
+ETag derived from the request itself (path, normalised query, API and FastF1
+versions) plus a long max-age. The gzip and identity bodies of a resource are
+different representations, so a gzipped body's tag gets a "-gz" suffix and
+these responses carry Vary: Accept-Encoding. A matching If-None-Match is answered with 304
+before the route runs, so the session is never loaded. Current-season
+responses get an ETag hashed from the body and a short max-age instead.
+Responses a route marks "Cache-Control: no-store" (data still being filled
+in) are passed through untouched.
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+import fastf1
+from starlette.datastructures import Headers, MutableHeaders
+
+API_PREFIX = "/api/v1"
+API_VERSION = "1.0.0"
+
+IMMUTABLE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 31536000))
+RECENT_MAX_AGE = int(os.getenv("HTTP_CACHE_RECENT_MAX_AGE", 60))
+# Bump to invalidate every ETag handed out so far, e.g. after a serialisation fix
+CONTENT_VERSION = os.getenv("HTTP_CACHE_VERSION", "1")
+
+# Resources without a season in the path or whose data is never final
+_EXCLUDED = {"live", "cache"}
+
+# Incremental responses that must reach the client as they are produced
+STREAMING_TYPES = (b"application/x-ndjson", b"text/event-stream")
+
+
+def season_of(path: str) -> Optional[int]:
+    """Season of a historical endpoint (/api/v1/{resource}/{year}/...), None for anything else."""
+    if not path.startswith(API_PREFIX + "/"):
+        return None
+    segments = path[len(API_PREFIX) + 1:].split("/")
+    if len(segments) < 2 or segments[0] in _EXCLUDED:
+        return None
+    year = segments[1]
+    if len(year) == 4 and year.isdigit():
+        return int(year)
+    return None
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Sort parameters so ?a=1&b=2 and ?b=2&a=1 share a version."""
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+def content_version(path: str, query_string: bytes) -> str:
+    """Stable version of an immutable resource, computed without loading any data."""
+    key = "|".join((CONTENT_VERSION, API_VERSION, fastf1.__version__, path, normalize_query(query_string)))
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def encoded_etag(etag: str, content_encoding: Optional[str]) -> str:
+    """The strong ETag of one encoding of a resource: '"abc"' -> '"abc-gz"' for gzip."""
+    if content_encoding and content_encoding.lower() == "gzip":
+        return etag[:-1] + '-gz"'
+    return etag
+
+
+def is_streaming(headers) -> bool:
+    """Whether a response start message's headers announce a streamed body."""
+    return any(k.lower() == b"content-type" and v.startswith(STREAMING_TYPES) for k, v in headers)
+
+
+def is_no_store(headers) -> bool:
+    """Whether a route marked its response as not to be cached (Cache-Control: no-store)."""
+    return any(k.lower() == b"cache-control" and b"no-store" in v.lower() for k, v in headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class HTTPCacheMiddleware:
+    """Pure ASGI middleware; BaseHTTPMiddleware would buffer every response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        season = season_of(scope["path"])
+        if season is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if season < datetime.now().year:
+            await self._immutable(scope, receive, send, if_none_match)
+        elif scope["method"] == "GET":
+            await self._revalidated(scope, receive, send, if_none_match)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _immutable(self, scope, receive, send, if_none_match):
+        etag = content_version(scope["path"], scope["query_string"])
+        cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        # Either representation the client holds is still current
+        for tag in (etag, encoded_etag(etag, "gzip")):
+            if etag_matches(if_none_match, tag):
+                await _not_modified(send, tag, cache_control, vary=True)
+                return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message["status"] == 200 \
+                    and not is_no_store(message["headers"]):
+                headers = MutableHeaders(scope=message)
+                headers["ETag"] = encoded_etag(etag, headers.get("content-encoding"))
+                headers["Cache-Control"] = cache_control
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.append("Vary", "Accept-Encoding")
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _revalidated(self, scope, receive, send, if_none_match):
+        # The season is still running: hash the body, so only the transfer is saved
+        start = None
+        body = []
+
+        async def buffer(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] != 200 or is_streaming(message["headers"]) or is_no_store(message["headers"]):
+                    start = False
+                    await send(message)
+                else:
+                    start = message
+                return
+            if start is False:
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            content = b"".join(body)
+            etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+            cache_control = f"public, max-age={RECENT_MAX_AGE}"
+            if etag_matches(if_none_match, etag):
+                await _not_modified(send, etag, cache_control)
+                return
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = cache_control
+            await send(start)
+            await send({"type": "http.response.body", "body": content})
+
+        await self.app(scope, receive, buffer)
+
+
+async def _not_modified(send, etag: str, cache_control: str, vary: bool = False):
+    headers = [(b"etag", etag.encode()), (b"cache-control", cache_control.encode())]
+    if vary:
+        headers.append((b"vary", b"Accept-Encoding"))
+    await send({
+        "type": "http.response.start",
+        "status": 304,
+        "headers": headers,
+    })
+    await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,91 @@
+"""
+Serves repeated requests for historical data from the response cache.
+Only GET requests to season endpoints (/api/v1/{resource}/{year}/...) with a
+200 response are stored; streamed (NDJSON / SSE) responses and responses
+marked "Cache-Control: no-store" pass through. A
+request with "Cache-Control: no-cache" skips the lookup and refreshes the entry.
+"""
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from api.middleware.http_cache import is_no_store, is_streaming, normalize_query, season_of
+from api.services.response_cache import response_cache
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    query = normalize_query(query_string)
+    return f"{path}?{query}" if query else path
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache=response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        season = season_of(scope["path"])
+        if season is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = cache_key(scope["path"], scope["query_string"])
+        accept_gzip = "gzip" in headers.get("accept-encoding", "")
+
+        if "no-cache" not in headers.get("cache-control", ""):
+            entry = self.cache.get(key)
+            if entry is not None:
+                response_headers, body = entry.encoded(accept_gzip)
+                await send({
+                    "type": "http.response.start",
+                    "status": entry.status,
+                    "headers": response_headers + [(b"x-cache", b"HIT")],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        start = None
+        chunks = []
+        size = 0
+        passthrough = False
+
+        async def store(message):
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if (message["status"] != 200 or is_streaming(message["headers"]) or is_no_store(message["headers"])
+                        or any(k.lower() == b"set-cookie" for k, _ in message["headers"])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > self.cache.max_entry_bytes:
+                # Too large to cache: flush what was buffered and stream the rest
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": message.get("more_body", False)})
+                return
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            # put() gzips the body; large ones would stall the event loop
+            entry = await run_in_threadpool(self.cache.put, key, start["status"], start["headers"], body,
+                                            self.cache.ttl_for(season))
+            if entry is not None:
+                # Same encoding a later hit would get, so body-hash ETags stay stable
+                response_headers, body = entry.encoded(accept_gzip)
+                start["headers"] = response_headers + [(b"x-cache", b"MISS")]
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, store)
@@ -116,3 +116,18 @@ class PaginatedResponse(BaseModel):
     data: List[Any]
     pagination: PaginationMeta
 
+
+
+class BatchItem(BaseModel):
+    """One sub-request of a batch: a GET path under /api/v1, e.g. "/laps/{year}/{event}/fastest?session_type={session}"."""
+    id: Optional[str] = None
+    path: str
+    params: Optional[Dict[str, Any]] = None
+
+
+class BatchRequest(BaseModel):
+    """Sub-requests answered together; {year}, {event} and {session} in their paths refer to the shared session."""
+    year: Optional[int] = None
+    event: Optional[str] = None
+    session: Optional[str] = None
+    requests: List[BatchItem]
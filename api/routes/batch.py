@@ -0,0 +1,169 @@
+"""
+Batch endpoint: several GET requests answered in one round trip.
+A dashboard page asks for results, fastest lap, strategy, weather, gaps...
+of one session. Sub-requests are dispatched in-process to the app (through
+its middleware, so the response cache still applies) and run concurrently,
+after the shared session has been loaded into the session cache once.
+The batch itself is not admission controlled; its sub-requests are, and so
+is the shared session's load, which waits for a slot in the session lane.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from api.models.schemas import BatchItem, BatchRequest, ResponseWrapper
+from api.services.admission import admission_controller
+from api.services.session_cache import session_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+PREFIX = "/api/v1"
+MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 16))
+ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", 120))
+
+
+def _item_error(status: int, code: str, message: str) -> Tuple[int, Dict[str, Any]]:
+    return status, {"error": {"code": code, "message": message, "details": {}}}
+
+
+async def _dispatch(request: Request, path: str, query: str) -> Tuple[int, bytes]:
+    """Run a GET through the app in-process and return its status and body."""
+    done = asyncio.Event()
+    received = False
+    start: Dict[str, Any] = {}
+    chunks = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "path": path,
+        "raw_path": quote(path).encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", request.headers.get("host", "localhost").encode()), (b"accept", b"application/json")],
+        "client": request.client,
+        "server": request.scope.get("server"),
+    }
+    try:
+        await request.app(scope, receive, send)
+    finally:
+        done.set()
+    return start.get("status", 500), b"".join(chunks)
+
+
+async def _run_item(request: Request, batch: BatchRequest, item: BatchItem) -> Dict[str, Any]:
+    target = item.path
+    for name, value in (("year", batch.year), ("event", batch.event), ("session", batch.session)):
+        if value is not None:
+            target = target.replace("{" + name + "}", str(value))
+    parts = urlsplit(target)
+    path = parts.path if parts.path.startswith(PREFIX) else PREFIX + "/" + parts.path.lstrip("/")
+    query = "&".join(q for q in (parts.query, urlencode(item.params or {}, doseq=True)) if q)
+    result: Dict[str, Any] = {"id": item.id or item.path, "path": f"{path}?{query}" if query else path}
+
+    if path.startswith(PREFIX + "/batch"):
+        status, body = _item_error(400, "BATCH_NESTED", "Batches cannot contain batches")
+    else:
+        try:
+            status, raw = await asyncio.wait_for(_dispatch(request, path, query), ITEM_TIMEOUT)
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                status, body = _item_error(502, "BATCH_INVALID_RESPONSE", "Sub-request did not return JSON")
+            if not isinstance(body, dict):
+                body = {"data": body}
+        except asyncio.TimeoutError:
+            status, body = _item_error(504, "BATCH_TIMEOUT", f"Sub-request took longer than {ITEM_TIMEOUT:g}s")
+        except Exception as e:
+            logger.warning(f"Batch sub-request {path} failed: {e}")
+            status, body = _item_error(500, "INTERNAL_SERVER_ERROR", str(e))
+    result["status"] = status
+    result.update(body)
+    return result
+
+
+async def _preload(year: int, event: str, session_type: str) -> bool:
+    """
+    Load the batch's session through the session lane, like any request for
+    a session not in memory. A shed load is left to the sub-requests, which
+    are admitted (or refused) one by one.
+    """
+    if session_cache.is_loaded(year, event, session_type):
+        return True
+    admitted = not admission_controller.enabled or await admission_controller.acquire("session")
+    if not admitted:
+        return False
+    started = time.monotonic()
+    try:
+        await run_in_threadpool(session_cache.get_session, year, event, session_type)
+        return True
+    except Exception as e:
+        # Sub-requests report their own errors for a session that cannot be loaded
+        logger.warning(f"Batch could not load {year} {event} {session_type}: {e}")
+        return False
+    finally:
+        if admission_controller.enabled:
+            admission_controller.release("session", time.monotonic() - started)
+
+
+@router.post("/batch", response_model=ResponseWrapper)
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several GET requests against this API and return their responses
+    together, in request order. Each item carries its own status and either
+    data/meta or error, so one failing sub-request does not fail the batch.
+    When year, event and session are given, the session is loaded once
+    before the sub-requests run, and "{year}", "{event}" and "{session}" in
+    their paths are filled in.
+    """
+    if not batch.requests or len(batch.requests) > MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_BATCH",
+                "message": f"A batch takes 1 to {MAX_REQUESTS} requests",
+                "details": {"count": len(batch.requests)}
+            }
+        )
+
+    session_loaded = None
+    if batch.year is not None and batch.event and batch.session:
+        # Sub-requests then all hit the cached session instead of racing to load it
+        session_loaded = await _preload(batch.year, batch.event, batch.session.upper())
+
+    items = await asyncio.gather(*(_run_item(request, batch, item) for item in batch.requests))
+
+    return ResponseWrapper(
+        data=items,
+        meta={
+            "count": len(items),
+            "failed": sum(1 for item in items if item["status"] >= 400),
+            "session_loaded": session_loaded
+        }
+    )
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from typing import Dict, Any
 import fastf1
 import os
 import shutil
 import logging
+from api.services.response_cache import response_cache
+from api.services.swr import swr_caches
+from api.services.ergast_client import ergast_client
+from api.services.session_cache import session_cache
+from api.services.prewarm import session_prewarmer
+from api.services.workers import worker_pool
+from api.services.admission import admission_controller
+from api.services.cancellation import cancellation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -74,3 +82,75 @@ async def clear_cache(background_tasks: BackgroundTasks):
     except Exception as e:
         logger.error(f"Error clearing cache: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
+
+@router.get("/cache/responses", response_model=Dict[str, Any])
+async def get_response_cache_stats():
+    """
+    Get hit/miss metrics and size of the in-memory response cache.
+    """
+    return response_cache.get_stats()
+
+@router.post("/cache/responses/clear")
+async def clear_response_cache(prefix: str = Query(None, description="Only clear responses whose path starts with this, e.g. /api/v1/results/2024")):
+    """
+    Clear the in-memory response cache.
+    """
+    cleared = response_cache.clear(prefix)
+    return {"message": f"Cleared {cleared} cached responses."}
+
+@router.get("/cache/upstream", response_model=Dict[str, Any])
+async def get_upstream_cache_stats():
+    """
+    Get the stale-while-revalidate caches in front of the schedule, standings
+    and driver list lookups: age of each entry and failed refreshes.
+    """
+    return {cache.name: cache.get_stats() for cache in swr_caches}
+
+
+@router.get("/cache/ergast", response_model=Dict[str, Any])
+async def get_ergast_client_stats():
+    """
+    Get Ergast access metrics: disk cache hits, coalesced calls, upstream
+    requests and errors, and time spent queued behind the rate limiter.
+    """
+    return ergast_client.get_stats()
+
+
+@router.get("/cache/sessions", response_model=Dict[str, Any])
+async def get_session_cache_stats():
+    """
+    Get the loaded sessions held in memory, their derived tables, and the
+    prewarmer's progress through the current season.
+    """
+    return {
+        "sessions": session_cache.get_stats(),
+        "prewarmer": session_prewarmer.get_status()
+    }
+
+
+@router.get("/cache/workers", response_model=Dict[str, Any])
+async def get_worker_pool_stats():
+    """
+    Get the worker processes that parse cold sessions and load season
+    results: jobs submitted, completed, failed and rejected, and time spent
+    waiting for a queue slot.
+    """
+    return worker_pool.get_stats()
+
+
+@router.get("/cache/admission", response_model=Dict[str, Any])
+async def get_admission_stats():
+    """
+    Get the admission control lanes (telemetry, season, session, light): their limits,
+    requests running and queued, requests shed, and average duration.
+    """
+    return admission_controller.get_stats()
+
+
+@router.get("/cache/cancellation", response_model=Dict[str, Any])
+async def get_cancellation_stats():
+    """
+    Get the requests abandoned by their clients: disconnects, and requests
+    stopped at a checkpoint by stage (load, compute, serialize).
+    """
+    return cancellation.get_stats()
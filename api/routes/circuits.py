@@ -2,9 +2,9 @@
 Circuit information endpoints.
 """
 from fastapi import APIRouter, HTTPException
-import fastf1
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
@@ -18,8 +18,7 @@ def get_circuit_info(
     Get circuit information (layout, corners, marshal sectors, track length).
     """
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load(laps=True, telemetry=True, weather=False, messages=False)
+        session = session_cache.get_session(year, event_name, 'R', weather=False, messages=False)
         circuit_info = session.get_circuit_info()
         
         if circuit_info is None:
@@ -65,8 +64,7 @@ def get_drs_zones(
 ):
     """Get DRS zone locations."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load(laps=True, telemetry=True, weather=False, messages=False)
+        session = session_cache.get_session(year, event_name, 'R', weather=False, messages=False)
         circuit_info = session.get_circuit_info()
         
         if circuit_info is None:
@@ -114,8 +112,7 @@ def get_track_markers(
 ):
     """Get track markers (corners, marshal sectors, marshal lights)."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load(laps=True, telemetry=True, weather=False, messages=False)
+        session = session_cache.get_session(year, event_name, 'R', weather=False, messages=False)
         circuit_info = session.get_circuit_info()
         
         if circuit_info is None:
@@ -161,8 +158,7 @@ def get_corners(
 ):
     """Get corner information."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load(laps=True, telemetry=True, weather=False, messages=False)
+        session = session_cache.get_session(year, event_name, 'R', weather=False, messages=False)
         circuit_info = session.get_circuit_info()
         
         if circuit_info is None:
@@ -207,8 +203,7 @@ def get_marshal_sectors(
 ):
     """Get marshal sector information."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load(laps=True, telemetry=True, weather=False, messages=False)
+        session = session_cache.get_session(year, event_name, 'R', weather=False, messages=False)
         circuit_info = session.get_circuit_info()
         
         if circuit_info is None:
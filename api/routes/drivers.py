@@ -2,24 +2,51 @@
 Driver information endpoints.
 """
 from fastapi import APIRouter, HTTPException
-import fastf1
 import pandas as pd
+from api.services.schedule import get_schedule
+from api.services.season_results import season_results
+from api.services.swr import SWRCache, season_ttl
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
 
+# The season's driver list changes only with driver swaps; refresh hourly in the background
+DRIVERS_TTL = 3600
+
+_drivers_cache = SWRCache("drivers", max_entries=32)
+
+
+def _load_drivers(year: int):
+    """Drivers who started a race this season, None if the season has no events."""
+    schedule = get_schedule(year)
+    if schedule.empty:
+        return None
+
+    drivers = season_results.drivers(year)
+    return [
+        {
+            "driver_number": int(row['driver_number']) if pd.notna(row['driver_number']) else None,
+            "abbreviation": row['driver'] if pd.notna(row['driver']) else "",
+            "full_name": row['full_name'] if pd.notna(row['full_name']) else "",
+            "team_name": row['team_name'] if pd.notna(row['team_name']) else "",
+            "country_code": row['country_code'] if pd.notna(row['country_code']) else "",
+        }
+        for _, row in drivers.iterrows()
+    ]
+
+
 @router.get("/drivers/{year}", response_model=ResponseWrapper)
 def get_drivers(year: int):
     """
     Get list of all drivers for a specific year.
     """
     try:
-        # Get a recent event to fetch driver list
-        schedule = fastf1.get_event_schedule(year)
+        drivers_list = _drivers_cache.get(year, lambda: _load_drivers(year), season_ttl(year, DRIVERS_TTL))
         
-        if schedule.empty:
+        if drivers_list is None:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -29,17 +56,7 @@ def get_drivers(year: int):
                 }
             )
         
-        # Get first event to fetch driver list
-        first_event = schedule.iloc[0]
-        event_name = first_event['EventName']
-        
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load()
-        
-        # Get unique drivers from results
-        results = session.results
-        
-        if results is None or results.empty:
+        if not drivers_list:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -49,20 +66,6 @@ def get_drivers(year: int):
                 }
             )
         
-        # Extract driver information
-        drivers_list = []
-        for _, row in results.iterrows():
-            driver_info = {
-                "driver_number": int(row.get("DriverNumber", 0)) if pd.notna(row.get("DriverNumber")) else None,
-                "abbreviation": row.get("Abbreviation", ""),
-                "full_name": row.get("FullName", ""),
-                "team_name": row.get("TeamName", ""),
-                "country_code": row.get("CountryCode", ""),
-            }
-            # Avoid duplicates
-            if driver_info not in drivers_list:
-                drivers_list.append(driver_info)
-        
         return ResponseWrapper(
             data=drivers_list,
             meta={"year": year, "count": len(drivers_list)}
@@ -80,14 +83,56 @@ def get_drivers(year: int):
         )
 
 
+@router.get("/drivers/{year}/head-to-head/{driver1}/{driver2}", response_model=ResponseWrapper)
+def get_head_to_head(year: int, driver1: str, driver2: str):
+    """
+    Compare two drivers over a season: races and sprints finished ahead,
+    qualifying ahead on the grid, points, and the result of every shared round.
+    Drivers are given by number or abbreviation. Rounds whose results were
+    not final when first loaded are reloaded by the season results table.
+    """
+    try:
+        comparison = season_results.head_to_head(year, driver1, driver2)
+        
+        if comparison is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "DRIVER_NOT_FOUND",
+                    "message": f"No race results for {driver1} and {driver2} in {year}",
+                    "details": {}
+                }
+            )
+        
+        return ResponseWrapper(
+            data=comparison,
+            meta={
+                "year": year,
+                "driver1": driver1,
+                "driver2": driver2,
+                "count": len(comparison["rounds"])
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "DRIVERS_ERROR",
+                "message": f"Could not compare {driver1} and {driver2} in {year}",
+                "details": {"error": str(e)}
+            }
+        )
+
+
 @router.get("/drivers/{year}/{event_name}", response_model=ResponseWrapper)
 def get_event_drivers(year: int, event_name: str):
     """
     Get list of drivers for a specific event.
     """
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load()
+        session = session_cache.get_session(year, event_name, 'R')
         
         results = session.results
         
@@ -1,25 +1,57 @@
 """
-Ergast API integration endpoints for historical data.
+Historical data endpoints, served from the local Ergast database (api/services/historical_db.py)
+with a fallback to the Ergast API for anything not ingested yet.
 """
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-import pandas as pd
-from fastf1.ergast import Ergast
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from api.models.schemas import ResponseWrapper
-from utils.serialization import dataframe_to_dict_list
+from api.services.career_stats import SEASON_COUNTS, career_stats
+from api.services.ergast_client import ergast
+from api.services.historical_db import flatten, historical_db, historical_sync, records
 
 router = APIRouter()
-ergast = Ergast()
+
+
+def _historical(table: str, year: int, local: Callable[[], Optional[List[Dict[str, Any]]]],
+                fetch: Callable[[], Any]) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Rows from the local database, or from Ergast for what it doesn't hold yet.
+    Both come back with the database table's columns and types.
+    """
+    rows = local()
+    if rows is not None:
+        return rows, "Local database"
+    frame = flatten(fetch())
+    if not frame.empty and "season" not in frame:
+        # Driver and constructor lists don't carry their season
+        frame = frame.assign(season=year)
+    return records(table, frame), "Ergast API"
+
+
+@router.get("/historical/status", response_model=ResponseWrapper)
+def get_historical_status():
+    """
+    Get the seasons held in the local historical database and the state of
+    the job syncing the current season.
+    """
+    return ResponseWrapper(
+        data={**historical_db.get_status(), "sync": historical_sync.get_status()},
+        meta={}
+    )
 
 @router.get("/historical/{year}/events", response_model=ResponseWrapper)
 def get_historical_events(year: int):
     """
-    Get historical events (races) for a specific year using Ergast API.
+    Get historical events (races) for a specific year.
     """
     try:
-        schedule = ergast.get_race_schedule(season=year)
-        
-        if schedule is None or schedule.empty:
+        events_list, source = _historical(
+            "races", year,
+            lambda: historical_db.events(year),
+            lambda: ergast.get_race_schedule(season=year)
+        )
+
+        if not events_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -28,15 +60,13 @@ def get_historical_events(year: int):
                     "details": {}
                 }
             )
-            
-        events_list = dataframe_to_dict_list(schedule)
-        
+
         return ResponseWrapper(
             data=events_list,
             meta={
                 "year": year,
                 "count": len(events_list),
-                "source": "Ergast API"
+                "source": source
             }
         )
     except HTTPException:
@@ -58,12 +88,16 @@ def get_historical_results(
     driver: Optional[str] = Query(None, description="Driver ID")
 ):
     """
-    Get historical race results for a specific year using Ergast API.
+    Get historical race results for a specific year.
     """
     try:
-        results = ergast.get_race_results(season=year, round=round, driver=driver)
-        
-        if results is None or results.content is None or (hasattr(results.content, 'empty') and results.content.empty):
+        results_list, source = _historical(
+            "results", year,
+            lambda: historical_db.results(year, round, driver),
+            lambda: ergast.get_race_results(season=year, round=round, driver=driver)
+        )
+
+        if not results_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -72,39 +106,6 @@ def get_historical_results(
                     "details": {"round": round, "driver": driver}
                 }
             )
-        
-        # Ergast response content is usually a list of Race objects or a DataFrame depending on the call
-        # fastf1.ergast.Ergast.get_race_results returns an ErgastResponse
-        # The content property holds the data
-        
-        data = results.content
-        results_list = []
-        
-        if isinstance(data, pd.DataFrame):
-             results_list = dataframe_to_dict_list(data)
-        elif isinstance(data, list):
-             for item in data:
-                 # Check if it's a DataFrame-like object (ErgastResultFrame)
-                 if hasattr(item, 'to_dict') and hasattr(item, 'columns'):
-                     try:
-                         # Convert DataFrame to list of records
-                         records = dataframe_to_dict_list(item)
-                         results_list.extend(records)
-                     except Exception as e:
-                         print(f"Error converting item: {e}")
-                 elif isinstance(item, dict):
-                     results_list.append(item)
-                 else:
-                     try:
-                         results_list.append(vars(item))
-                     except:
-                         results_list.append(str(item))
-        else:
-             # Fallback if it's a DataFrame but not caught above
-             try:
-                 results_list = dataframe_to_dict_list(data)
-             except:
-                 results_list = []
 
         return ResponseWrapper(
             data=results_list,
@@ -112,7 +113,8 @@ def get_historical_results(
                 "year": year,
                 "round": round,
                 "driver": driver,
-                "source": "Ergast API"
+                "count": len(results_list),
+                "source": source
             }
         )
     except HTTPException:
@@ -133,12 +135,16 @@ def get_historical_drivers(
     round: Optional[int] = Query(None, description="Round number")
 ):
     """
-    Get historical drivers for a specific year using Ergast API.
+    Get historical drivers for a specific year.
     """
     try:
-        drivers = ergast.get_driver_info(season=year, round=round)
-        
-        if drivers is None or drivers.empty:
+        drivers_list, source = _historical(
+            "drivers", year,
+            lambda: historical_db.drivers(year, round),
+            lambda: ergast.get_driver_info(season=year, round=round)
+        )
+
+        if not drivers_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -147,16 +153,14 @@ def get_historical_drivers(
                     "details": {}
                 }
             )
-            
-        drivers_list = dataframe_to_dict_list(drivers)
-        
+
         return ResponseWrapper(
             data=drivers_list,
             meta={
                 "year": year,
                 "round": round,
                 "count": len(drivers_list),
-                "source": "Ergast API"
+                "source": source
             }
         )
     except HTTPException:
@@ -177,12 +181,16 @@ def get_historical_constructors(
     round: Optional[int] = Query(None, description="Round number")
 ):
     """
-    Get historical constructors for a specific year using Ergast API.
+    Get historical constructors for a specific year.
     """
     try:
-        constructors = ergast.get_constructor_info(season=year, round=round)
-        
-        if constructors is None or constructors.empty:
+        constructors_list, source = _historical(
+            "constructors", year,
+            lambda: historical_db.constructors(year, round),
+            lambda: ergast.get_constructor_info(season=year, round=round)
+        )
+
+        if not constructors_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -191,16 +199,14 @@ def get_historical_constructors(
                     "details": {}
                 }
             )
-            
-        constructors_list = dataframe_to_dict_list(constructors)
-        
+
         return ResponseWrapper(
             data=constructors_list,
             meta={
                 "year": year,
                 "round": round,
                 "count": len(constructors_list),
-                "source": "Ergast API"
+                "source": source
             }
         )
     except HTTPException:
@@ -221,12 +227,16 @@ def get_historical_driver_standings(
     round: Optional[int] = Query(None, description="Round number")
 ):
     """
-    Get historical driver standings for a specific year using Ergast API.
+    Get historical driver standings for a specific year.
     """
     try:
-        standings = ergast.get_driver_standings(season=year, round=round)
-        
-        if standings is None or standings.content is None or (hasattr(standings.content, 'empty') and standings.content.empty):
+        standings_list, source = _historical(
+            "driver_standings", year,
+            lambda: historical_db.standings("drivers", year, round),
+            lambda: ergast.get_driver_standings(season=year, round=round)
+        )
+
+        if not standings_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -235,24 +245,14 @@ def get_historical_driver_standings(
                     "details": {}
                 }
             )
-            
-        data = standings.content
-        standings_list = []
-        if hasattr(data, 'to_dict'):
-             standings_list = dataframe_to_dict_list(data)
-        else:
-             # Fallback
-             try:
-                 standings_list = dataframe_to_dict_list(data)
-             except:
-                 standings_list = []
 
         return ResponseWrapper(
             data=standings_list,
             meta={
                 "year": year,
                 "round": round,
-                "source": "Ergast API"
+                "count": len(standings_list),
+                "source": source
             }
         )
     except HTTPException:
@@ -273,12 +273,16 @@ def get_historical_constructor_standings(
     round: Optional[int] = Query(None, description="Round number")
 ):
     """
-    Get historical constructor standings for a specific year using Ergast API.
+    Get historical constructor standings for a specific year.
     """
     try:
-        standings = ergast.get_constructor_standings(season=year, round=round)
-        
-        if standings is None or standings.content is None or (hasattr(standings.content, 'empty') and standings.content.empty):
+        standings_list, source = _historical(
+            "constructor_standings", year,
+            lambda: historical_db.standings("constructors", year, round),
+            lambda: ergast.get_constructor_standings(season=year, round=round)
+        )
+
+        if not standings_list:
              raise HTTPException(
                 status_code=404,
                 detail={
@@ -287,24 +291,14 @@ def get_historical_constructor_standings(
                     "details": {}
                 }
             )
-            
-        data = standings.content
-        standings_list = []
-        if hasattr(data, 'to_dict'):
-             standings_list = dataframe_to_dict_list(data)
-        else:
-             # Fallback
-             try:
-                 standings_list = dataframe_to_dict_list(data)
-             except:
-                 standings_list = []
 
         return ResponseWrapper(
             data=standings_list,
             meta={
                 "year": year,
                 "round": round,
-                "source": "Ergast API"
+                "count": len(standings_list),
+                "source": source
             }
         )
     except HTTPException:
@@ -318,3 +312,187 @@ def get_historical_constructor_standings(
                 "details": {"error": str(e)}
             }
         )
+
+@router.get("/historical/drivers/career", response_model=ResponseWrapper)
+def get_career_leaderboard(
+    sort: str = Query("wins", description="races, wins, podiums, poles, fastest_laps, dnfs, points or titles"),
+    limit: int = Query(50, description="Number of drivers")
+):
+    """
+    Get drivers ranked by a career total, over every season in the local
+    historical database.
+    """
+    if sort not in (*SEASON_COUNTS, "points", "titles"):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_SORT",
+                "message": f"Cannot sort career stats by {sort}",
+                "details": {"valid": [*SEASON_COUNTS, "points", "titles"]}
+            }
+        )
+    try:
+        leaderboard = career_stats.leaderboard(sort, limit)
+
+        if not leaderboard:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "CAREER_NOT_FOUND",
+                    "message": "No seasons in the historical database yet",
+                    "details": {}
+                }
+            )
+
+        return ResponseWrapper(
+            data=leaderboard,
+            meta={
+                "sort": sort,
+                "count": len(leaderboard)
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "CAREER_ERROR",
+                "message": "Error retrieving career stats",
+                "details": {"error": str(e)}
+            }
+        )
+
+@router.get("/historical/drivers/{driver_id}/career", response_model=ResponseWrapper)
+def get_driver_career(driver_id: str):
+    """
+    Get a driver's career totals (races, wins, podiums, poles, fastest laps,
+    points, titles) and the same figures for every season.
+    """
+    try:
+        career = career_stats.career(driver_id)
+
+        if career is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "DRIVER_NOT_FOUND",
+                    "message": f"No career stats found for driver {driver_id}",
+                    "details": {}
+                }
+            )
+
+        return ResponseWrapper(
+            data=career,
+            meta={
+                "driver_id": driver_id,
+                "seasons": len(career["seasons"])
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "CAREER_ERROR",
+                "message": f"Error retrieving career stats for {driver_id}",
+                "details": {"error": str(e)}
+            }
+        )
+
+@router.get("/historical/{year}/drivers/stats", response_model=ResponseWrapper)
+def get_season_driver_stats(year: int):
+    """
+    Get every driver's races, wins, podiums, poles, fastest laps, points and
+    championship position for a season.
+    """
+    try:
+        stats = career_stats.season(year)
+
+        if stats is None and not historical_db.has_season(year):
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "SEASON_NOT_STORED",
+                    "message": f"Season {year} is not in the historical database yet; it is being synced",
+                    "details": {"year": year}
+                }
+            )
+
+        if not stats:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "DRIVERS_NOT_FOUND",
+                    "message": f"No driver stats found for year {year}",
+                    "details": {}
+                }
+            )
+
+        return ResponseWrapper(
+            data=stats,
+            meta={
+                "year": year,
+                "count": len(stats)
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "CAREER_ERROR",
+                "message": f"Error retrieving driver stats for {year}",
+                "details": {"error": str(e)}
+            }
+        )
+
+@router.get("/historical/{year}/teammates", response_model=ResponseWrapper)
+def get_teammate_head_to_head(year: int):
+    """
+    Get the teammate head-to-head matrix of a season: for every driver and
+    teammate, the races they shared and how often each finished and started ahead.
+    """
+    try:
+        teammates = career_stats.teammates(year)
+
+        if teammates is None and not historical_db.has_season(year):
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "SEASON_NOT_STORED",
+                    "message": f"Season {year} is not in the historical database yet; it is being synced",
+                    "details": {"year": year}
+                }
+            )
+
+        if not teammates:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "RESULTS_NOT_FOUND",
+                    "message": f"No historical results found for year {year}",
+                    "details": {}
+                }
+            )
+
+        return ResponseWrapper(
+            data=teammates,
+            meta={
+                "year": year,
+                "count": len(teammates["matrix"])
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "CAREER_ERROR",
+                "message": f"Error retrieving teammate head-to-head for {year}",
+                "details": {"error": str(e)}
+            }
+        )
@@ -3,10 +3,12 @@ Event and session information endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
-import fastf1
 import pandas as pd
+from api.services.schedule import get_schedule
+from api.services.event_resolver import event_resolver
 from api.models.schemas import EventInfo, SessionInfo, ResponseWrapper
 from utils.serialization import datetime_to_iso8601
+from api.services.session_cache import session_cache
 from datetime import datetime
 
 router = APIRouter()
@@ -17,7 +19,7 @@ def get_upcoming_events():
     """Get upcoming events for the current year."""
     try:
         current_year = datetime.now().year
-        schedule = fastf1.get_event_schedule(current_year)
+        schedule = get_schedule(current_year)
         
         upcoming = []
         now = datetime.now()
@@ -53,7 +55,7 @@ def get_upcoming_events():
 def get_past_events(year: int):
     """Get past events for a specific year."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         
         past = []
         now = datetime.now()
@@ -89,7 +91,7 @@ def get_past_events(year: int):
 def get_event_by_round(year: int, round_number: int):
     """Get event by round number."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         
         event = schedule[schedule['RoundNumber'] == round_number]
         
@@ -131,7 +133,7 @@ def get_event_by_round(year: int, round_number: int):
 def get_events_by_country(year: int, country: str):
     """Get events by country."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         
         events = []
         for _, event in schedule.iterrows():
@@ -178,7 +180,7 @@ def get_events(year: int):
     Get all events for a specific year.
     """
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         
         events = []
         for _, event in schedule.iterrows():
@@ -213,18 +215,8 @@ def get_event(year: int, event_name: str):
     Get specific event details.
     """
     try:
-        # Get event schedule to find the event
-        schedule = fastf1.get_event_schedule(year)
-        
-        # Find the matching event
-        matching_event = None
-        for _, event in schedule.iterrows():
-            # Check both EventName and Location for better matching
-            event_name_lower = event_name.lower()
-            if (event_name_lower in event.get("EventName", "").lower() or 
-                event_name_lower in event.get("Location", "").lower()):
-                matching_event = event
-                break
+        # Name, location, country or round number
+        matching_event = event_resolver.resolve(year, event_name)
         
         if matching_event is None:
             raise HTTPException(
@@ -280,9 +272,8 @@ def get_session_info(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
         # Load only basic session info, not all data
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, session_type.upper(), laps=False, telemetry=False, weather=False, messages=False)
         
         session_data = {
             "session_name": session.name,
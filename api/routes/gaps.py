@@ -3,10 +3,12 @@ Gap analysis endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+from api.services.derived import gap_table
 
 router = APIRouter()
 
@@ -34,8 +36,7 @@ def get_gaps(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -61,32 +62,9 @@ def get_gaps(
                     }
                 )
         
-        # Calculate gaps to leader
-        gaps = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver]
-            if driver_laps.empty:
-                continue
-            
-            # Get leader's time (position 1)
-            leader_laps = laps[laps['Position'] == 1]
-            if leader_laps.empty:
-                continue
-            
-            # Get same lap for comparison
-            for _, driver_lap in driver_laps.iterrows():
-                lap_num = driver_lap['LapNumber']
-                leader_lap = leader_laps[leader_laps['LapNumber'] == lap_num]
-                
-                if not leader_lap.empty and pd.notna(driver_lap.get('LapTime')) and pd.notna(leader_lap.iloc[0].get('LapTime')):
-                    gap = (driver_lap['LapTime'] - leader_lap.iloc[0]['LapTime']).total_seconds()
-                    gaps.append({
-                        "driver_number": int(driver),
-                        "driver": driver_lap.get('Driver'),
-                        "lap": int(lap_num),
-                        "position": float(driver_lap.get('Position')) if pd.notna(driver_lap.get('Position')) else None,
-                        "gap_to_leader_seconds": gap
-                    })
+        gaps = gap_table(session)
+        if lap:
+            gaps = [gap for gap in gaps if gap["lap"] == lap]
         
         return ResponseWrapper(
             data=gaps,
@@ -119,8 +97,7 @@ def get_driver_gaps(
 ):
     """Get gap to leader for a specific driver."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -133,14 +110,10 @@ def get_driver_gaps(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -195,8 +168,7 @@ def get_gap_to_driver_ahead(
 ):
     """Get gap to driver ahead."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -209,14 +181,10 @@ def get_gap_to_driver_ahead(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -276,8 +244,7 @@ def get_gap_to_driver_behind(
 ):
     """Get gap to driver behind."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -290,14 +257,10 @@ def get_gap_to_driver_behind(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
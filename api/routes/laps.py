@@ -3,10 +3,13 @@ Lap time endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, series_to_dict
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+from api.services.derived import fastest_lap as pick_fastest_lap
+from api.services.cancellation import checkpoint
 
 router = APIRouter()
 
@@ -21,8 +24,7 @@ def get_fastest_lap(
     Get fastest lap information for a session.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         
@@ -37,7 +39,7 @@ def get_fastest_lap(
             )
         
         # Get fastest lap - pick_fastest() returns a Series, convert to dict
-        fastest_lap = laps.pick_fastest()
+        fastest_lap = pick_fastest_lap(session)
         
         if fastest_lap is None or (hasattr(fastest_lap, 'empty') and fastest_lap.empty):
             raise HTTPException(
@@ -102,8 +104,7 @@ def get_personal_best_laps(
 ):
     """Get personal best laps for all drivers."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -174,8 +175,7 @@ def get_speed_traps(
     Get speed trap data (SpeedST, SpeedFL, SpeedI1, SpeedI2) for all laps.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         
@@ -190,13 +190,9 @@ def get_speed_traps(
             )
         
         if driver:
-            try:
-                driver_num = int(driver)
-                laps = laps[laps['DriverNumber'] == driver_num]
-            except ValueError:
-                laps = laps[laps['Driver'] == driver.upper()]
+            laps = driver_index(session).laps(session, driver)
             
-            if laps.empty:
+            if laps is None or laps.empty:
                 raise HTTPException(
                     status_code=404,
                     detail={
@@ -213,7 +209,7 @@ def get_speed_traps(
         speed_data = laps[available_cols].copy()
         
         # Convert to list of dicts
-        speed_list = dataframe_to_dict_list(speed_data)
+        speed_list = dataframe_to_dict_list(speed_data, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=speed_list,
@@ -253,8 +249,7 @@ def get_laps(
     Get all lap times for a race session with optional filtering.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         
@@ -302,7 +297,7 @@ def get_laps(
         if not include_deleted and 'Deleted' in laps.columns:
             laps = laps[laps['Deleted'] != True]
         
-        laps_list = dataframe_to_dict_list(laps)
+        laps_list = dataframe_to_dict_list(laps, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=laps_list,
@@ -338,8 +333,7 @@ def get_driver_laps(
     Driver can be specified by abbreviation (e.g., 'VER', 'HAM') or driver number.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         
@@ -353,15 +347,10 @@ def get_driver_laps(
                 }
             )
         
-        # Try to filter by driver abbreviation first, then by driver number
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            # Not a number, try abbreviation
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -371,7 +360,7 @@ def get_driver_laps(
                 }
             )
         
-        laps_list = dataframe_to_dict_list(driver_laps)
+        laps_list = dataframe_to_dict_list(driver_laps, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=laps_list,
@@ -1,19 +1,41 @@
 from fastapi import APIRouter, HTTPException, Query
-from api.services.live_timing import recorder
-from api.services.live_state import live_state
+from api.services.live_sessions import DEFAULT_SESSION, live_sessions
+from api.services.live_telemetry import telemetry_decoder
+from api.services.live_archive import TABLES as ARCHIVE_TABLES, archive_recording, list_archives, load_table, resolve_recording
 from api.models.schemas import ResponseWrapper
+from utils.serialization import dataframe_to_dict_list
 import os
 import json
 
 router = APIRouter()
 
+SESSION_QUERY = Query(DEFAULT_SESSION, description="Live session id")
+
+
+def _get_session(session_id: str):
+    live = live_sessions.get(session_id)
+    if live is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "SESSION_NOT_FOUND",
+                "message": f"Live session '{session_id}' not found",
+                "details": {"sessions": [s["session"] for s in live_sessions.list()]}
+            }
+        )
+    return live
+
 @router.post("/live/start", response_model=ResponseWrapper)
-def start_live_recording(filename: str = Query(None, description="Optional filename for the recording")):
+def start_live_recording(
+    filename: str = Query(None, description="Optional filename for the recording"),
+    session: str = SESSION_QUERY
+):
     """
     Start recording live timing data from F1 SignalR API.
     This starts a background process that connects to the live stream.
+    The session is created if it does not exist yet.
     """
-    result = recorder.start_recording(filename)
+    result = live_sessions.start_recording(session, filename)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result)
     
@@ -23,11 +45,11 @@ def start_live_recording(filename: str = Query(None, description="Optional filen
     )
 
 @router.post("/live/stop", response_model=ResponseWrapper)
-def stop_live_recording():
+def stop_live_recording(session: str = SESSION_QUERY):
     """
     Stop the live recording.
     """
-    result = recorder.stop_recording()
+    result = live_sessions.stop_recording(session)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result)
     
@@ -37,67 +59,202 @@ def stop_live_recording():
     )
 
 @router.get("/live/status", response_model=ResponseWrapper)
-def get_live_status():
+def get_live_status(session: str = SESSION_QUERY):
     """
     Get the current status of the live recorder.
     """
-    status = recorder.get_status()
+    status = _get_session(session).recorder.get_status()
     return ResponseWrapper(
         data=status,
         meta={"action": "get_status"}
     )
 
+@router.get("/live/sessions", response_model=ResponseWrapper)
+def get_live_sessions():
+    """
+    List live sessions with their recorder status.
+    """
+    sessions = live_sessions.list()
+    return ResponseWrapper(
+        data=sessions,
+        meta={"count": len(sessions), "max_sessions": live_sessions.max_sessions}
+    )
+
+@router.post("/live/replay", response_model=ResponseWrapper)
+def start_live_replay(
+    filename: str = Query(..., description="Recording to replay (file name in live_data/)"),
+    session: str = Query(..., description="Live session id to replay into")
+):
+    """
+    Ingest an existing recording into a live session, next to any session
+    that is recording the live stream.
+    """
+    result = live_sessions.start_replay(session, filename)
+    if result["status"] == "error":
+        raise HTTPException(status_code=400, detail=result)
+
+    return ResponseWrapper(
+        data=result,
+        meta={"action": "start_replay"}
+    )
+
+@router.delete("/live/sessions/{session_id}", response_model=ResponseWrapper)
+def delete_live_session(session_id: str):
+    """
+    Remove a stopped live session and free its state.
+    """
+    result = live_sessions.remove(session_id)
+    if result["status"] == "error":
+        raise HTTPException(status_code=400, detail=result)
+
+    return ResponseWrapper(
+        data=result,
+        meta={"action": "remove_session"}
+    )
+
 @router.get("/live/leaderboard", response_model=ResponseWrapper)
-def get_live_leaderboard():
+def get_live_leaderboard(session: str = SESSION_QUERY):
     """
     Get the current live leaderboard with positions, lap times, and gaps.
     """
-    leaderboard = live_state.get_leaderboard()
+    state = _get_session(session).state
+    leaderboard = state.get_leaderboard()
     return ResponseWrapper(
         data=leaderboard,
         meta={
-            "last_updated": live_state.last_updated.isoformat(),
+            "last_updated": state.last_updated.isoformat(),
             "count": len(leaderboard)
         }
     )
 
+@router.get("/live/drivers/{driver_number}/laps", response_model=ResponseWrapper)
+def get_live_driver_laps(
+    driver_number: str,
+    last: int = Query(None, description="Only return the last N completed laps"),
+    session: str = SESSION_QUERY
+):
+    """
+    Get the completed lap history for a driver in the live session,
+    with rolling average, personal bests and stint pace.
+    """
+    state = _get_session(session).state
+    history = state.get_driver_laps(driver_number, last)
+    if history is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "LAPS_NOT_FOUND",
+                "message": f"No completed laps recorded for driver {driver_number}",
+                "details": {}
+            }
+        )
+
+    return ResponseWrapper(
+        data=history["laps"],
+        meta={
+            "driver_number": driver_number,
+            "last_updated": state.last_updated.isoformat(),
+            "count": len(history["laps"]),
+            "stats": history["stats"]
+        }
+    )
+
+@router.get("/live/drivers/{driver_number}/telemetry", response_model=ResponseWrapper)
+def get_live_driver_telemetry(
+    driver_number: str,
+    seconds: float = Query(None, description="Only return samples from the last N seconds (latest sample only if omitted)"),
+    session: str = SESSION_QUERY
+):
+    """
+    Get live car telemetry (speed, throttle, RPM, gear, brake, DRS) and X/Y/Z
+    position for a driver, decoded from the CarData.z / Position.z streams.
+    """
+    state = _get_session(session).state
+    if seconds is None:
+        telemetry = state.telemetry.latest(driver_number)
+        empty = telemetry["car_data"] is None and telemetry["position"] is None
+    else:
+        telemetry = state.telemetry.window(driver_number, seconds)
+        empty = not telemetry["car_data"] and not telemetry["position"]
+
+    if empty:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "TELEMETRY_NOT_FOUND",
+                "message": f"No live telemetry received for driver {driver_number}",
+                "details": {}
+            }
+        )
+
+    return ResponseWrapper(
+        data=telemetry,
+        meta={
+            "driver_number": driver_number,
+            "seconds": seconds,
+            "last_updated": state.last_updated.isoformat()
+        }
+    )
+
+@router.get("/live/positions", response_model=ResponseWrapper)
+def get_live_positions(session: str = SESSION_QUERY):
+    """
+    Get the latest X/Y/Z track position of every car.
+    """
+    state = _get_session(session).state
+    positions = state.telemetry.positions()
+    return ResponseWrapper(
+        data=positions,
+        meta={
+            "last_updated": state.last_updated.isoformat(),
+            "count": len(positions),
+            "decoder": telemetry_decoder.get_status()
+        }
+    )
+
 @router.get("/live/weather", response_model=ResponseWrapper)
-def get_live_weather():
+def get_live_weather(session: str = SESSION_QUERY):
     """
     Get the current live weather data.
     """
+    state = _get_session(session).state
     return ResponseWrapper(
-        data=live_state.weather,
-        meta={"last_updated": live_state.last_updated.isoformat()}
+        data=state.weather,
+        meta={"last_updated": state.last_updated.isoformat()}
     )
 
 @router.get("/live/track-status", response_model=ResponseWrapper)
-def get_live_track_status():
+def get_live_track_status(session: str = SESSION_QUERY):
     """
     Get the current track status (flags, safety car, etc.).
     """
+    state = _get_session(session).state
     return ResponseWrapper(
-        data=live_state.track_status,
-        meta={"last_updated": live_state.last_updated.isoformat()}
+        data=state.track_status,
+        meta={"last_updated": state.last_updated.isoformat()}
     )
 
 @router.get("/live/session-status", response_model=ResponseWrapper)
-def get_live_session_status():
+def get_live_session_status(session: str = SESSION_QUERY):
     """
     Get the current session status.
     """
+    state = _get_session(session).state
     return ResponseWrapper(
-        data=live_state.session_status,
-        meta={"last_updated": live_state.last_updated.isoformat()}
+        data=state.session_status,
+        meta={"last_updated": state.last_updated.isoformat()}
     )
 
 @router.get("/live/log", response_model=ResponseWrapper)
-def get_live_log(lines: int = Query(10, description="Number of last lines to retrieve")):
+def get_live_log(
+    lines: int = Query(10, description="Number of last lines to retrieve"),
+    session: str = SESSION_QUERY
+):
     """
     Get the latest raw log lines from the current recording file.
     Useful for debugging or getting raw stream data.
     """
-    status = recorder.get_status()
+    status = _get_session(session).recorder.get_status()
     if not status["current_file"] or not os.path.exists(status["current_file"]):
         raise HTTPException(status_code=404, detail="No active recording file found")
     
@@ -126,3 +283,91 @@ def get_live_log(lines: int = Query(10, description="Number of last lines to ret
             )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
+
+@router.post("/live/archive", response_model=ResponseWrapper)
+def archive_live_recording(
+    filename: str = Query(None, description="Recording in live_data/ to archive (defaults to the session's last recording)"),
+    session: str = SESSION_QUERY
+):
+    """
+    Convert a finished recording into per-category Parquet tables
+    (timing, app_data, weather, track_status, race_control).
+    """
+    status = _get_session(session).recorder.get_status()
+    requested = filename or status["current_file"]
+    recording = None
+    if requested:
+        try:
+            recording = resolve_recording(requested)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "INVALID_RECORDING_PATH", "message": str(e), "details": {"file": requested}}
+            )
+    if not recording or not os.path.exists(recording):
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "RECORDING_NOT_FOUND", "message": "Recording file not found", "details": {"file": requested}}
+        )
+    if status["is_recording"] and recording == os.path.realpath(status["current_file"] or ""):
+        raise HTTPException(
+            status_code=409,
+            detail={"code": "RECORDING_IN_PROGRESS", "message": "Stop the recording before archiving it", "details": {"file": recording}}
+        )
+
+    try:
+        manifest = archive_recording(recording)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"code": "ARCHIVE_ERROR", "message": str(e), "details": {"file": requested}}
+        )
+
+    return ResponseWrapper(
+        data=manifest,
+        meta={"action": "archive_recording"}
+    )
+
+@router.get("/live/archives", response_model=ResponseWrapper)
+def get_live_archives():
+    """
+    List archived recordings with their manifests.
+    """
+    archives = list_archives()
+    return ResponseWrapper(
+        data=archives,
+        meta={"count": len(archives)}
+    )
+
+@router.get("/live/archives/{name}/{table}", response_model=ResponseWrapper)
+def get_live_archive_table(
+    name: str,
+    table: str,
+    driver_number: str = Query(None, description="Filter rows by driver number"),
+    limit: int = Query(None, description="Only return the first N rows")
+):
+    """
+    Read one table of an archived recording.
+    """
+    df = load_table(name, table)
+    if df is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "ARCHIVE_TABLE_NOT_FOUND",
+                "message": f"Table '{table}' not found in archive '{name}'",
+                "details": {"tables": list(ARCHIVE_TABLES)}
+            }
+        )
+
+    if driver_number is not None and "driver_number" in df.columns:
+        df = df[df["driver_number"] == driver_number]
+    if limit is not None:
+        df = df.head(limit)
+
+    # Nullable columns hold pd.NA, which the serializer does not know about
+    rows = dataframe_to_dict_list(df.astype(object).where(df.notna(), None))
+    return ResponseWrapper(
+        data=rows,
+        meta={"archive": name, "table": table, "count": len(rows)}
+    )
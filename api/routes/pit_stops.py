@@ -3,10 +3,11 @@ Pit stop endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, datetime_to_iso8601
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
 
 router = APIRouter()
 
@@ -19,8 +20,7 @@ def get_fastest_pit_stop(
 ):
     """Get the fastest pit stop in the session."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -99,8 +99,7 @@ def get_pit_stop_strategy(
 ):
     """Get pit stop strategy analysis."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -114,8 +113,7 @@ def get_pit_stop_strategy(
             )
         
         strategy = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver].sort_values('LapNumber')
+        for driver, driver_laps in driver_index(session).iter_laps(session):
             driver_name = driver_laps.iloc[0]['Driver'] if 'Driver' in driver_laps.columns else None
             
             pit_laps = driver_laps[pd.notna(driver_laps['PitInTime'])].copy()
@@ -187,8 +185,7 @@ def get_pit_stops(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -253,8 +250,7 @@ def get_driver_pit_stops(
 ):
     """Get pit stops for a specific driver."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -267,14 +263,10 @@ def get_driver_pit_stops(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -3,10 +3,12 @@ Position data endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, datetime_to_iso8601
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+from api.services.cancellation import checkpoint
 
 router = APIRouter()
 
@@ -19,8 +21,7 @@ def get_position_changes(
 ):
     """Get all position changes during the session."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         # Use laps data to get position changes
         laps = session.laps
@@ -36,8 +37,7 @@ def get_position_changes(
         
         # Get position changes by comparing consecutive laps
         changes = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver].sort_values('LapNumber')
+        for driver, driver_laps in driver_index(session).iter_laps(session):
             for i in range(1, len(driver_laps)):
                 prev_pos = driver_laps.iloc[i-1]['Position']
                 curr_pos = driver_laps.iloc[i]['Position']
@@ -81,8 +81,7 @@ def get_overtakes(
 ):
     """Get all overtakes (position gains)."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Position' not in laps.columns:
@@ -97,8 +96,7 @@ def get_overtakes(
         
         # Get overtakes (position gains)
         overtakes = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver].sort_values('LapNumber')
+        for driver, driver_laps in driver_index(session).iter_laps(session):
             for i in range(1, len(driver_laps)):
                 prev_pos = driver_laps.iloc[i-1]['Position']
                 curr_pos = driver_laps.iloc[i]['Position']
@@ -144,8 +142,7 @@ def get_lap_positions(
     Get position of each driver at the end of each lap.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Position' not in laps.columns:
@@ -165,7 +162,7 @@ def get_lap_positions(
         pos_data = pos_data.sort_values(['LapNumber', 'Position'])
         
         # Convert to list of dicts
-        pos_list = dataframe_to_dict_list(pos_data)
+        pos_list = dataframe_to_dict_list(pos_data, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=pos_list,
@@ -212,8 +209,7 @@ def get_positions(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load(telemetry=True)
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'pos_data') or session.pos_data is None:
             raise HTTPException(
@@ -239,7 +235,7 @@ def get_positions(
                     pass # Ignore time filter errors for now or handle better
             
             if not driver_pos.empty:
-                result_data[driver_num] = dataframe_to_dict_list(driver_pos)
+                result_data[driver_num] = dataframe_to_dict_list(driver_pos, check=lambda: checkpoint("serialize"))
         
         if not result_data:
              raise HTTPException(
@@ -282,8 +278,7 @@ def get_driver_positions(
 ):
     """Get position data for a specific driver."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load(telemetry=True)
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'pos_data') or session.pos_data is None:
             raise HTTPException(
@@ -295,24 +290,8 @@ def get_driver_positions(
                 }
             )
         
-        pos_data = session.pos_data
-        driver_positions = None
-        
-        # Try to find driver in pos_data keys
-        if driver in pos_data:
-            driver_positions = pos_data[driver]
-        else:
-            # Try to resolve driver abbreviation to number
-            try:
-                # Check if driver is an abbreviation
-                results = session.results
-                driver_row = results[results['Abbreviation'] == driver.upper()]
-                if not driver_row.empty:
-                    driver_num = str(driver_row.iloc[0]['DriverNumber'])
-                    if driver_num in pos_data:
-                        driver_positions = pos_data[driver_num]
-            except Exception:
-                pass
+        # Number, abbreviation or name
+        driver_positions = driver_index(session).pos_data(session, driver)
         
         if driver_positions is None or driver_positions.empty:
              raise HTTPException(
@@ -324,7 +303,7 @@ def get_driver_positions(
                 }
             )
         
-        positions_list = dataframe_to_dict_list(driver_positions)
+        positions_list = dataframe_to_dict_list(driver_positions, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=positions_list,
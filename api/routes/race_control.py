@@ -3,9 +3,9 @@ Race control messages endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
@@ -33,8 +33,7 @@ def get_race_control_messages(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'race_control_messages') or session.race_control_messages is None or session.race_control_messages.empty:
             raise HTTPException(
@@ -87,8 +86,7 @@ def get_penalties(
 ):
     """Get all penalties issued."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'race_control_messages') or session.race_control_messages is None or session.race_control_messages.empty:
             raise HTTPException(
@@ -142,8 +140,7 @@ def get_investigations(
 ):
     """Get all investigations."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'race_control_messages') or session.race_control_messages is None or session.race_control_messages.empty:
             raise HTTPException(
@@ -2,10 +2,10 @@
 Race results endpoints.
 """
 from fastapi import APIRouter, HTTPException
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, datetime_to_iso8601
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
@@ -16,8 +16,7 @@ def get_race_results(year: int, event_name: str):
     Get race results for a specific event.
     """
     try:
-        session = fastf1.get_session(year, event_name, 'R')
-        session.load()
+        session = session_cache.get_session(year, event_name, 'R')
         
         results = session.results
         
@@ -62,8 +61,7 @@ def get_qualifying_results(year: int, event_name: str):
     Get qualifying results for a specific event.
     """
     try:
-        session = fastf1.get_session(year, event_name, 'Q')
-        session.load()
+        session = session_cache.get_session(year, event_name, 'Q')
         
         results = session.results
         
@@ -107,8 +105,7 @@ def get_sprint_results(year: int, event_name: str):
     Get sprint results for a specific event.
     """
     try:
-        session = fastf1.get_session(year, event_name, 'S')
-        session.load()
+        session = session_cache.get_session(year, event_name, 'S')
         
         results = session.results
         
@@ -153,8 +150,7 @@ def get_sprint_qualifying_results(year: int, event_name: str):
     Sprint qualifying determines the grid for the sprint race.
     """
     try:
-        session = fastf1.get_session(year, event_name, 'SQ')
-        session.load()
+        session = session_cache.get_session(year, event_name, 'SQ')
         
         results = session.results
         
@@ -197,9 +193,8 @@ def get_sprint_qualifying_results(year: int, event_name: str):
 def get_q1_results(year: int, event_name: str):
     """Get Q1 qualifying results."""
     try:
-        session = fastf1.get_session(year, event_name, 'Q')
         # Load only results, not all telemetry/laps
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, 'Q', laps=False, telemetry=False, weather=False, messages=False)
         results = session.results
         
         if results is None or results.empty:
@@ -246,9 +241,8 @@ def get_q1_results(year: int, event_name: str):
 def get_q2_results(year: int, event_name: str):
     """Get Q2 qualifying results."""
     try:
-        session = fastf1.get_session(year, event_name, 'Q')
         # Load only results, not all telemetry/laps
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, 'Q', laps=False, telemetry=False, weather=False, messages=False)
         results = session.results
         
         if results is None or results.empty:
@@ -295,9 +289,8 @@ def get_q2_results(year: int, event_name: str):
 def get_q3_results(year: int, event_name: str):
     """Get Q3 qualifying results."""
     try:
-        session = fastf1.get_session(year, event_name, 'Q')
         # Load only results, not all telemetry/laps
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, 'Q', laps=False, telemetry=False, weather=False, messages=False)
         results = session.results
         
         if results is None or results.empty:
@@ -344,9 +337,8 @@ def get_q3_results(year: int, event_name: str):
 def get_grid_positions(year: int, event_name: str):
     """Get starting grid positions."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
         # Load only results, not all telemetry/laps
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, 'R', laps=False, telemetry=False, weather=False, messages=False)
         results = session.results
         
         if results is None or results.empty:
@@ -2,10 +2,11 @@
 Sector times endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, series_to_dict
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
 
 router = APIRouter()
 
@@ -18,8 +19,7 @@ def get_fastest_sector1(
 ):
     """Get fastest sector 1 time."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Sector1Time' not in laps.columns:
@@ -76,8 +76,7 @@ def get_fastest_sector2(
 ):
     """Get fastest sector 2 time."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Sector2Time' not in laps.columns:
@@ -133,8 +132,7 @@ def get_fastest_sector3(
 ):
     """Get fastest sector 3 time."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Sector3Time' not in laps.columns:
@@ -203,8 +201,7 @@ def get_sectors(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -264,8 +261,7 @@ def get_driver_sectors(
 ):
     """Get sector times for a specific driver."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -278,14 +274,10 @@ def get_driver_sectors(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
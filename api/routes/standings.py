@@ -1,24 +1,50 @@
 """
 Championship standings endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 import fastf1
-from fastf1.ergast import Ergast
 import pandas as pd
+from api.services.career_stats import career_stats
+from api.services.ergast_client import ergast
+from api.services.event_resolver import event_resolver
+from api.services.schedule import get_schedule
+from api.services.season_results import season_results
+from api.services.swr import SWRCache, season_ttl
 from api.models.schemas import ResponseWrapper
 
 router = APIRouter()
 
+# Standings only move after a race; the last good table is served while Ergast is asked again
+STANDINGS_TTL = 600
+
+_standings_cache = SWRCache("standings", max_entries=128)
+
+
+def _get_standings(kind: str, year: int, round_number: int = None) -> pd.DataFrame:
+    """Driver or constructor standings table for a season, optionally after a round."""
+    def load():
+        fetch = ergast.get_driver_standings if kind == "drivers" else ergast.get_constructor_standings
+        standings_data = fetch(season=year) if round_number is None else fetch(season=year, round=round_number)
+        return standings_data.content[0] if standings_data.content else pd.DataFrame()
+
+    return _standings_cache.get((kind, year, round_number), load, season_ttl(year, STANDINGS_TTL))
+
+
+def _no_store(response: Response):
+    """Keep a response with podiums still pending out of the HTTP and response caches."""
+    response.headers["Cache-Control"] = "no-store"
+
 
 @router.get("/standings/{year}/drivers", response_model=ResponseWrapper)
-def get_driver_standings(year: int):
+def get_driver_standings(year: int, response: Response):
     """Get driver championship standings for a year."""
     try:
-        ergast = Ergast()
-        standings_data = ergast.get_driver_standings(season=year)
+        df = _get_standings("drivers", year)
         
-        if standings_data.content and not standings_data.content[0].empty:
-            df = standings_data.content[0]
+        if not df.empty:
+            podiums = career_stats.podiums(year)
+            if podiums is None:
+                _no_store(response)
             standings = []
             
             for _, row in df.iterrows():
@@ -40,7 +66,7 @@ def get_driver_standings(year: int):
                     "team": team_name,
                     "points": float(points) if pd.notna(points) else 0.0,
                     "wins": int(wins) if pd.notna(wins) else 0,
-                    "podiums": 0, # Ergast doesn't provide podium count directly in standings
+                    "podiums": podiums.get(row.get('driverId'), 0) if podiums is not None else None,
                     "position": int(position) if pd.notna(position) else 0
                 })
             
@@ -48,7 +74,8 @@ def get_driver_standings(year: int):
                 data=standings,
                 meta={
                     "year": year,
-                    "count": len(standings)
+                    "count": len(standings),
+                    "podiums_pending": podiums is None
                 }
             )
         else:
@@ -78,11 +105,9 @@ def get_driver_standings(year: int):
 def get_constructor_standings(year: int):
     """Get constructor championship standings for a year."""
     try:
-        ergast = Ergast()
-        standings_data = ergast.get_constructor_standings(season=year)
+        df = _get_standings("constructors", year)
         
-        if standings_data.content and not standings_data.content[0].empty:
-            df = standings_data.content[0]
+        if not df.empty:
             standings = []
             
             for _, row in df.iterrows():
@@ -128,10 +153,10 @@ def get_constructor_standings(year: int):
 
 
 @router.get("/standings/{year}/drivers/after/{event_name}", response_model=ResponseWrapper)
-def get_driver_standings_after_event(year: int, event_name: str):
+def get_driver_standings_after_event(year: int, event_name: str, response: Response):
     """Get driver standings after a specific event."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         if schedule is None or schedule.empty:
             raise HTTPException(
                 status_code=404,
@@ -142,12 +167,7 @@ def get_driver_standings_after_event(year: int, event_name: str):
                 }
             )
         
-        # Find event round
-        round_number = None
-        for _, event in schedule.iterrows():
-            if event_name.lower() in event['EventName'].lower():
-                round_number = event['RoundNumber']
-                break
+        round_number = event_resolver.round_number(year, event_name)
         
         if round_number is None:
             raise HTTPException(
@@ -159,11 +179,12 @@ def get_driver_standings_after_event(year: int, event_name: str):
                 }
             )
             
-        ergast = Ergast()
-        standings_data = ergast.get_driver_standings(season=year, round=round_number)
+        df = _get_standings("drivers", year, int(round_number))
         
-        if standings_data.content and not standings_data.content[0].empty:
-            df = standings_data.content[0]
+        if not df.empty:
+            podiums = career_stats.podiums(year, int(round_number))
+            if podiums is None:
+                _no_store(response)
             standings = []
             
             for _, row in df.iterrows():
@@ -184,7 +205,7 @@ def get_driver_standings_after_event(year: int, event_name: str):
                     "team": team_name,
                     "points": float(points) if pd.notna(points) else 0.0,
                     "wins": int(wins) if pd.notna(wins) else 0,
-                    "podiums": 0,
+                    "podiums": podiums.get(row.get('driverId'), 0) if podiums is not None else None,
                     "position": int(position) if pd.notna(position) else 0
                 })
             
@@ -194,7 +215,8 @@ def get_driver_standings_after_event(year: int, event_name: str):
                     "year": year,
                     "event_name": event_name,
                     "round": int(round_number),
-                    "count": len(standings)
+                    "count": len(standings),
+                    "podiums_pending": podiums is None
                 }
             )
         else:
@@ -224,7 +246,7 @@ def get_driver_standings_after_event(year: int, event_name: str):
 def get_constructor_standings_after_event(year: int, event_name: str):
     """Get constructor standings after a specific event."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         if schedule is None or schedule.empty:
             raise HTTPException(
                 status_code=404,
@@ -235,12 +257,7 @@ def get_constructor_standings_after_event(year: int, event_name: str):
                 }
             )
         
-        # Find event round
-        round_number = None
-        for _, event in schedule.iterrows():
-            if event_name.lower() in event['EventName'].lower():
-                round_number = event['RoundNumber']
-                break
+        round_number = event_resolver.round_number(year, event_name)
         
         if round_number is None:
             raise HTTPException(
@@ -252,11 +269,9 @@ def get_constructor_standings_after_event(year: int, event_name: str):
                 }
             )
             
-        ergast = Ergast()
-        standings_data = ergast.get_constructor_standings(season=year, round=round_number)
+        df = _get_standings("constructors", year, int(round_number))
         
-        if standings_data.content and not standings_data.content[0].empty:
-            df = standings_data.content[0]
+        if not df.empty:
             standings = []
             
             for _, row in df.iterrows():
@@ -302,3 +317,55 @@ def get_constructor_standings_after_event(year: int, event_name: str):
             }
         )
 
+
+def _progression_response(year: int, by: str, label: str) -> ResponseWrapper:
+    try:
+        progression = season_results.points_progression(year, by)
+        
+        if not progression["series"]:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "STANDINGS_NOT_FOUND",
+                    "message": f"No {label} points progression found for year {year}",
+                    "details": {}
+                }
+            )
+        
+        return ResponseWrapper(
+            data=progression,
+            meta={
+                "year": year,
+                "rounds": len(progression["rounds"]),
+                "count": len(progression["series"])
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "STANDINGS_ERROR",
+                "message": f"Could not retrieve {label} points progression for year {year}",
+                "details": {"error": str(e)}
+            }
+        )
+
+
+@router.get("/standings/{year}/drivers/progression", response_model=ResponseWrapper)
+def get_driver_points_progression(year: int):
+    """
+    Get every driver's cumulative points and championship position after each
+    round of the season (races plus sprints) in one response.
+    """
+    return _progression_response(year, "driver", "driver")
+
+
+@router.get("/standings/{year}/constructors/progression", response_model=ResponseWrapper)
+def get_constructor_points_progression(year: int):
+    """
+    Get every constructor's cumulative points and championship position after
+    each round of the season (races plus sprints) in one response.
+    """
+    return _progression_response(year, "team", "constructor")
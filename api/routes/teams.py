@@ -1,10 +1,15 @@
 """
 Team/Constructor endpoints.
 """
-from fastapi import APIRouter, HTTPException
-import fastf1
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import json
+import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.schedule import get_schedule
+from api.services.session_cache import session_cache
+from api.services.season_results import season_results, team_mask
 
 router = APIRouter()
 
@@ -13,7 +18,7 @@ router = APIRouter()
 def get_teams(year: int):
     """Get all teams for a year."""
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         if schedule is None or schedule.empty:
             raise HTTPException(
                 status_code=404,
@@ -24,43 +29,19 @@ def get_teams(year: int):
                 }
             )
         
-        # Get teams from first event's results
-        first_event = schedule.iloc[0]
-        try:
-            session = fastf1.get_session(year, first_event['EventName'], 'R')
-            session.load()
-            results = session.results
-            
-            if results is None or results.empty:
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "code": "TEAMS_NOT_FOUND",
-                        "message": f"No results found for year {year}",
-                        "details": {}
-                    }
-                )
-            
-            # Extract unique teams
-            teams = results[['TeamName', 'TeamColor']].drop_duplicates() if 'TeamName' in results.columns else []
-            teams_list = dataframe_to_dict_list(teams) if hasattr(teams, 'to_dict') else []
-            
-            return ResponseWrapper(
-                data=teams_list,
-                meta={
-                    "year": year,
-                    "count": len(teams_list)
-                }
-            )
-        except:
-            # Fallback: return empty list
-            return ResponseWrapper(
-                data=[],
-                meta={
-                    "year": year,
-                    "count": 0
-                }
-            )
+        teams = season_results.teams(year)
+        teams_list = [
+            {"TeamName": row['team_name'], "TeamColor": row['team_color'] if pd.notna(row['team_color']) else None}
+            for _, row in teams.iterrows()
+        ]
+        
+        return ResponseWrapper(
+            data=teams_list,
+            meta={
+                "year": year,
+                "count": len(teams_list)
+            }
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -78,9 +59,8 @@ def get_teams(year: int):
 def get_event_teams(year: int, event_name: str):
     """Get teams for a specific event."""
     try:
-        session = fastf1.get_session(year, event_name, 'R')
         # Load only results to speed up
-        session.load(weather=False, messages=False, telemetry=False, laps=False)
+        session = session_cache.get_session(year, event_name, 'R', laps=False, telemetry=False, weather=False, messages=False)
         results = session.results
         
         if results is None or results.empty:
@@ -117,11 +97,32 @@ def get_event_teams(year: int, event_name: str):
         )
 
 
+def _team_rows(team_results: pd.DataFrame) -> list:
+    return [
+        {
+            "round": int(result['round']),
+            "event_name": result['event_name'],
+            "driver": result['driver'] if pd.notna(result['driver']) else None,
+            "position": float(result['position']) if pd.notna(result['position']) else None,
+            "points": float(result['points']) if pd.notna(result['points']) else None
+        }
+        for _, result in team_results.iterrows()
+    ]
+
+
 @router.get("/teams/{year}/{team_name}/results", response_model=ResponseWrapper)
-def get_team_results(year: int, team_name: str):
-    """Get results for a specific team."""
+def get_team_results(
+    year: int,
+    team_name: str,
+    stream: bool = Query(False, description="Stream results as NDJSON, one line per result, as each race loads")
+):
+    """
+    Get results for a specific team.
+    Served from the season results table; races not in it yet, or stored
+    before their classification was final, are loaded in parallel.
+    """
     try:
-        schedule = fastf1.get_event_schedule(year)
+        schedule = get_schedule(year)
         if schedule is None or schedule.empty:
             raise HTTPException(
                 status_code=404,
@@ -132,26 +133,15 @@ def get_team_results(year: int, team_name: str):
                 }
             )
         
-        all_results = []
-        for _, event in schedule.iterrows():
-            try:
-                session = fastf1.get_session(year, event['EventName'], 'R')
-                # Load only results to speed up
-                session.load(weather=False, messages=False, telemetry=False, laps=False)
-                results = session.results
-                
-                if results is not None and not results.empty and 'TeamName' in results.columns:
-                    team_results = results[results['TeamName'].str.contains(team_name, case=False, na=False)]
-                    if not team_results.empty:
-                        for _, result in team_results.iterrows():
-                            all_results.append({
-                                "event_name": event['EventName'],
-                                "driver": result.get('Abbreviation'),
-                                "position": float(result.get('Position')) if result.get('Position') is not None else None,
-                                "points": float(result.get('Points')) if result.get('Points') is not None else None
-                            })
-            except:
-                continue
+        if stream:
+            def generate():
+                for results in season_results.iter_results(year):
+                    for row in _team_rows(results[team_mask(results, team_name)]):
+                        yield json.dumps(row) + "\n"
+            
+            return StreamingResponse(generate(), media_type="application/x-ndjson")
+        
+        all_results = _team_rows(season_results.team_results(year, team_name))
         
         return ResponseWrapper(
             data=all_results,
@@ -172,4 +162,3 @@ def get_team_results(year: int, team_name: str):
                 "details": {"error": str(e)}
             }
         )
-
@@ -3,13 +3,107 @@ Telemetry data endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.cancellation import checkpoint
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+from api.services.derived import telemetry_comparison
 
 router = APIRouter()
 
+MAX_COMPARED = 5
+
+
+# Declared before /telemetry/{year}/{event_name}/{driver} so "compare" is not taken for a driver
+@router.get("/telemetry/{year}/{event_name}/compare", response_model=ResponseWrapper)
+def compare_telemetry(
+    year: int,
+    event_name: str,
+    drivers: str = Query(..., description="Comma-separated drivers, e.g. VER,LEC"),
+    laps: Optional[str] = Query(None, description="Comma-separated lap numbers or 'fastest', one per driver or one for all (default: fastest)"),
+    session_type: str = Query("R", description="Session type: FP1, FP2, FP3, Q, R, S, SQ"),
+    points: int = Query(500, ge=50, le=5000, description="Number of points on the distance grid")
+):
+    """
+    Compare laps of several drivers on a shared distance grid.
+    Returns speed, throttle, RPM, gear, brake and DRS per driver aligned by
+    distance, plus each lap's elapsed time and its delta to the first driver.
+    """
+    requested = [d.strip() for d in drivers.split(",") if d.strip()]
+    lap_values = [l.strip().lower() for l in (laps or "fastest").split(",") if l.strip()]
+    if len(lap_values) == 1:
+        lap_values = lap_values * len(requested)
+    if not 2 <= len(requested) <= MAX_COMPARED or len(lap_values) != len(requested) \
+            or any(l != "fastest" and not l.isdigit() for l in lap_values):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_COMPARISON",
+                "message": f"Compare 2 to {MAX_COMPARED} drivers, with one lap number or 'fastest' for all or for each",
+                "details": {"drivers": requested, "laps": lap_values}
+            }
+        )
+
+    try:
+        session = session_cache.get_session(year, event_name, session_type.upper())
+        index = driver_index(session)
+
+        selected = []
+        for driver, lap in zip(requested, lap_values):
+            driver_num = index.number(driver)
+            driver_laps = index.laps(session, driver_num) if driver_num is not None else None
+            if driver_laps is None or driver_laps.empty:
+                raise HTTPException(
+                    status_code=404,
+                    detail={
+                        "code": "DRIVER_NOT_FOUND",
+                        "message": f"Driver '{driver}' not found in {event_name} {year}",
+                        "details": {}
+                    }
+                )
+            if lap == "fastest":
+                fastest = driver_laps.pick_fastest()
+                lap_number = int(fastest['LapNumber']) if fastest is not None and not fastest.empty else None
+            else:
+                lap_number = int(lap) if index.lap(session, driver_num, int(lap)) is not None else None
+            if lap_number is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail={
+                        "code": "LAP_NOT_FOUND",
+                        "message": f"Lap {lap} not found for driver {driver} in {event_name} {year}",
+                        "details": {}
+                    }
+                )
+            selected.append((driver_num, lap_number))
+
+        comparison = telemetry_comparison(session, tuple(selected), points)
+
+        return ResponseWrapper(
+            data=comparison,
+            meta={
+                "year": year,
+                "event_name": event_name,
+                "session_type": session_type.upper(),
+                "drivers": [lap["driver"] for lap in comparison["laps"]],
+                "laps": [lap["lap"] for lap in comparison["laps"]],
+                "points": len(comparison["distance"])
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "TELEMETRY_ERROR",
+                "message": f"Could not compare telemetry in {event_name} {year}",
+                "details": {"error": str(e)}
+            }
+        )
+
 
 @router.get("/telemetry/{year}/{event_name}/{driver}", response_model=ResponseWrapper)
 def get_driver_telemetry(
@@ -25,10 +119,9 @@ def get_driver_telemetry(
     Optionally filter by lap number.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
-        # Get driver's laps to identify driver number
+        # Telemetry is sliced from the driver's laps
         laps = session.laps
         
         if laps is None or laps.empty:
@@ -41,28 +134,24 @@ def get_driver_telemetry(
                 }
             )
         
-        # Find driver number
-        try:
-            driver_num = int(driver)
-        except ValueError:
-            # Not a number, try abbreviation
-            driver_laps = laps[laps['Driver'] == driver.upper()]
-            if driver_laps.empty:
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "code": "DRIVER_NOT_FOUND",
-                        "message": f"Driver '{driver}' not found in {event_name} {year}",
-                        "details": {}
-                    }
-                )
-            driver_num = driver_laps.iloc[0]['DriverNumber']
+        # Number, abbreviation or name
+        drivers = driver_index(session)
+        driver_num = drivers.number(driver)
+        if driver_num is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "DRIVER_NOT_FOUND",
+                    "message": f"Driver '{driver}' not found in {event_name} {year}",
+                    "details": {}
+                }
+            )
         
         # Get telemetry
         if lap is not None:
             # Get specific lap
-            lap_data = laps[(laps['DriverNumber'] == driver_num) & (laps['LapNumber'] == lap)]
-            if lap_data.empty:
+            lap_data = drivers.lap(session, driver_num, lap)
+            if lap_data is None:
                 raise HTTPException(
                     status_code=404,
                     detail={
@@ -71,10 +160,12 @@ def get_driver_telemetry(
                         "details": {}
                     }
                 )
-            telemetry = session.laps.pick_drivers(driver_num).pick_lap(lap).get_telemetry()
+            checkpoint("compute")
+            telemetry = lap_data.get_telemetry()
         else:
             # Get all telemetry for driver
-            telemetry = session.laps.pick_drivers(driver_num).get_telemetry()
+            checkpoint("compute")
+            telemetry = drivers.laps(session, driver_num).get_telemetry()
         
         if telemetry is None or telemetry.empty:
             raise HTTPException(
@@ -86,7 +177,7 @@ def get_driver_telemetry(
                 }
             )
         
-        telemetry_list = dataframe_to_dict_list(telemetry)
+        telemetry_list = dataframe_to_dict_list(telemetry, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=telemetry_list,
@@ -124,10 +215,9 @@ def get_car_data(
     Get car data (speed, throttle, brake, DRS, gear, etc.) for a specific driver.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
-        # Get driver's laps to identify driver number
+        # Telemetry is sliced from the driver's laps
         laps = session.laps
         
         if laps is None or laps.empty:
@@ -140,25 +230,22 @@ def get_car_data(
                 }
             )
         
-        # Find driver number
-        try:
-            driver_num = int(driver)
-        except ValueError:
-            # Not a number, try abbreviation
-            driver_laps = laps[laps['Driver'] == driver.upper()]
-            if driver_laps.empty:
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "code": "DRIVER_NOT_FOUND",
-                        "message": f"Driver '{driver}' not found in {event_name} {year}",
-                        "details": {}
-                    }
-                )
-            driver_num = driver_laps.iloc[0]['DriverNumber']
+        # Number, abbreviation or name
+        drivers = driver_index(session)
+        driver_num = drivers.number(driver)
+        if driver_num is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "DRIVER_NOT_FOUND",
+                    "message": f"Driver '{driver}' not found in {event_name} {year}",
+                    "details": {}
+                }
+            )
         
         # Get car data
-        car_data = session.laps.pick_drivers(driver_num).get_car_data()
+        checkpoint("compute")
+        car_data = drivers.laps(session, driver_num).get_car_data()
         
         if car_data is None or car_data.empty:
             raise HTTPException(
@@ -170,7 +257,7 @@ def get_car_data(
                 }
             )
         
-        car_data_list = dataframe_to_dict_list(car_data)
+        car_data_list = dataframe_to_dict_list(car_data, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=car_data_list,
@@ -208,30 +295,27 @@ def get_drs_data(
     Get DRS activation data for a specific driver.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
             raise HTTPException(status_code=404, detail={"code": "SESSION_DATA_NOT_FOUND", "message": "No session data found"})
             
-        # Find driver number
-        try:
-            driver_num = int(driver)
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
-            if driver_laps.empty:
-                raise HTTPException(status_code=404, detail={"code": "DRIVER_NOT_FOUND", "message": f"Driver {driver} not found"})
-            driver_num = driver_laps.iloc[0]['DriverNumber']
+        # Number, abbreviation or name
+        drivers = driver_index(session)
+        driver_num = drivers.number(driver)
+        if driver_num is None:
+            raise HTTPException(status_code=404, detail={"code": "DRIVER_NOT_FOUND", "message": f"Driver {driver} not found"})
             
         # Get telemetry
+        checkpoint("compute")
         if lap:
-            lap_data = laps[(laps['DriverNumber'] == driver_num) & (laps['LapNumber'] == lap)]
-            if lap_data.empty:
+            lap_data = drivers.lap(session, driver_num, lap)
+            if lap_data is None:
                 raise HTTPException(status_code=404, detail={"code": "LAP_NOT_FOUND", "message": f"Lap {lap} not found"})
-            telemetry = session.laps.pick_drivers(driver_num).pick_lap(lap).get_telemetry()
+            telemetry = lap_data.get_telemetry()
         else:
-            telemetry = session.laps.pick_drivers(driver_num).get_telemetry()
+            telemetry = drivers.laps(session, driver_num).get_telemetry()
             
         if telemetry is None or telemetry.empty or 'DRS' not in telemetry.columns:
              raise HTTPException(status_code=404, detail={"code": "TELEMETRY_NOT_FOUND", "message": "No DRS data found"})
@@ -240,7 +324,7 @@ def get_drs_data(
         drs_data = telemetry[['Date', 'Time', 'Distance', 'DRS']].copy()
         
         # Convert to list
-        drs_list = dataframe_to_dict_list(drs_data)
+        drs_list = dataframe_to_dict_list(drs_data, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=drs_list,
@@ -278,30 +362,27 @@ def get_speed_data(
     Get speed data for a specific driver.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
             raise HTTPException(status_code=404, detail={"code": "SESSION_DATA_NOT_FOUND", "message": "No session data found"})
             
-        # Find driver number
-        try:
-            driver_num = int(driver)
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
-            if driver_laps.empty:
-                raise HTTPException(status_code=404, detail={"code": "DRIVER_NOT_FOUND", "message": f"Driver {driver} not found"})
-            driver_num = driver_laps.iloc[0]['DriverNumber']
+        # Number, abbreviation or name
+        drivers = driver_index(session)
+        driver_num = drivers.number(driver)
+        if driver_num is None:
+            raise HTTPException(status_code=404, detail={"code": "DRIVER_NOT_FOUND", "message": f"Driver {driver} not found"})
             
         # Get telemetry
+        checkpoint("compute")
         if lap:
-            lap_data = laps[(laps['DriverNumber'] == driver_num) & (laps['LapNumber'] == lap)]
-            if lap_data.empty:
+            lap_data = drivers.lap(session, driver_num, lap)
+            if lap_data is None:
                 raise HTTPException(status_code=404, detail={"code": "LAP_NOT_FOUND", "message": f"Lap {lap} not found"})
-            telemetry = session.laps.pick_drivers(driver_num).pick_lap(lap).get_telemetry()
+            telemetry = lap_data.get_telemetry()
         else:
-            telemetry = session.laps.pick_drivers(driver_num).get_telemetry()
+            telemetry = drivers.laps(session, driver_num).get_telemetry()
             
         if telemetry is None or telemetry.empty or 'Speed' not in telemetry.columns:
              raise HTTPException(status_code=404, detail={"code": "TELEMETRY_NOT_FOUND", "message": "No speed data found"})
@@ -310,7 +391,7 @@ def get_speed_data(
         speed_data = telemetry[['Date', 'Time', 'Distance', 'Speed']].copy()
         
         # Convert to list
-        speed_list = dataframe_to_dict_list(speed_data)
+        speed_list = dataframe_to_dict_list(speed_data, check=lambda: checkpoint("serialize"))
         
         return ResponseWrapper(
             data=speed_list,
@@ -346,8 +427,7 @@ def get_telemetry_channels(
     Get available telemetry channels for a session.
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load(telemetry=True)
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -2,9 +2,9 @@
 Track status endpoints.
 """
 from fastapi import APIRouter, HTTPException
-import fastf1
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
@@ -31,8 +31,7 @@ def get_track_status(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'track_status') or session.track_status is None or session.track_status.empty:
             raise HTTPException(
@@ -77,8 +76,7 @@ def get_safety_car_periods(
 ):
     """Get all safety car periods."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'track_status') or session.track_status is None or session.track_status.empty:
             raise HTTPException(
@@ -126,8 +124,7 @@ def get_vsc_periods(
 ):
     """Get all Virtual Safety Car periods."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'track_status') or session.track_status is None or session.track_status.empty:
             raise HTTPException(
@@ -175,8 +172,7 @@ def get_red_flag_periods(
 ):
     """Get all red flag periods."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'track_status') or session.track_status is None or session.track_status.empty:
             raise HTTPException(
@@ -224,8 +220,7 @@ def get_yellow_flag_periods(
 ):
     """Get all yellow flag periods."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'track_status') or session.track_status is None or session.track_status.empty:
             raise HTTPException(
@@ -275,8 +270,7 @@ def get_session_status(
     Get session status data (Started, Finished, etc.).
     """
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'session_status') or session.session_status is None or session.session_status.empty:
             raise HTTPException(
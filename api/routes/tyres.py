@@ -2,10 +2,12 @@
 Tyre strategy endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
-import fastf1
 import pandas as pd
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+from api.services.derived import tyre_strategy
 
 router = APIRouter()
 
@@ -32,8 +34,7 @@ def get_tyre_compounds(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'Compound' not in laps.columns:
@@ -78,8 +79,7 @@ def get_tyre_strategy(
 ):
     """Get tyre strategy analysis for all drivers."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -92,31 +92,7 @@ def get_tyre_strategy(
                 }
             )
         
-        strategy = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver].sort_values('LapNumber')
-            driver_name = driver_laps.iloc[0]['Driver'] if 'Driver' in driver_laps.columns else None
-            
-            if 'Stint' in driver_laps.columns and 'Compound' in driver_laps.columns:
-                stints = []
-                for stint_num in driver_laps['Stint'].dropna().unique():
-                    stint_laps = driver_laps[driver_laps['Stint'] == stint_num]
-                    if not stint_laps.empty:
-                        stints.append({
-                            "stint": int(stint_num),
-                            "compound": stint_laps.iloc[0].get('Compound'),
-                            "start_lap": int(stint_laps['LapNumber'].min()),
-                            "end_lap": int(stint_laps['LapNumber'].max()),
-                            "laps": int(len(stint_laps)),
-                            "average_tyre_life": float(stint_laps['TyreLife'].mean()) if 'TyreLife' in stint_laps.columns and pd.notna(stint_laps['TyreLife']).any() else None
-                        })
-                
-                strategy.append({
-                    "driver_number": int(driver),
-                    "driver": driver_name,
-                    "total_stints": len(stints),
-                    "stints": stints
-                })
+        strategy = tyre_strategy(session)
         
         return ResponseWrapper(
             data=strategy,
@@ -149,8 +125,7 @@ def get_driver_stints(
 ):
     """Get stint information for a specific driver."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty:
@@ -163,14 +138,10 @@ def get_driver_stints(
                 }
             )
         
-        # Filter by driver
-        try:
-            driver_num = int(driver)
-            driver_laps = laps[laps['DriverNumber'] == driver_num]
-        except ValueError:
-            driver_laps = laps[laps['Driver'] == driver.upper()]
+        # Number, abbreviation or name
+        driver_laps = driver_index(session).laps(session, driver)
         
-        if driver_laps.empty:
+        if driver_laps is None or driver_laps.empty:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -180,7 +151,6 @@ def get_driver_stints(
                 }
             )
         
-        driver_laps = driver_laps.sort_values('LapNumber')
         stints = []
         
         if 'Stint' in driver_laps.columns and 'Compound' in driver_laps.columns:
@@ -227,8 +197,7 @@ def get_tyre_life_analysis(
 ):
     """Get tyre life vs performance analysis."""
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         laps = session.laps
         if laps is None or laps.empty or 'TyreLife' not in laps.columns:
@@ -242,8 +211,7 @@ def get_tyre_life_analysis(
             )
         
         analysis = []
-        for driver in laps['DriverNumber'].unique():
-            driver_laps = laps[laps['DriverNumber'] == driver]
+        for driver, driver_laps in driver_index(session).iter_laps(session):
             driver_name = driver_laps.iloc[0]['Driver'] if 'Driver' in driver_laps.columns else None
             
             if 'TyreLife' in driver_laps.columns and 'LapTime' in driver_laps.columns:
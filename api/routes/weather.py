@@ -3,9 +3,9 @@ Weather data endpoints.
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import fastf1
 from api.models.schemas import ResponseWrapper
 from utils.serialization import dataframe_to_dict_list, datetime_to_iso8601
+from api.services.session_cache import session_cache
 
 router = APIRouter()
 
@@ -33,8 +33,7 @@ def get_weather(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'weather_data') or session.weather_data is None or session.weather_data.empty:
             raise HTTPException(
@@ -118,8 +117,7 @@ def get_weather_summary(
         )
     
     try:
-        session = fastf1.get_session(year, event_name, session_type.upper())
-        session.load()
+        session = session_cache.get_session(year, event_name, session_type.upper())
         
         if not hasattr(session, 'weather_data') or session.weather_data is None or session.weather_data.empty:
             raise HTTPException(
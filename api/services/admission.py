@@ -0,0 +1,129 @@
+"""
+Admission control: separate concurrency limits and bounded queues per cost
+class of request, so a burst of expensive requests is shed early instead of
+piling up in the thread pool until the container runs out of memory.
+Lanes (see api/middleware/admission.py for how requests are classified):
+- telemetry: telemetry and car data, heavy even for a loaded session
+- season: aggregations over a whole season (driver and team lists, points
+  progression, head-to-heads, team results) and the historical endpoints, which may go to Ergast
+- session: requests that will load a session not in memory yet
+- light: everything else (metadata, loaded sessions, live state)
+A request that finds its lane's queue full, or waits longer than
+ADMISSION_QUEUE_TIMEOUT, is refused; the middleware answers 503 with a
+Retry-After derived from how long the lane's requests have been taking.
+"""
+import asyncio
+import math
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 15))
+
+# Lane -> (concurrent requests, queued requests)
+DEFAULT_LANES = {
+    "telemetry": (int(os.getenv("ADMISSION_TELEMETRY_LIMIT", 2)), int(os.getenv("ADMISSION_TELEMETRY_QUEUE", 8))),
+    "season": (int(os.getenv("ADMISSION_SEASON_LIMIT", 2)), int(os.getenv("ADMISSION_SEASON_QUEUE", 8))),
+    "session": (int(os.getenv("ADMISSION_SESSION_LIMIT", 4)), int(os.getenv("ADMISSION_SESSION_QUEUE", 16))),
+    "light": (int(os.getenv("ADMISSION_LIGHT_LIMIT", 32)), int(os.getenv("ADMISSION_LIGHT_QUEUE", 128))),
+}
+# Weight of the latest request in a lane's average duration
+_SMOOTHING = 0.2
+
+
+class Lane:
+    def __init__(self, name: str, limit: int, queue: int):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue = max(queue, 0)
+        self.running = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.avg_seconds: Optional[float] = None
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0, "timeouts": 0}
+
+    def retry_after(self) -> int:
+        """Seconds until the lane has likely worked through its queue."""
+        per_request = self.avg_seconds if self.avg_seconds is not None else 1.0
+        return min(max(math.ceil(per_request * (len(self.waiters) + 1) / self.limit), 1), 60)
+
+
+class AdmissionController:
+    def __init__(self, lanes: Dict[str, tuple] = DEFAULT_LANES, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")):
+        self.enabled = enabled
+        self.queue_timeout = queue_timeout
+        self.lanes = {name: Lane(name, limit, queue) for name, (limit, queue) in lanes.items()}
+
+    async def acquire(self, name: str) -> bool:
+        """Take a slot in a lane, waiting in its queue if needed; False when the request is shed."""
+        lane = self.lanes[name]
+        if lane.running < lane.limit and not lane.waiters:
+            lane.running += 1
+            lane.stats["admitted"] += 1
+            return True
+        if len(lane.waiters) >= lane.queue:
+            lane.stats["shed"] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        lane.stats["queued"] += 1
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not (waiter.done() and not waiter.cancelled()):
+                lane.stats["timeouts"] += 1
+                lane.stats["shed"] += 1
+                return False
+            # The slot was handed over as the wait timed out; it is ours now
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the client went away
+                self._hand_over(lane)
+            raise
+        finally:
+            if waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+        lane.stats["admitted"] += 1
+        return True
+
+    def release(self, name: str, seconds: float):
+        lane = self.lanes[name]
+        lane.avg_seconds = seconds if lane.avg_seconds is None else \
+            (1 - _SMOOTHING) * lane.avg_seconds + _SMOOTHING * seconds
+        self._hand_over(lane)
+
+    @staticmethod
+    def _hand_over(lane: Lane):
+        """Pass a finished request's slot to the next waiter, or free it."""
+        while lane.waiters:
+            waiter = lane.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        lane.running -= 1
+
+    def retry_after(self, name: str) -> int:
+        return self.lanes[name].retry_after()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queue_timeout_seconds": self.queue_timeout,
+            "lanes": {
+                name: dict(
+                    lane.stats,
+                    limit=lane.limit,
+                    queue=lane.queue,
+                    running=lane.running,
+                    waiting=len(lane.waiters),
+                    avg_seconds=round(lane.avg_seconds, 3) if lane.avg_seconds is not None else None,
+                )
+                for name, lane in self.lanes.items()
+            },
+        }
+
+
+# Global instance
+admission_controller = AdmissionController()
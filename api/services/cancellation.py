@@ -0,0 +1,141 @@
+"""
+Request-scoped cancellation.
+A client that gives up on a slow request (a cold session, a whole race of
+telemetry) used to leave the server loading, computing and serializing for
+nobody. Every HTTP request now carries a CancelToken, set by
+api/middleware/cancellation.py when the client disconnects. The token lives
+in a context variable, so it follows the request into Starlette's thread
+pool, and work checks it at cooperative checkpoints between stages:
+- load: waiting for the session, its worker prefetch or a load slot
+- compute: between drivers / laps of derived tables and telemetry
+- serialize: every few thousand rows of telemetry, position and lap responses
+A checkpoint in a cancelled request raises RequestCancelled. Work shared
+with other requests (a session load other callers are waiting on) is only
+given up once every one of its waiters is gone; see session_cache.
+Code running outside a request (prewarmer, live feed) has no token and is
+never cancelled.
+"""
+import contextvars
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often blocked waits (locks, worker results) look at their token
+CANCEL_POLL_SECONDS = float(os.getenv("CANCEL_POLL_SECONDS", 0.5))
+STAGES = ("load", "compute", "serialize")
+
+
+class RequestCancelled(BaseException):
+    """
+    The client of the current request went away. A BaseException, like
+    asyncio.CancelledError, so the routes' `except Exception` handlers let it
+    through instead of turning it into an error response.
+    """
+
+    def __init__(self, stage: str):
+        super().__init__(stage)
+        self.stage = stage
+
+
+class CancelToken:
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        # Batch sub-requests are cancelled with their batch
+        self.parent = parent
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def check(self, stage: str):
+        if self.cancelled:
+            raise RequestCancelled(stage)
+
+
+_current: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current.get()
+
+
+@contextmanager
+def bound(token: CancelToken) -> Iterator[CancelToken]:
+    """Make token the current request's token for the duration of the block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def checkpoint(stage: str):
+    """Raise RequestCancelled if the current request has been abandoned."""
+    token = _current.get()
+    if token is not None:
+        token.check(stage)
+
+
+def wait(acquire: Callable[[float], bool], stage: str, abandoned: Optional[Callable[[], bool]] = None):
+    """
+    Block on acquire(timeout) (a lock or semaphore's acquire, a future's wait)
+    until it returns True, giving up with RequestCancelled once abandoned()
+    does; by default, once the current request is cancelled.
+    """
+    if abandoned is None:
+        token = _current.get()
+        if token is None:
+            acquire(-1)
+            return
+        abandoned = lambda: token.cancelled
+    while not acquire(CANCEL_POLL_SECONDS):
+        if abandoned():
+            raise RequestCancelled(stage)
+
+
+@contextmanager
+def holding(lock, stage: str, abandoned: Optional[Callable[[], bool]] = None):
+    """`with lock:` that stops waiting when the request is abandoned."""
+    wait(lambda timeout: lock.acquire(timeout=timeout), stage, abandoned)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+class CancellationTracker:
+    def __init__(self, enabled: bool = os.getenv("CANCELLATION_ENABLED", "true").lower() in ("1", "true", "yes")):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"disconnects": 0, "aborted": 0}
+        self._aborted_at = {stage: 0 for stage in STAGES}
+
+    def record_disconnect(self):
+        with self._lock:
+            self._stats["disconnects"] += 1
+
+    def record_abort(self, path: str, stage: str):
+        logger.info(f"Client went away, stopped {path} during {stage}")
+        with self._lock:
+            self._stats["aborted"] += 1
+            self._aborted_at[stage] = self._aborted_at.get(stage, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                enabled=self.enabled,
+                poll_seconds=CANCEL_POLL_SECONDS,
+                aborted_at=dict(self._aborted_at),
+            )
+
+
+# Global instance
+cancellation = CancellationTracker()
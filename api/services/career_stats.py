@@ -0,0 +1,254 @@
+"""
+Driver career statistics and teammate head-to-heads, precomputed in memory
+from the local historical database.
+Each season's per-driver table (races, wins, podiums, poles, fastest laps,
+points, championship position) is built once and only rebuilt when the
+season is synced again, so a new round re-aggregates one season instead of
+the whole history. Career totals are the sum of the season tables.
+Poles and the qualifying head-to-head come from qualifying results; rounds
+the database has no qualifying for (Ergast has none before 1994) count a
+start from grid position 1 as the pole instead.
+Requests only read what the database holds: a season that isn't stored yet
+is handed to the background sync job and reported as unavailable.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from api.services.historical_db import historical_db, historical_sync
+
+logger = logging.getLogger(__name__)
+
+SEASON_COUNTS = ["races", "wins", "podiums", "poles", "fastest_laps", "dnfs"]
+# Ergast statuses for cars classified at the finish
+_CLASSIFIED = r"^(?:Finished|\+\d+ Laps?)$"
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows with native Python values and None for missing ones."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _poles(results: pd.DataFrame, qualifying: pd.DataFrame) -> pd.Series:
+    """Whether each result's driver took pole: qualified first, or started first where qualifying isn't stored."""
+    with_qualifying = results["round"].isin(qualifying["round"])
+    qualified = results[["round", "driverId"]].merge(
+        qualifying[["round", "driverId", "position"]], on=["round", "driverId"], how="left")["position"]
+    return pd.Series(qualified.eq(1).to_numpy(), index=results.index).where(with_qualifying, results["grid"].eq(1))
+
+
+def _season_table(results: pd.DataFrame, standings: pd.DataFrame, qualifying: pd.DataFrame) -> pd.DataFrame:
+    """One row per driver of a season; points and position come from the standings when stored."""
+    results = results.sort_values("round", kind="stable")
+    flags = results.assign(
+        win=results["position"].eq(1),
+        podium=results["position"].le(3),
+        pole=_poles(results, qualifying).astype(bool),
+        fastest_lap=results["fastestLapRank"].eq(1),
+        dnf=~results["status"].fillna("").str.match(_CLASSIFIED),
+    )
+    table = flags.groupby("driverId", sort=False).agg(
+        season=("season", "first"),
+        driver=("driverCode", "last"),
+        given_name=("givenName", "last"),
+        family_name=("familyName", "last"),
+        teams=("constructorName", lambda names: list(dict.fromkeys(names.dropna()))),
+        races=("round", "size"),
+        wins=("win", "sum"),
+        podiums=("podium", "sum"),
+        poles=("pole", "sum"),
+        fastest_laps=("fastest_lap", "sum"),
+        dnfs=("dnf", "sum"),
+        best_finish=("position", "min"),
+        race_points=("points", "sum"),
+    )
+
+    standings = standings.set_index("driverId")
+    table["points"] = standings["points"].reindex(table.index).fillna(table["race_points"])
+    table["championship_position"] = standings["position"].reindex(table.index)
+    table["champion"] = table["championship_position"].eq(1) & standings["complete"].reindex(table.index).eq(1)
+    return table.drop(columns="race_points").reset_index()
+
+
+def _qualifying_pairs(qualifying: pd.DataFrame) -> pd.DataFrame:
+    """Qualifying sessions every pair of teammates shared, and how often each qualified ahead."""
+    rows = qualifying[["round", "driverId", "constructorId", "position"]].dropna(subset=["position"])
+    pairs = rows.merge(rows, on=["round", "constructorId"], suffixes=("", "_mate"))
+    pairs = pairs[pairs["driverId"] != pairs["driverId_mate"]]
+    pairs = pairs.assign(qualifying_ahead=pairs["position"] < pairs["position_mate"])
+    return pairs.groupby(["driverId", "driverId_mate"], sort=False).agg(
+        qualifying=("round", "size"), qualifying_ahead=("qualifying_ahead", "sum"),
+    ).reset_index()
+
+
+def _teammate_matrix(results: pd.DataFrame, qualifying: pd.DataFrame) -> Dict[str, Any]:
+    """For every pair of teammates: shared races and qualifyings, and who finished, qualified and started ahead."""
+    rows = results[["round", "driverId", "driverCode", "constructorId", "constructorName", "position", "grid"]]
+    # Pit lane starts (grid 0) line up behind everyone
+    rows = rows.assign(start=rows["grid"].where(rows["grid"] > 0, 999))
+    pairs = rows.merge(rows[["round", "constructorId", "driverId", "position", "start"]],
+                       on=["round", "constructorId"], suffixes=("", "_mate"))
+    pairs = pairs[pairs["driverId"] != pairs["driverId_mate"]]
+    pairs = pairs.assign(race_ahead=pairs["position"] < pairs["position_mate"],
+                         grid_ahead=pairs["start"] < pairs["start_mate"])
+    summary = pairs.groupby(["driverId", "driverId_mate", "constructorName"], sort=False).agg(
+        races=("round", "size"), race_ahead=("race_ahead", "sum"), grid_ahead=("grid_ahead", "sum"),
+    ).reset_index()
+
+    matrix: Dict[str, Dict[str, Any]] = {}
+    for row in summary.itertuples(index=False):
+        entry = matrix.setdefault(row.driverId, {}).setdefault(
+            row.driverId_mate, {"teams": [], "races": 0, "race_ahead": 0, "grid_ahead": 0})
+        entry["teams"].append(row.constructorName)
+        entry["races"] += int(row.races)
+        entry["race_ahead"] += int(row.race_ahead)
+        entry["grid_ahead"] += int(row.grid_ahead)
+    qualifying_pairs = _qualifying_pairs(qualifying).set_index(["driverId", "driverId_mate"])
+    for driver_id, mates in matrix.items():
+        for mate_id, entry in mates.items():
+            entry["race_behind"] = entry["races"] - entry["race_ahead"]
+            entry["grid_behind"] = entry["races"] - entry["grid_ahead"]
+            shared = qualifying_pairs.loc[(driver_id, mate_id)] if (driver_id, mate_id) in qualifying_pairs.index else None
+            entry["qualifying"] = int(shared["qualifying"]) if shared is not None else 0
+            entry["qualifying_ahead"] = int(shared["qualifying_ahead"]) if shared is not None else 0
+            entry["qualifying_behind"] = entry["qualifying"] - entry["qualifying_ahead"]
+
+    drivers = rows.drop_duplicates("driverId", keep="last").set_index("driverId")
+    return {
+        "drivers": {
+            driver_id: {"driver": drivers.at[driver_id, "driverCode"], "team": drivers.at[driver_id, "constructorName"]}
+            for driver_id in matrix
+        },
+        "matrix": matrix,
+    }
+
+
+class CareerStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Season -> (last round, sync time) the tables below were built from
+        self._versions: Dict[int, Tuple] = {}
+        self._results: Dict[int, pd.DataFrame] = {}
+        self._qualifying: Dict[int, pd.DataFrame] = {}
+        self._seasons: Dict[int, pd.DataFrame] = {}
+        self._teammates: Dict[int, Dict[str, Any]] = {}
+        self._career: Optional[pd.DataFrame] = None
+
+    def _stored(self, year: int, round_number: Optional[int] = None) -> bool:
+        """Whether the database holds the season up to the round; if not, the sync job is asked for it."""
+        if historical_db.has_round(year, round_number):
+            return True
+        historical_sync.request(year)
+        return False
+
+    def _refresh(self):
+        """Rebuild the tables of seasons synced since the last call, then the career totals."""
+        versions = historical_db.season_versions()
+        with self._lock:
+            changed = [season for season, version in versions.items() if self._versions.get(season) != version]
+            if not changed and self._career is not None:
+                return
+            if changed:
+                results = historical_db.results_frame(changed)
+                qualifying = historical_db.qualifying_frame(changed)
+                standings = historical_db.final_standings_frame(changed)
+                for season in changed:
+                    season_results = results[results["season"] == season]
+                    season_qualifying = qualifying[qualifying["season"] == season]
+                    self._results[season] = season_results
+                    self._qualifying[season] = season_qualifying
+                    self._teammates.pop(season, None)
+                    if season_results.empty:
+                        self._seasons.pop(season, None)
+                    else:
+                        self._seasons[season] = _season_table(
+                            season_results, standings[standings["season"] == season], season_qualifying)
+                    self._versions[season] = versions[season]
+                logger.info(f"Career stats rebuilt for {len(changed)} season(s)")
+            self._career = self._build_career()
+
+    def _build_career(self) -> pd.DataFrame:
+        if not self._seasons:
+            return pd.DataFrame()
+        seasons = pd.concat(self._seasons.values(), ignore_index=True).sort_values("season", kind="stable")
+        return seasons.groupby("driverId", sort=False).agg(
+            driver=("driver", "last"),
+            given_name=("given_name", "last"),
+            family_name=("family_name", "last"),
+            first_season=("season", "min"),
+            last_season=("season", "max"),
+            seasons=("season", "size"),
+            **{column: (column, "sum") for column in SEASON_COUNTS},
+            points=("points", "sum"),
+            titles=("champion", "sum"),
+            best_finish=("best_finish", "min"),
+            best_championship_position=("championship_position", "min"),
+        ).reset_index()
+
+    def career(self, driver_id: str) -> Optional[Dict[str, Any]]:
+        """Career totals and the per-season rows of one driver, None if the driver is unknown."""
+        self._refresh()
+        # A snapshot, so a rebuild running meanwhile can't change the tables under the loop
+        with self._lock:
+            career = self._career
+            tables = list(self._seasons.values())
+        if career.empty or driver_id not in set(career["driverId"]):
+            return None
+        totals = _records(career[career["driverId"] == driver_id])[0]
+        seasons = pd.concat([table[table["driverId"] == driver_id] for table in tables])
+        return {"career": totals, "seasons": _records(seasons.sort_values("season"))}
+
+    def leaderboard(self, sort: str = "wins", limit: int = 50) -> List[Dict[str, Any]]:
+        self._refresh()
+        if self._career.empty:
+            return []
+        return _records(self._career.sort_values([sort, "points"], ascending=False).head(limit))
+
+    def season(self, year: int) -> Optional[List[Dict[str, Any]]]:
+        """Per-driver table of one season, None until the season is stored."""
+        if not self._stored(year):
+            return None
+        self._refresh()
+        table = self._seasons.get(year)
+        if table is None:
+            return None
+        return _records(table.sort_values(["points", "wins"], ascending=False))
+
+    def teammates(self, year: int) -> Optional[Dict[str, Any]]:
+        """Teammate head-to-head matrix of a season, None until the season is stored."""
+        if not self._stored(year):
+            return None
+        self._refresh()
+        with self._lock:
+            if year not in self._teammates:
+                results = self._results.get(year)
+                if results is None or results.empty:
+                    return None
+                self._teammates[year] = _teammate_matrix(results, self._qualifying.get(year, results.iloc[:0]))
+            return self._teammates[year]
+
+    def podiums(self, year: int, round_number: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        Podium count per Ergast driverId over a season, optionally up to a
+        round. None when the database doesn't hold those rounds yet, rather
+        than counts that would read as zero podiums.
+        """
+        if not self._stored(year, round_number):
+            return None
+        try:
+            self._refresh()
+        except Exception as e:
+            logger.warning(f"Podiums for {year} unavailable: {e}")
+            return None
+        results = self._results.get(year)
+        if results is None:
+            return None
+        if round_number is not None:
+            results = results[results["round"] <= round_number]
+        return results[results["position"].le(3)].groupby("driverId").size().to_dict()
+
+
+# Global instance
+career_stats = CareerStats()
@@ -0,0 +1,153 @@
+"""
+Session-wide derived tables that several requests (and the prewarmer) need.
+Each is computed once per cached session through session_cache.derived();
+routes filter the result instead of recomputing it.
+"""
+import os
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.services.cancellation import checkpoint
+from api.services.session_cache import session_cache
+from api.services.driver_index import driver_index
+
+
+def gap_table(session) -> list:
+    """Gap to the leader for every driver and lap of the session."""
+    def compute():
+        laps = session.laps
+        if laps is None or laps.empty:
+            return []
+
+        leader_laps = laps[laps['Position'] == 1]
+        if leader_laps.empty:
+            return []
+
+        gaps = []
+        for driver, driver_laps in driver_index(session).iter_laps(session):
+            checkpoint("compute")
+            for _, driver_lap in driver_laps.iterrows():
+                lap_num = driver_lap['LapNumber']
+                leader_lap = leader_laps[leader_laps['LapNumber'] == lap_num]
+
+                if not leader_lap.empty and pd.notna(driver_lap.get('LapTime')) and pd.notna(leader_lap.iloc[0].get('LapTime')):
+                    gap = (driver_lap['LapTime'] - leader_lap.iloc[0]['LapTime']).total_seconds()
+                    gaps.append({
+                        "driver_number": int(driver),
+                        "driver": driver_lap.get('Driver'),
+                        "lap": int(lap_num),
+                        "position": float(driver_lap.get('Position')) if pd.notna(driver_lap.get('Position')) else None,
+                        "gap_to_leader_seconds": gap
+                    })
+        return gaps
+
+    return session_cache.derived(session, "gaps", compute)
+
+
+def tyre_strategy(session) -> list:
+    """Stints of every driver in the session."""
+    def compute():
+        laps = session.laps
+        if laps is None or laps.empty:
+            return []
+
+        strategy = []
+        for driver, driver_laps in driver_index(session).iter_laps(session):
+            checkpoint("compute")
+            driver_name = driver_laps.iloc[0]['Driver'] if 'Driver' in driver_laps.columns else None
+
+            if 'Stint' in driver_laps.columns and 'Compound' in driver_laps.columns:
+                stints = []
+                for stint_num in driver_laps['Stint'].dropna().unique():
+                    stint_laps = driver_laps[driver_laps['Stint'] == stint_num]
+                    if not stint_laps.empty:
+                        stints.append({
+                            "stint": int(stint_num),
+                            "compound": stint_laps.iloc[0].get('Compound'),
+                            "start_lap": int(stint_laps['LapNumber'].min()),
+                            "end_lap": int(stint_laps['LapNumber'].max()),
+                            "laps": int(len(stint_laps)),
+                            "average_tyre_life": float(stint_laps['TyreLife'].mean()) if 'TyreLife' in stint_laps.columns and pd.notna(stint_laps['TyreLife']).any() else None
+                        })
+
+                strategy.append({
+                    "driver_number": int(driver),
+                    "driver": driver_name,
+                    "total_stints": len(stints),
+                    "stints": stints
+                })
+        return strategy
+
+    return session_cache.derived(session, "strategy", compute)
+
+
+def fastest_lap(session):
+    """Fastest lap of the session as returned by Laps.pick_fastest()."""
+    def compute():
+        laps = session.laps
+        if laps is None or laps.empty:
+            return None
+        return laps.pick_fastest()
+
+    return session_cache.derived(session, "fastest_lap", compute)
+
+
+# Comparisons memoised per cached session; each is a few hundred kB of JSON-ready lists
+COMPARISON_CACHE_SIZE = int(os.getenv("COMPARISON_CACHE_SIZE", 16))
+
+# Channels sampled continuously are interpolated; stepped ones take the last sample at or before each point
+COMPARE_CHANNELS = {"speed": "Speed", "throttle": "Throttle", "rpm": "RPM"}
+COMPARE_STEPPED = {"gear": "nGear", "brake": "Brake", "drs": "DRS"}
+
+
+def telemetry_comparison(session, laps: Tuple[Tuple[str, int], ...], points: int = 500) -> Dict[str, Any]:
+    """
+    Car data of several laps on one distance grid, with each lap's time delta
+    to the first. `laps` are (driver number, lap number) pairs.
+    """
+    def compute():
+        drivers = driver_index(session)
+        traces = []
+        for number, lap_number in laps:
+            checkpoint("compute")
+            lap = drivers.lap(session, number, lap_number)
+            car_data = lap.get_car_data().add_distance()
+            traces.append((number, lap, car_data))
+
+        # Up to the shortest lap, so every trace is interpolated rather than extrapolated
+        length = min(float(car_data['Distance'].iloc[-1]) for _, _, car_data in traces)
+        grid = np.linspace(0.0, length, points)
+
+        compared = []
+        reference_time = None
+        for number, lap, car_data in traces:
+            distance = car_data['Distance'].to_numpy(dtype=float)
+            time = np.interp(grid, distance, car_data['Time'].dt.total_seconds().to_numpy())
+            if reference_time is None:
+                reference_time = time
+            steps = np.clip(np.searchsorted(distance, grid, side="right") - 1, 0, len(distance) - 1)
+            channels = {
+                name: np.round(np.interp(grid, distance, car_data[column].to_numpy(dtype=float)), 2).tolist()
+                for name, column in COMPARE_CHANNELS.items() if column in car_data.columns
+            }
+            channels.update({
+                name: car_data[column].to_numpy()[steps].astype(int).tolist()
+                for name, column in COMPARE_STEPPED.items() if column in car_data.columns
+            })
+            lap_time = lap['LapTime'].iloc[0]
+            compared.append({
+                "driver": drivers.abbreviation(number),
+                "driver_number": int(number),
+                "lap": int(lap['LapNumber'].iloc[0]),
+                "lap_time_seconds": lap_time.total_seconds() if pd.notna(lap_time) else None,
+                "time": np.round(time, 3).tolist(),
+                "delta": np.round(time - reference_time, 3).tolist(),
+                "channels": channels,
+            })
+
+        return {"distance": np.round(grid, 1).tolist(), "reference": compared[0]["driver"], "laps": compared}
+
+    return session_cache.derived_lru(session, "telemetry_comparison", (laps, points), compute,
+                                     COMPARISON_CACHE_SIZE)
@@ -0,0 +1,127 @@
+"""
+Per-session driver lookups.
+Routes accept a driver as number, abbreviation or name, and each used to
+resolve it by scanning the laps or results frame, then filtered the laps
+again for the driver's rows. The index is built once per cached session
+(through session_cache.derived) and maps every identifier to the driver
+number, so lookups are dict hits; the driver's laps are a slice of the
+session's lap partition (see session_cache.LapPartition).
+
+The index keeps positions, not frames: the session cache carries derived
+tables over to a session object loaded with more data, so accessors take
+the session they should slice.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from api.services.event_resolver import normalize
+from api.services.session_cache import session_cache
+
+
+class DriverIndex:
+    def __init__(self, session):
+        self._numbers: Dict[str, str] = {}
+        self._abbreviations: Dict[str, str] = {}
+        self._lap_numbers: Dict[str, Dict[int, int]] = {}
+
+        try:
+            results = session.results
+        except Exception:
+            results = None
+        partition = session_cache.lap_partition(session)
+
+        ambiguous = set()
+        names: Dict[str, str] = {}
+        if results is not None and not results.empty:
+            for _, row in results.iterrows():
+                number = str(row.get('DriverNumber', ''))
+                if not number:
+                    continue
+                self._add(number, number)
+                abbreviation = row.get('Abbreviation')
+                if isinstance(abbreviation, str) and abbreviation:
+                    self._abbreviations[number] = abbreviation
+                    self._add(abbreviation, number)
+                for column in ('LastName', 'FullName', 'BroadcastName'):
+                    name = normalize(row.get(column) or '')
+                    if not name:
+                        continue
+                    if names.get(name, number) != number:
+                        ambiguous.add(name)
+                    names[name] = number
+        for name, number in names.items():
+            if name not in ambiguous:
+                self._numbers.setdefault(name, number)
+
+        if partition is not None:
+            lap_numbers = partition.laps['LapNumber'].to_numpy()
+            abbreviations = partition.laps['Driver'].to_numpy()
+            for number, (start, stop) in partition.offsets.items():
+                # Offsets within the driver's slice
+                self._lap_numbers[number] = {
+                    int(lap_number): offset for offset, lap_number in enumerate(lap_numbers[start:stop]) if pd.notna(lap_number)
+                }
+                # Drivers missing from the results still resolve through their laps
+                self._add(number, number)
+                abbreviation = abbreviations[start]
+                if isinstance(abbreviation, str) and abbreviation:
+                    self._abbreviations.setdefault(number, abbreviation)
+                    self._add(abbreviation, number)
+
+    def _add(self, identifier: str, number: str):
+        self._numbers.setdefault(normalize(identifier), number)
+
+    def number(self, driver) -> Optional[str]:
+        """Driver number (as FastF1 keys it, e.g. "1") for a number, abbreviation or name."""
+        key = normalize(driver)
+        if key.isdigit():
+            key = str(int(key))
+        return self._numbers.get(key)
+
+    def abbreviation(self, number: str) -> Optional[str]:
+        return self._abbreviations.get(number)
+
+    def drivers(self) -> List[str]:
+        """Numbers of the drivers with laps, in session order."""
+        return list(self._lap_numbers)
+
+    def laps(self, session, driver):
+        """The driver's laps in lap order; None if the driver is unknown."""
+        number = self.number(driver)
+        if number is None:
+            return None
+        partition = session_cache.lap_partition(session)
+        driver_laps = partition.driver(number) if partition is not None else None
+        return driver_laps if driver_laps is not None else session.laps.iloc[0:0]
+
+    def lap(self, session, driver, lap_number: int):
+        """One lap of the driver as a single-row Laps; None if there is no such lap."""
+        number = self.number(driver)
+        offset = self._lap_numbers.get(number, {}).get(int(lap_number)) if number is not None else None
+        if offset is None:
+            return None
+        return session_cache.lap_partition(session).driver(number).iloc[[offset]]
+
+    def iter_laps(self, session) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """(number, laps in lap order) for every driver with laps."""
+        partition = session_cache.lap_partition(session)
+        return iter(partition) if partition is not None else iter(())
+
+    def car_data(self, session, driver):
+        number = self.number(driver)
+        return session.car_data.get(number) if number is not None else None
+
+    def pos_data(self, session, driver):
+        number = self.number(driver)
+        return session.pos_data.get(number) if number is not None else None
+
+
+def driver_index(session) -> DriverIndex:
+    """The session's driver index, built once per cached session."""
+    try:
+        has_laps = not session.laps.empty
+    except Exception:
+        has_laps = False
+    # An index built before laps were loaded must not be carried over to the upgraded session
+    return session_cache.derived(session, ("driver_index", has_laps), lambda: DriverIndex(session))
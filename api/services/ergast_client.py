@@ -0,0 +1,223 @@
+"""
+Shared access layer for the Ergast (jolpica) API.
+Every Ergast query of the app goes through one pooled HTTP session. Responses
+are cached on disk: permanently for past seasons, for a short TTL otherwise.
+Requests are paced by a token bucket that matches the upstream rate limit, so
+bursts queue here instead of tripping 429s, and identical in-flight calls are
+coalesced into one upstream request. Point ERGAST_BASE_URL at a local
+stand-in server to test without the real API.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import fastf1
+from fastf1.ergast import Ergast
+from fastf1.ergast import interface as ergast_interface
+
+logger = logging.getLogger(__name__)
+
+ERGAST_BASE_URL = os.getenv("ERGAST_BASE_URL", ergast_interface.BASE_URL).rstrip("/")
+ERGAST_CACHE_DIR = os.getenv("ERGAST_CACHE_DIR", os.path.join("data", "ergast_cache"))
+# Seconds a response about the running season (or "current") is reused
+ERGAST_CURRENT_TTL = float(os.getenv("ERGAST_CURRENT_TTL", 600))
+# jolpica allows 4 requests per second in bursts of 4 for anonymous clients
+ERGAST_RATE_LIMIT = float(os.getenv("ERGAST_RATE_LIMIT", 4))
+ERGAST_BURST = int(os.getenv("ERGAST_BURST", 4))
+ERGAST_TIMEOUT = float(os.getenv("ERGAST_TIMEOUT", 10))
+ERGAST_POOL_SIZE = int(os.getenv("ERGAST_POOL_SIZE", 8))
+
+_SEASON = re.compile(r"^/(\d{4})(?:/|\.json)")
+
+
+class TokenBucket:
+    """Rate limiter handing out reservations in arrival order."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is the queue of callers ahead of this one
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class ErgastClient:
+    def __init__(self, base_url: str = ERGAST_BASE_URL, cache_dir: Optional[str] = ERGAST_CACHE_DIR,
+                 current_ttl: float = ERGAST_CURRENT_TTL, rate_limit: float = ERGAST_RATE_LIMIT,
+                 burst: int = ERGAST_BURST):
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.current_ttl = current_ttl
+        self.limiter = TokenBucket(rate_limit, burst)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = f"FastF1-API (FastF1/{fastf1.__version__})"
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=ERGAST_POOL_SIZE, pool_maxsize=ERGAST_POOL_SIZE, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"disk_hits": 0, "coalesced": 0, "requests": 0, "errors": 0, "throttled_seconds": 0.0}
+
+    def _ttl(self, path: str) -> Optional[float]:
+        """None (forever) for past seasons, the current-season TTL for anything else."""
+        match = _SEASON.match(path)
+        if match and int(match.group(1)) < datetime.now().year:
+            return None
+        return self.current_ttl
+
+    def _cache_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".json")
+
+    def _read_cache(self, key: str, ttl: Optional[float]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(key)
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_cache(self, key: str, text: str):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write Ergast cache entry: {e}")
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET base_url + path (e.g. "/2023/results.json") and return the decoded
+        JSON. Every caller decodes its own copy, since fastf1 consumes it.
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        key = path + ("?" + urlencode(sorted(params.items())) if params else "")
+
+        text = self._read_cache(key, self._ttl(path))
+        if text is not None:
+            try:
+                data = json.loads(text)
+            except ValueError:
+                # Truncated entry; fetch it again
+                pass
+            else:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                return data
+        return json.loads(self._fetch_once(key, path, params))
+
+    def _fetch_once(self, key: str, path: str, params: Dict[str, Any]) -> str:
+        """Fetch a response body, sharing one upstream request between concurrent callers."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            text = self._fetch(path, params)
+            self._write_cache(key, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _fetch(self, path: str, params: Dict[str, Any]) -> str:
+        started = time.monotonic()
+        self.limiter.acquire()
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["throttled_seconds"] += waited
+
+        response = self.session.get(self.base_url + path, params=params, timeout=ERGAST_TIMEOUT)
+        if response.status_code != 200:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise ergast_interface.ErgastInvalidRequestError(
+                f"Invalid request to Ergast ({response.url})\nServer response: '{response.reason}'"
+            )
+        try:
+            json.loads(response.text)
+            return response.text
+        except ValueError as exc:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise ergast_interface.ErgastJsonError(f"Failed to parse Ergast response ({response.url})") from exc
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                throttled_seconds=round(self._stats["throttled_seconds"], 2),
+                in_flight=len(self._inflight),
+                base_url=self.base_url,
+                cache_dir=self.cache_dir,
+            )
+
+
+# Global instance
+ergast_client = ErgastClient()
+
+
+class CachedErgast(Ergast):
+    """fastf1's Ergast interface with its HTTP calls routed through ergast_client."""
+
+    @staticmethod
+    def _build_url(*args, **kwargs) -> str:
+        url = Ergast._build_url(*args, **kwargs)
+        return url[len(ergast_interface.BASE_URL):]
+
+    @classmethod
+    def _get(cls, url: str, params: dict):
+        return ergast_client.get_json(url, params)
+
+
+# Shared interface used by every route
+ergast = CachedErgast()
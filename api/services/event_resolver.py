@@ -0,0 +1,151 @@
+"""
+Event name resolution shared by every router.
+Each season gets an index built once from its schedule that maps normalised
+event names, short names ("italian"), locations ("monza"), countries,
+official names and round numbers to the event. Lookups try an exact key,
+then a substring, then a difflib fuzzy match, and every answer (including
+misses) is memoised per season, so "monza", "Italian Grand Prix" and "13"
+all resolve to round 13 without scanning the schedule again.
+Ambiguity is a miss rather than a guess: a country or location shared by
+several rounds ("italy") matches none of them, and the substring step ignores
+words every event shares ("grand prix", "formula") and only answers when
+exactly one event contains the rest.
+The index is rebuilt whenever the schedule cache hands out a new schedule.
+"""
+import difflib
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from api.services.schedule import get_schedule
+
+# Columns indexed, in order of precedence when two events share a key
+KEY_COLUMNS = ("EventName", "Location", "Country", "OfficialEventName")
+FUZZY_CUTOFF = 0.8
+# Shorter queries only match exactly; "a" should not pick the first event containing an a
+MIN_SUBSTRING = 3
+MAX_MEMOISED = 1024
+
+_SUFFIX = re.compile(r"\s+(?:grand prix|gp)$")
+# Words common to most event names, dropped before the substring step
+GENERIC_WORDS = frozenset({"grand", "prix", "formula", "gp"})
+
+
+def normalize(name) -> str:
+    """Lowercase, accents and punctuation stripped, single spaces ("São Paulo GP" -> "sao paulo gp")."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def _distinctive(key: str) -> str:
+    """A normalised name without its generic words ("italian grand prix" -> "italian")."""
+    return " ".join(word for word in key.split() if word not in GENERIC_WORDS)
+
+
+class EventIndex:
+    def __init__(self, schedule: pd.DataFrame):
+        self.schedule = schedule
+        # Keys map to schedule rows; testing events share round 0, so rounds can't be the key
+        self.events: Dict[int, pd.Series] = {}
+        self._rounds: Dict[int, int] = {}
+        self._keys: Dict[str, int] = {}
+        # Keys of several championship rounds, e.g. a country hosting two races
+        self._ambiguous: set = set()
+        self._matches: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+        for position, (_, event) in enumerate(schedule.iterrows()):
+            self.events[position] = event
+            if event.get("RoundNumber", 0) > 0:
+                self._rounds[int(event["RoundNumber"])] = position
+        # Championship rounds take precedence over testing for shared keys (country, location)
+        rounds = set(self._rounds.values())
+        ordered = sorted(self.events, key=lambda position: position not in rounds)
+        for column in KEY_COLUMNS:
+            # A column only claims keys no earlier column did: an event named "United States
+            # Grand Prix" owns "united states", although two more rounds are held in that country
+            claims: Dict[str, List[int]] = {}
+            for position in ordered:
+                key = normalize(self.events[position].get(column, "") or "")
+                if key:
+                    for candidate in dict.fromkeys((key, _SUFFIX.sub("", key))):
+                        if candidate and position not in claims.setdefault(candidate, []):
+                            claims[candidate].append(position)
+            for key, positions in claims.items():
+                if key in self._keys or key in self._ambiguous:
+                    continue
+                if len([position for position in positions if position in rounds]) > 1:
+                    self._ambiguous.add(key)
+                else:
+                    self._keys[key] = positions[0]
+        self._key_list: List[str] = list(self._keys)
+        self._distinctive_keys = [(_distinctive(key), position) for key, position in self._keys.items()]
+
+    def match(self, name) -> Optional[int]:
+        """Position in the schedule of the event a name refers to."""
+        query = normalize(name)
+        with self._lock:
+            if query in self._matches:
+                return self._matches[query]
+        position = self._match(query)
+        with self._lock:
+            if len(self._matches) >= MAX_MEMOISED:
+                self._matches.clear()
+            self._matches[query] = position
+        return position
+
+    def _match(self, query: str) -> Optional[int]:
+        if not query:
+            return None
+        if query.isdigit():
+            return self._rounds.get(int(query))
+        short = _SUFFIX.sub("", query)
+        for candidate in (query, short):
+            if candidate in self._keys:
+                return self._keys[candidate]
+            if candidate in self._ambiguous:
+                return None
+        core = _distinctive(query)
+        if not core:
+            return None
+        if len(core) >= MIN_SUBSTRING:
+            containing = {position for key, position in self._distinctive_keys if core in key}
+            if len(containing) == 1:
+                return containing.pop()
+        close = difflib.get_close_matches(query, self._key_list, n=1, cutoff=FUZZY_CUTOFF)
+        return self._keys[close[0]] if close else None
+
+
+class EventResolver:
+    def __init__(self):
+        self._indexes: Dict[int, EventIndex] = {}
+        self._lock = threading.Lock()
+
+    def index(self, year: int) -> EventIndex:
+        schedule = get_schedule(year)
+        with self._lock:
+            index = self._indexes.get(year)
+            if index is None or index.schedule is not schedule:
+                index = self._indexes[year] = EventIndex(schedule)
+            return index
+
+    def resolve(self, year: int, event) -> Optional[pd.Series]:
+        """Schedule row of the event a name, location, country or round number refers to."""
+        index = self.index(year)
+        position = index.match(event)
+        return index.events[position] if position is not None else None
+
+    def round_number(self, year: int, event) -> Optional[int]:
+        """Championship round of the event; None for testing events and names that match nothing."""
+        matched = self.resolve(year, event)
+        if matched is None or not matched.get("RoundNumber", 0) > 0:
+            return None
+        return int(matched["RoundNumber"])
+
+
+# Global instance
+event_resolver = EventResolver()
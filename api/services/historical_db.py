@@ -0,0 +1,516 @@
+"""
+Local store of the Ergast history for the /historical endpoints.
+A one-shot ingest pulls every season from Ergast into an SQLite database;
+the routes then answer from indexed local tables and only fall back to
+Ergast for what is not stored yet. A background job keeps the current
+season in step, fetching only the rounds added since the last sync.
+
+    python -m api.services.historical_db ingest [--from 1950] [--to 2024] [--force]
+    python -m api.services.historical_db sync [--season 2025]
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from pydantic_core import to_jsonable_python
+
+from api.services.ergast_client import ergast
+from utils.serialization import datetime_to_iso8601
+
+logger = logging.getLogger(__name__)
+
+HISTORICAL_DB_PATH = os.getenv("HISTORICAL_DB_PATH", os.path.join("data", "historical.db"))
+FIRST_SEASON = 1950
+# Largest page the Ergast API hands out
+PAGE_SIZE = 100
+
+DRIVER_COLUMNS = ["driverId", "driverNumber", "driverCode", "driverUrl", "givenName", "familyName",
+                  "dateOfBirth", "driverNationality"]
+CONSTRUCTOR_COLUMNS = ["constructorId", "constructorUrl", "constructorName", "constructorNationality"]
+
+# Column names follow fastf1's Ergast frames, so responses keep their shape
+TABLES = {
+    "races": ["season", "round", "raceUrl", "raceName", "raceDate", "raceTime", "circuitId", "circuitUrl",
+              "circuitName", "lat", "long", "locality", "country", "fp1Date", "fp1Time", "fp2Date", "fp2Time",
+              "fp3Date", "fp3Time", "qualifyingDate", "qualifyingTime", "sprintDate", "sprintTime"],
+    "results": ["season", "round", "number", "position", "positionText", "points", "grid", "laps", "status",
+                *DRIVER_COLUMNS, *CONSTRUCTOR_COLUMNS, "totalRaceTimeMillis", "totalRaceTime", "fastestLapRank",
+                "fastestLapNumber", "fastestLapTimeMillis", "fastestLapTime", "fastestLapAvgSpeedUnits",
+                "fastestLapAvgSpeed"],
+    "qualifying": ["season", "round", "number", "position", *DRIVER_COLUMNS, *CONSTRUCTOR_COLUMNS, "Q1", "Q2", "Q3"],
+    "drivers": ["season", *DRIVER_COLUMNS],
+    "constructors": ["season", *CONSTRUCTOR_COLUMNS],
+    "driver_standings": ["season", "round", "position", "positionText", "points", "wins", *DRIVER_COLUMNS,
+                         "constructorIds", "constructorUrls", "constructorNames", "constructorNationalities"],
+    "constructor_standings": ["season", "round", "position", "positionText", "points", "wins",
+                              *CONSTRUCTOR_COLUMNS],
+}
+INTEGER_COLUMNS = {"season", "round", "number", "position", "grid", "laps", "wins", "driverNumber",
+                   "totalRaceTimeMillis", "fastestLapRank", "fastestLapNumber", "fastestLapTimeMillis"}
+REAL_COLUMNS = {"lat", "long", "points", "fastestLapAvgSpeed"}
+# Driver standings list every team a driver drove for; stored as JSON arrays
+LIST_COLUMNS = {"constructorIds", "constructorUrls", "constructorNames", "constructorNationalities"}
+
+SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS races_key ON races (season, round);
+CREATE INDEX IF NOT EXISTS results_round ON results (season, round, position);
+CREATE INDEX IF NOT EXISTS results_driver ON results (driverId, season);
+CREATE INDEX IF NOT EXISTS results_constructor ON results (constructorId, season);
+CREATE INDEX IF NOT EXISTS qualifying_round ON qualifying (season, round, position);
+CREATE UNIQUE INDEX IF NOT EXISTS drivers_key ON drivers (season, driverId);
+CREATE UNIQUE INDEX IF NOT EXISTS constructors_key ON constructors (season, constructorId);
+CREATE INDEX IF NOT EXISTS driver_standings_round ON driver_standings (season, round, position);
+CREATE INDEX IF NOT EXISTS constructor_standings_round ON constructor_standings (season, round, position);
+CREATE TABLE IF NOT EXISTS seasons (
+    season INTEGER PRIMARY KEY,
+    last_round INTEGER,
+    complete INTEGER NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+def _column_type(column: str) -> str:
+    if column in INTEGER_COLUMNS:
+        return "INTEGER"
+    if column in REAL_COLUMNS:
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_value(value: Any) -> Any:
+    """Store values as the JSON the API used to send for them."""
+    if isinstance(value, (list, tuple)):
+        return json.dumps(list(value))
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return datetime_to_iso8601(value)
+    if isinstance(value, (timedelta, dt_time)):
+        return to_jsonable_python(value)
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def flatten(response) -> pd.DataFrame:
+    """
+    Flatten an Ergast response into one frame. Multi responses (one frame per
+    race or standings list) get their season and round columns from the
+    matching description row.
+    """
+    content = getattr(response, "content", None)
+    if content is None:
+        return response if isinstance(response, pd.DataFrame) else pd.DataFrame()
+
+    frames = []
+    for i, frame in enumerate(content):
+        if frame is None or frame.empty:
+            continue
+        frame = pd.DataFrame(frame)
+        description = response.description.iloc[i]
+        frame.insert(0, "round", description.get("round"))
+        frame.insert(0, "season", description.get("season"))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _typed(column: str, value: Any) -> Any:
+    """A stored value as SQLite hands it back for its column's type."""
+    if value is None:
+        return None
+    if column in LIST_COLUMNS:
+        return json.loads(value) if isinstance(value, str) else value
+    try:
+        if column in INTEGER_COLUMNS:
+            return int(float(value))
+        if column in REAL_COLUMNS:
+            return float(value)
+    except (TypeError, ValueError):
+        return value
+    return str(value)
+
+
+def records(table: str, frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Rows of an Ergast frame in the shape the database returns them: the
+    table's columns in order, with its integer, real, text and list types.
+    The Ergast fallback goes through this so responses look the same
+    wherever they came from.
+    """
+    columns = TABLES[table]
+    return [
+        {column: _typed(column, _sql_value(value)) for column, value in zip(columns, row)}
+        for row in frame.reindex(columns=columns).itertuples(index=False, name=None)
+    ]
+
+
+def _fetch_all(fetch, **kwargs) -> pd.DataFrame:
+    """Every page of an Ergast query as one frame."""
+    frames = []
+    offset = 0
+    while True:
+        response = fetch(limit=PAGE_SIZE, offset=offset, **kwargs)
+        frames.append(flatten(response))
+        offset += PAGE_SIZE
+        if offset >= response.total_results:
+            break
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class HistoricalDB:
+    def __init__(self, path: str = HISTORICAL_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        if not self._initialised:
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        with self._write_lock:
+            if self._initialised:
+                return
+            # Readers keep going while a sync writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            for table, columns in TABLES.items():
+                definition = ", ".join(f'"{column}" {_column_type(column)}' for column in columns)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+            conn.executescript(SCHEMA)
+            conn.commit()
+            self._initialised = True
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        rows = []
+        for row in self._connect().execute(sql, params):
+            record = dict(row)
+            for column in LIST_COLUMNS.intersection(record):
+                if record[column] is not None:
+                    record[column] = json.loads(record[column])
+            rows.append(record)
+        return rows
+
+    def _season(self, year: int) -> Optional[sqlite3.Row]:
+        return self._connect().execute("SELECT * FROM seasons WHERE season = ?", (year,)).fetchone()
+
+    def has_season(self, year: int) -> bool:
+        return self._season(year) is not None
+
+    def has_round(self, year: int, round_number: Optional[int]) -> bool:
+        season = self._season(year)
+        if season is None:
+            return False
+        return round_number is None or (season["last_round"] or 0) >= round_number
+
+    # Queries; None means the database can't answer and the caller should ask Ergast
+
+    def events(self, year: int) -> Optional[List[Dict[str, Any]]]:
+        if not self.has_season(year):
+            return None
+        return self._query("SELECT * FROM races WHERE season = ? ORDER BY round", (year,))
+
+    def results(self, year: int, round_number: Optional[int] = None,
+                driver: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        if not self.has_round(year, round_number):
+            return None
+        sql = "SELECT * FROM results WHERE season = ?"
+        params = [year]
+        if round_number is not None:
+            sql += " AND round = ?"
+            params.append(round_number)
+        if driver:
+            sql += " AND driverId = ?"
+            params.append(driver)
+        return self._query(sql + " ORDER BY round, position", tuple(params))
+
+    def drivers(self, year: int, round_number: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        if not self.has_round(year, round_number):
+            return None
+        if round_number is None:
+            return self._query("SELECT * FROM drivers WHERE season = ? ORDER BY driverId", (year,))
+        return self._query(
+            "SELECT * FROM drivers WHERE season = ? AND driverId IN "
+            "(SELECT driverId FROM results WHERE season = ? AND round = ?) ORDER BY driverId",
+            (year, year, round_number),
+        )
+
+    def constructors(self, year: int, round_number: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        if not self.has_round(year, round_number):
+            return None
+        if round_number is None:
+            return self._query("SELECT * FROM constructors WHERE season = ? ORDER BY constructorId", (year,))
+        return self._query(
+            "SELECT * FROM constructors WHERE season = ? AND constructorId IN "
+            "(SELECT constructorId FROM results WHERE season = ? AND round = ?) ORDER BY constructorId",
+            (year, year, round_number),
+        )
+
+    def standings(self, kind: str, year: int, round_number: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Driver or constructor standings after a round, or the latest stored ones.
+        Ingest keeps each season's final table; the sync job adds one per round
+        of the current season as it happens.
+        """
+        table = "driver_standings" if kind == "drivers" else "constructor_standings"
+        if not self.has_season(year):
+            return None
+        if round_number is None:
+            rows = self._query(
+                f"SELECT * FROM {table} WHERE season = ? AND round = "
+                f"(SELECT MAX(round) FROM {table} WHERE season = ?) ORDER BY position",
+                (year, year),
+            )
+        else:
+            rows = self._query(f"SELECT * FROM {table} WHERE season = ? AND round = ? ORDER BY position",
+                               (year, round_number))
+        return rows or None
+
+    # Bulk reads for precomputed statistics
+
+    def season_versions(self) -> Dict[int, tuple]:
+        """(last round, sync time) of every stored season; changes whenever a season is synced."""
+        rows = self._connect().execute("SELECT season, last_round, synced_at FROM seasons")
+        return {row["season"]: (row["last_round"], row["synced_at"]) for row in rows}
+
+    def results_frame(self, seasons: List[int]) -> pd.DataFrame:
+        placeholders = ", ".join("?" for _ in seasons)
+        return pd.read_sql(f"SELECT * FROM results WHERE season IN ({placeholders})", self._connect(),
+                           params=list(seasons))
+
+    def qualifying_frame(self, seasons: List[int]) -> pd.DataFrame:
+        placeholders = ", ".join("?" for _ in seasons)
+        return pd.read_sql(f"SELECT * FROM qualifying WHERE season IN ({placeholders})", self._connect(),
+                           params=list(seasons))
+
+    def final_standings_frame(self, seasons: List[int]) -> pd.DataFrame:
+        """Latest stored driver standings of each season, flagged when the season is over."""
+        placeholders = ", ".join("?" for _ in seasons)
+        return pd.read_sql(
+            f"SELECT ds.season, ds.driverId, ds.position, ds.points, s.complete FROM driver_standings ds "
+            f"JOIN seasons s ON s.season = ds.season "
+            f"WHERE ds.season IN ({placeholders}) AND ds.round = "
+            f"(SELECT MAX(round) FROM driver_standings WHERE season = ds.season)",
+            self._connect(), params=list(seasons),
+        )
+
+    # Ingest
+
+    def _replace(self, conn: sqlite3.Connection, table: str, frame: pd.DataFrame, where: str, params: tuple):
+        conn.execute(f"DELETE FROM {table} WHERE {where}", params)
+        if frame.empty:
+            return
+        columns = TABLES[table]
+        frame = frame.reindex(columns=columns)
+        placeholders = ", ".join("?" for _ in columns)
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        conn.executemany(
+            f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})",
+            ([_sql_value(value) for value in row] for row in frame.itertuples(index=False, name=None)),
+        )
+
+    def _has_qualifying(self, year: int) -> bool:
+        return self._connect().execute("SELECT 1 FROM qualifying WHERE season = ? LIMIT 1", (year,)).fetchone() is not None
+
+    @staticmethod
+    def _fetch_rounds(fetch, year: int, after: int, last: int) -> pd.DataFrame:
+        """Rows of rounds after..last of a season: one query for the whole season, else one per round."""
+        if after == 0:
+            return _fetch_all(fetch, season=year)
+        frames = [_fetch_all(fetch, season=year, round=r) for r in range(after + 1, last + 1)]
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def sync_season(self, year: int, force: bool = False) -> Dict[str, Any]:
+        """
+        Bring one season up to date. Results are only fetched for rounds newer
+        than the last sync, unless force is set.
+        """
+        conn = self._connect()
+        season = self._season(year)
+        stored_round = 0 if force or season is None else (season["last_round"] or 0)
+
+        # Early seasons list more drivers than one page holds
+        driver_standings = _fetch_all(ergast.get_driver_standings, season=year)
+        constructor_standings = _fetch_all(ergast.get_constructor_standings, season=year)
+        last_round = int(driver_standings["round"].max()) if not driver_standings.empty else 0
+
+        races = _fetch_all(ergast.get_race_schedule, season=year)
+        # Seasons ingested before qualifying was stored fetch all of theirs
+        qualifying_round = stored_round if self._has_qualifying(year) else 0
+        if last_round > stored_round:
+            results = self._fetch_rounds(ergast.get_race_results, year, stored_round, last_round)
+            # Driver and constructor lists don't carry their season
+            drivers = _fetch_all(ergast.get_driver_info, season=year).assign(season=year)
+            constructors = _fetch_all(ergast.get_constructor_info, season=year).assign(season=year)
+        else:
+            results = drivers = constructors = None
+        qualifying = None
+        if last_round > qualifying_round:
+            qualifying = self._fetch_rounds(ergast.get_qualifying_results, year, qualifying_round, last_round)
+
+        complete = year < datetime.now().year
+        with self._write_lock, conn:
+            self._replace(conn, "races", races, "season = ?", (year,))
+            if results is not None:
+                self._replace(conn, "results", results, "season = ? AND round > ?", (year, stored_round))
+                self._replace(conn, "drivers", drivers, "season = ?", (year,))
+                self._replace(conn, "constructors", constructors, "season = ?", (year,))
+            if qualifying is not None:
+                self._replace(conn, "qualifying", qualifying, "season = ? AND round > ?", (year, qualifying_round))
+            for table, frame in (("driver_standings", driver_standings),
+                                 ("constructor_standings", constructor_standings)):
+                if not frame.empty:
+                    self._replace(conn, table, frame, "season = ? AND round = ?", (year, last_round))
+            conn.execute(
+                "INSERT OR REPLACE INTO seasons (season, last_round, complete, synced_at) VALUES (?, ?, ?, ?)",
+                (year, last_round, int(complete), datetime.now(timezone.utc).isoformat()),
+            )
+
+        new_rounds = max(last_round - stored_round, 0)
+        logger.info(f"Synced historical season {year}: round {last_round}, {new_rounds} new")
+        return {"season": year, "last_round": last_round, "new_rounds": new_rounds}
+
+    def ingest(self, first: int = FIRST_SEASON, last: Optional[int] = None, force: bool = False):
+        """Load every season in the range; finished seasons already stored are skipped."""
+        last = last or datetime.now().year
+        for year in range(first, last + 1):
+            season = self._season(year)
+            if season is not None and season["complete"] and not force:
+                continue
+            try:
+                self.sync_season(year, force=force)
+            except Exception as e:
+                logger.error(f"Could not ingest season {year}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        seasons = self._query("SELECT * FROM seasons ORDER BY season")
+        return {
+            "path": self.path,
+            "seasons": len(seasons),
+            "first_season": seasons[0]["season"] if seasons else None,
+            "last_season": seasons[-1]["season"] if seasons else None,
+            "last_sync": max((s["synced_at"] for s in seasons), default=None),
+            "results": self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0],
+        }
+
+
+# Global instance
+historical_db = HistoricalDB()
+
+
+class HistoricalSync:
+    """
+    Background job keeping the current season of the historical database in
+    step. Seasons asked for but not stored yet are queued with request() and
+    pulled in between syncs, so requests never wait on Ergast for them.
+    """
+
+    def __init__(self,
+                 enabled: bool = os.getenv("HISTORICAL_SYNC_ENABLED", "true").lower() in ("1", "true", "yes"),
+                 interval: float = float(os.getenv("HISTORICAL_SYNC_INTERVAL", 3600))):
+        self.enabled = enabled
+        self.interval = interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._requested: set = set()
+        self._thread: Optional[threading.Thread] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info("Historical sync started")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def request(self, year: int):
+        """Queue a season, or rounds of it, the database doesn't hold yet."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._requested.add(year)
+        self._wake.set()
+
+    def _sync(self, year: int):
+        try:
+            self.last_result = historical_db.sync_season(year)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Historical sync of {year} failed: {e}")
+
+    def _run(self):
+        next_sync = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_sync:
+                self._sync(datetime.now().year)
+                next_sync = time.monotonic() + self.interval
+            with self._lock:
+                requested, self._requested = self._requested, set()
+            for year in sorted(requested):
+                if self._stop.is_set():
+                    break
+                self._sync(year)
+            self._wake.wait(max(next_sync - time.monotonic(), 0))
+            self._wake.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval": self.interval,
+            "requested": sorted(self._requested),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+# Global instance
+historical_sync = HistoricalSync()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Maintain the local Ergast history database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="load every season")
+    ingest_parser.add_argument("--from", dest="first", type=int, default=FIRST_SEASON)
+    ingest_parser.add_argument("--to", dest="last", type=int, default=None)
+    ingest_parser.add_argument("--force", action="store_true", help="reload seasons already stored")
+    sync_parser = commands.add_parser("sync", help="fetch new rounds of one season")
+    sync_parser.add_argument("--season", type=int, default=datetime.now().year)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        historical_db.ingest(args.first, args.last, force=args.force)
+    else:
+        historical_db.sync_season(args.season)
+    print(json.dumps(historical_db.get_status(), indent=2))
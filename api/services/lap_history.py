@@ -0,0 +1,240 @@
+"""
+Per-driver lap history for live sessions.
+Completed laps are kept in fixed-size numpy ring buffers so memory stays
+bounded for the whole session, and the derived stats (rolling average,
+personal bests, stint pace) are updated incrementally as laps arrive.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Compounds are stored as small integer codes in the ring buffer
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET", "HYPERSOFT",
+             "ULTRASOFT", "SUPERSOFT", "TEST_UNKNOWN", "UNKNOWN"]
+_COMPOUND_CODES = {name: code for code, name in enumerate(COMPOUNDS)}
+
+
+def parse_lap_time(value: Any) -> float:
+    """Parse a live timing time string ("1:32.456", "32.456") into seconds, NaN if unknown."""
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().lstrip("+")
+    if not text:
+        return np.nan
+    try:
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return np.nan
+
+
+def parse_gap(value: Any) -> float:
+    """
+    Parse a GapToLeader / IntervalToPositionAhead value into seconds.
+    The leader is sent as "LAP 23" (gap 0), lapped cars as "1L" (NaN).
+    """
+    if isinstance(value, dict):
+        value = value.get("Value")
+    if isinstance(value, str) and value.strip().upper().startswith("LAP"):
+        return 0.0
+    return parse_lap_time(value)
+
+
+def _value(entry: Any) -> Any:
+    """Unwrap the {"Value": ...} objects used throughout TimingData."""
+    if isinstance(entry, dict):
+        return entry.get("Value")
+    return entry
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class DriverLapHistory:
+    """Ring buffer of completed laps for a single driver."""
+
+    def __init__(self, capacity: int = 128, window: int = 5):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self._lock = threading.Lock()
+
+        self.lap_number = np.zeros(capacity, dtype=np.int16)
+        self.lap_time = np.full(capacity, np.nan)
+        self.sectors = np.full((capacity, 3), np.nan)
+        self.gap = np.full(capacity, np.nan)
+        self.compound = np.full(capacity, _COMPOUND_CODES["UNKNOWN"], dtype=np.int8)
+        self.stint = np.zeros(capacity, dtype=np.int16)
+
+        self._head = 0  # Next write position
+        self._count = 0  # Laps recorded in total (may exceed capacity)
+
+        # Incrementally maintained stats
+        self.last_lap_number = 0
+        self.best_lap_time = np.nan
+        self.best_lap_number = None
+        self.best_sectors = np.full(3, np.nan)
+        self._rolling_sum = 0.0
+        self._rolling_valid = 0
+        self._stints: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def record(self, lap_number: int, lap_time: float, sectors: List[float],
+               compound: Optional[str] = None, stint: int = 0, gap: float = np.nan) -> bool:
+        """Append a completed lap. Returns False if the lap was already recorded."""
+        with self._lock:
+            if lap_number <= self.last_lap_number:
+                return False
+
+            # The lap leaving the rolling window is still in the buffer as long as window <= capacity
+            if self._count >= self.window:
+                leaving = self.lap_time[(self._head - self.window) % self.capacity]
+                if not np.isnan(leaving):
+                    self._rolling_sum -= leaving
+                    self._rolling_valid -= 1
+
+            i = self._head
+            self.lap_number[i] = lap_number
+            self.lap_time[i] = lap_time
+            self.sectors[i] = (list(sectors) + [np.nan] * 3)[:3]
+            self.gap[i] = gap
+            self.compound[i] = _COMPOUND_CODES.get((compound or "UNKNOWN").upper(), _COMPOUND_CODES["UNKNOWN"])
+            self.stint[i] = stint
+
+            self._head = (self._head + 1) % self.capacity
+            self._count += 1
+            self.last_lap_number = lap_number
+
+            if not np.isnan(lap_time):
+                self._rolling_sum += lap_time
+                self._rolling_valid += 1
+                if np.isnan(self.best_lap_time) or lap_time < self.best_lap_time:
+                    self.best_lap_time = lap_time
+                    self.best_lap_number = lap_number
+
+                pace = self._stints.setdefault(stint, {
+                    "stint": stint,
+                    "compound": COMPOUNDS[self.compound[i]],
+                    "start_lap": lap_number,
+                    "total": 0.0,
+                    "laps": 0,
+                    "best": np.nan,
+                })
+                pace["end_lap"] = lap_number
+                pace["total"] += lap_time
+                pace["laps"] += 1
+                if np.isnan(pace["best"]) or lap_time < pace["best"]:
+                    pace["best"] = lap_time
+
+            self.best_sectors = np.fmin(self.best_sectors, self.sectors[i])
+            return True
+
+    def extend(self, laps: List[Dict[str, Any]]):
+        """Replay laps as returned by laps(); laps already recorded are skipped."""
+        def seconds(value):
+            return np.nan if value is None else value
+
+        for lap in laps:
+            self.record(
+                lap["lap_number"],
+                seconds(lap["lap_time"]),
+                [seconds(lap[f"sector{i}_time"]) for i in (1, 2, 3)],
+                compound=lap["compound"],
+                stint=lap["stint"],
+                gap=seconds(lap["gap_to_leader"]),
+            )
+
+    def laps(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return recorded laps, oldest first."""
+        with self._lock:
+            size = len(self)
+            if last is not None:
+                size = min(size, max(last, 0))
+            return self._rows((np.arange(self._head - size, self._head)) % self.capacity)
+
+    def laps_after(self, lap_number: int) -> List[Dict[str, Any]]:
+        """Return the laps recorded after lap_number, oldest first."""
+        with self._lock:
+            if self.last_lap_number <= lap_number:
+                return []
+            size = len(self)
+            order = (np.arange(self._head - size, self._head)) % self.capacity
+            return self._rows(order[self.lap_number[order] > lap_number])
+
+    def _rows(self, order) -> List[Dict[str, Any]]:
+        return [
+            {
+                "lap_number": int(self.lap_number[i]),
+                "lap_time": _none_if_nan(self.lap_time[i]),
+                "sector1_time": _none_if_nan(self.sectors[i, 0]),
+                "sector2_time": _none_if_nan(self.sectors[i, 1]),
+                "sector3_time": _none_if_nan(self.sectors[i, 2]),
+                "compound": COMPOUNDS[self.compound[i]],
+                "stint": int(self.stint[i]),
+                "gap_to_leader": _none_if_nan(self.gap[i]),
+            }
+            for i in order
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the incrementally maintained stats."""
+        with self._lock:
+            rolling = self._rolling_sum / self._rolling_valid if self._rolling_valid else np.nan
+            return {
+                "laps_recorded": self._count,
+                "last_lap_number": self.last_lap_number,
+                "personal_best_lap_time": _none_if_nan(self.best_lap_time),
+                "personal_best_lap_number": self.best_lap_number,
+                "personal_best_sectors": [_none_if_nan(s) for s in self.best_sectors],
+                "rolling_average_lap_time": _none_if_nan(rolling),
+                "rolling_window": self.window,
+                "stints": [
+                    {
+                        "stint": pace["stint"],
+                        "compound": pace["compound"],
+                        "start_lap": pace["start_lap"],
+                        "end_lap": pace["end_lap"],
+                        "laps": pace["laps"],
+                        "average_lap_time": pace["total"] / pace["laps"],
+                        "best_lap_time": _none_if_nan(pace["best"]),
+                    }
+                    for pace in sorted(self._stints.values(), key=lambda p: p["stint"])
+                ],
+            }
+
+
+def completed_lap_from_car(car: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the just-completed lap from a car's merged TimingData/TimingAppData.
+    Sectors arrive either as a list or as a dict keyed by "0".."2".
+    """
+    sectors = car.get("Sectors") or []
+    if isinstance(sectors, dict):
+        sectors = [sectors.get(str(i), {}) for i in range(3)]
+    sector_times = [parse_lap_time(_value(s)) for s in sectors[:3]]
+
+    compound = None
+    stints = car.get("Stints") or []
+    if isinstance(stints, dict):
+        stints = [stints[k] for k in sorted(stints, key=lambda k: int(k))]
+    if stints:
+        compound = stints[-1].get("Compound")
+
+    return {
+        "lap_number": int(car.get("NumberOfLaps", 0)),
+        "lap_time": parse_lap_time(_value(car.get("LastLapTime"))),
+        "sectors": sector_times,
+        "compound": compound,
+        "stint": max(len(stints) - 1, 0),
+        "gap": parse_gap(car.get("GapToLeader")),
+    }
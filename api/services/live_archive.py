@@ -0,0 +1,290 @@
+"""
+Archiving of live timing recordings into columnar Parquet tables.
+A finished recording (live_data/live_timing_*.json) is a line oriented dump
+of mixed JSON and Python-repr SignalR messages. This converts it into one
+compressed Parquet table per category with typed columns, so recordings take
+a fraction of the disk space and can be queried like the historical data.
+
+Usage:
+    python -m api.services.live_archive live_data/live_timing_20251130_163721.json
+"""
+import argparse
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.services.lap_history import parse_gap, parse_lap_time
+from api.services.live_parser import parse_feed_messages
+from api.services.live_telemetry import parse_utc
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = "live_data"
+ARCHIVE_DIR = os.path.join(RECORDINGS_DIR, "archive")
+COMPRESSION = "zstd"
+
+
+def _value(entry: Any) -> Any:
+    return entry.get("Value") if isinstance(entry, dict) else entry
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _bool(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+def _indexed(entries: Any) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Iterate full lists and partial {"index": {...}} updates alike."""
+    if isinstance(entries, list):
+        yield from enumerate(entries)
+    elif isinstance(entries, dict):
+        for key, entry in entries.items():
+            if isinstance(entry, dict):
+                yield int(key), entry
+
+
+def _timing_rows(ts, payload) -> List[Dict[str, Any]]:
+    rows = []
+    for driver_num, line in payload.get("Lines", {}).items():
+        row = {
+            "timestamp": ts,
+            "driver_number": driver_num,
+            "position": _float(line.get("Position")),
+            "gap_to_leader": line.get("GapToLeader"),
+            "gap_to_leader_seconds": parse_gap(line.get("GapToLeader")) if "GapToLeader" in line else np.nan,
+            "interval_seconds": parse_gap(line.get("IntervalToPositionAhead")) if "IntervalToPositionAhead" in line else np.nan,
+            "number_of_laps": _float(line.get("NumberOfLaps")),
+            "last_lap_time": parse_lap_time(_value(line.get("LastLapTime"))) if "LastLapTime" in line else np.nan,
+            "best_lap_time": parse_lap_time(_value(line.get("BestLapTime"))) if "BestLapTime" in line else np.nan,
+            "in_pit": _bool(line.get("InPit")),
+            "pit_out": _bool(line.get("PitOut")),
+            "number_of_pit_stops": _float(line.get("NumberOfPitStops")),
+            "retired": _bool(line.get("Retired")),
+        }
+        for index, sector in _indexed(line.get("Sectors")):
+            if index < 3 and sector.get("Value"):
+                row[f"sector{index + 1}_time"] = parse_lap_time(sector["Value"])
+        speeds = line.get("Speeds") or {}
+        for trap in ("I1", "I2", "FL", "ST"):
+            if trap in speeds:
+                row[f"speed_{trap.lower()}"] = _float(_value(speeds[trap]))
+        rows.append(row)
+    return rows
+
+
+def _app_data_rows(ts, payload) -> List[Dict[str, Any]]:
+    rows = []
+    for driver_num, line in payload.get("Lines", {}).items():
+        for stint, entry in _indexed(line.get("Stints")):
+            rows.append({
+                "timestamp": ts,
+                "driver_number": driver_num,
+                "stint": stint,
+                "compound": entry.get("Compound"),
+                "new": _bool(entry.get("New")),
+                "total_laps": _float(entry.get("TotalLaps")),
+                "start_laps": _float(entry.get("StartLaps")),
+                "lap_number": _float(entry.get("LapNumber")),
+                "lap_time": parse_lap_time(entry.get("LapTime")) if "LapTime" in entry else np.nan,
+            })
+    return rows
+
+
+def _weather_rows(ts, payload) -> List[Dict[str, Any]]:
+    return [{
+        "timestamp": ts,
+        "air_temp": _float(payload.get("AirTemp")),
+        "track_temp": _float(payload.get("TrackTemp")),
+        "humidity": _float(payload.get("Humidity")),
+        "pressure": _float(payload.get("Pressure")),
+        "rainfall": _bool(payload.get("Rainfall")),
+        "wind_direction": _float(payload.get("WindDirection")),
+        "wind_speed": _float(payload.get("WindSpeed")),
+    }]
+
+
+def _track_status_rows(ts, payload) -> List[Dict[str, Any]]:
+    return [{"timestamp": ts, "status": payload.get("Status"), "message": payload.get("Message")}]
+
+
+def _race_control_rows(ts, payload) -> List[Dict[str, Any]]:
+    return [
+        {
+            "timestamp": ts,
+            "utc": parse_utc(message.get("Utc")),
+            "lap": _float(message.get("Lap")),
+            "category": message.get("Category"),
+            "message": message.get("Message"),
+            "flag": message.get("Flag"),
+            "scope": message.get("Scope"),
+            "sector": _float(message.get("Sector")),
+            "driver_number": message.get("RacingNumber"),
+            "status": message.get("Status"),
+        }
+        for _, message in _indexed(payload.get("Messages"))
+    ]
+
+
+# table name -> (feed category, row extractor, column dtypes)
+TABLES: Dict[str, Tuple[str, Callable, Dict[str, str]]] = {
+    "timing": ("TimingData", _timing_rows, {
+        "driver_number": "category", "position": "Int8", "gap_to_leader": "string",
+        "gap_to_leader_seconds": "float64", "interval_seconds": "float64", "number_of_laps": "Int16",
+        "last_lap_time": "float64", "best_lap_time": "float64",
+        "sector1_time": "float64", "sector2_time": "float64", "sector3_time": "float64",
+        "in_pit": "boolean", "pit_out": "boolean", "number_of_pit_stops": "Int8", "retired": "boolean",
+        "speed_i1": "float32", "speed_i2": "float32", "speed_fl": "float32", "speed_st": "float32",
+    }),
+    "app_data": ("TimingAppData", _app_data_rows, {
+        "driver_number": "category", "stint": "Int8", "compound": "category", "new": "boolean",
+        "total_laps": "Int16", "start_laps": "Int16", "lap_number": "Int16", "lap_time": "float64",
+    }),
+    "weather": ("WeatherData", _weather_rows, {
+        "air_temp": "float64", "track_temp": "float64", "humidity": "float64", "pressure": "float64",
+        "rainfall": "boolean", "wind_direction": "Int16", "wind_speed": "float64",
+    }),
+    "track_status": ("TrackStatus", _track_status_rows, {
+        "status": "category", "message": "category",
+    }),
+    "race_control": ("RaceControlMessages", _race_control_rows, {
+        "utc": "datetime", "lap": "Int16", "category": "category", "message": "string", "flag": "category",
+        "scope": "category", "sector": "Int8", "driver_number": "category", "status": "category",
+    }),
+}
+_CATEGORY_TABLES = {category: name for name, (category, _, _) in TABLES.items()}
+
+
+def _to_frame(rows: List[Dict[str, Any]], dtypes: Dict[str, str]) -> pd.DataFrame:
+    columns = ["timestamp"] + list(dtypes)
+    df = pd.DataFrame(rows).reindex(columns=columns)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+    for column, dtype in dtypes.items():
+        if dtype == "datetime":
+            df[column] = pd.to_datetime(df[column], unit="s", utc=True)
+        elif dtype in ("Int8", "Int16"):
+            # Nullable ints are built from floats; drop fractions that are feed noise
+            df[column] = pd.to_numeric(df[column], errors="coerce").round().astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def resolve_recording(filename: str, directory: str = RECORDINGS_DIR) -> str:
+    """
+    Real path of a recording named relative to the recordings directory; a
+    leading "live_data/", as in the recorder status, is accepted. Raises
+    ValueError for absolute paths, ".." and anything (e.g. a symlink) that
+    resolves outside the directory.
+    """
+    name = filename.replace("\\", "/")
+    if os.path.isabs(name) or ".." in name.split("/"):
+        raise ValueError(f"Recordings are named relative to {directory}/: {filename}")
+    prefix = directory.rstrip("/") + "/"
+    if name.startswith(prefix):
+        name = name[len(prefix):]
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Recording is outside {directory}/: {filename}")
+    return path
+
+
+def archive_name(recording_file: str) -> str:
+    return os.path.splitext(os.path.basename(recording_file))[0]
+
+
+def archive_recording(recording_file: str, output_dir: str = ARCHIVE_DIR) -> Dict[str, Any]:
+    """Convert a recording into per-category Parquet tables and write a manifest."""
+    rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLES}
+    messages = 0
+    with open(recording_file, "r", errors="replace") as f:
+        for line in f:
+            for category, payload, timestamp in parse_feed_messages(line):
+                table = _CATEGORY_TABLES.get(category)
+                if table is None or not isinstance(payload, dict):
+                    continue
+                messages += 1
+                ts = parse_utc(timestamp) if timestamp else np.nan
+                rows[table].extend(TABLES[table][1](ts, payload))
+
+    target = os.path.join(output_dir, archive_name(recording_file))
+    os.makedirs(target, exist_ok=True)
+
+    tables = {}
+    for name, (_, _, dtypes) in TABLES.items():
+        if not rows[name]:
+            continue
+        path = os.path.join(target, f"{name}.parquet")
+        _to_frame(rows[name], dtypes).to_parquet(path, compression=COMPRESSION, index=False)
+        tables[name] = {"rows": len(rows[name]), "bytes": os.path.getsize(path)}
+
+    source_bytes = os.path.getsize(recording_file)
+    archived_bytes = sum(t["bytes"] for t in tables.values())
+    manifest = {
+        "name": archive_name(recording_file),
+        "source": recording_file,
+        "archived_at": datetime.now().isoformat(),
+        "messages": messages,
+        "compression": COMPRESSION,
+        "source_bytes": source_bytes,
+        "archived_bytes": archived_bytes,
+        "compression_ratio": round(source_bytes / archived_bytes, 1) if archived_bytes else None,
+        "tables": tables,
+    }
+    with open(os.path.join(target, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Archived {recording_file} into {target} ({manifest['compression_ratio']}x smaller)")
+    return manifest
+
+
+def list_archives(output_dir: str = ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    if not os.path.isdir(output_dir):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(output_dir)):
+        path = os.path.join(output_dir, name, "manifest.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def load_table(name: str, table: str, output_dir: str = ARCHIVE_DIR) -> Optional[pd.DataFrame]:
+    """Load one archived table, or None if it does not exist."""
+    if table not in TABLES:
+        return None
+    path = os.path.join(output_dir, os.path.basename(name), f"{table}.parquet")
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Archive live timing recordings into Parquet tables.")
+    parser.add_argument("recordings", nargs="+", help="Recording files (live_data/live_timing_*.json)")
+    parser.add_argument("--output", default=ARCHIVE_DIR, help=f"Archive directory (default: {ARCHIVE_DIR})")
+    parser.add_argument("--delete-source", action="store_true", help="Delete each recording once archived")
+    args = parser.parse_args()
+
+    for recording in args.recordings:
+        result = archive_recording(recording, args.output)
+        print(f"{recording}: {result['messages']} messages, {result['compression_ratio']}x smaller")
+        if args.delete_source:
+            os.remove(recording)
@@ -0,0 +1,409 @@
+"""
+Sharing live state between uvicorn workers.
+Exactly one worker (the ingester) owns the SignalR connections, the parsers
+and the checkpoints. It publishes per-session state snapshots through a
+backend; every other worker subscribes, applies the snapshots to its own copy
+of each session and forwards recorder commands (start/stop) to the ingester.
+
+Lap history only grows during a session, so it is not sent in full on every
+tick: each message carries the laps completed since the previous one, and a
+full snapshot (lap history included) is sent when a subscriber joins or when
+the session's state has been reset. Messages carry a per-session sequence
+number; subscribers ignore ones older than the last they applied.
+
+Backends:
+    local - InProcessBackend, single process (default, also used in tests)
+    unix  - UnixSocketBackend, ingester elected with a file lock and snapshots
+            pushed over a local Unix socket
+"""
+import fcntl
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("!I")
+
+
+def _send_frame(sock: socket.socket, message: Dict[str, Any]):
+    body = json.dumps(message, separators=(",", ":")).encode()
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    body = _recv_exact(sock, _HEADER.unpack(header)[0])
+    return json.loads(body) if body is not None else None
+
+
+def _remember(latest: Dict[str, Dict[str, Any]], message: Dict[str, Any]):
+    # Keep the last message per session: remote_status() reads the recorder status from it
+    session_id = message.get("session", "default")
+    if message.get("closed"):
+        latest.pop(session_id, None)
+    else:
+        latest[session_id] = message
+
+
+class InProcessBackend:
+    """Single-process backend: this process is always the ingester."""
+
+    is_ingester = True
+
+    def __init__(self):
+        self.latest: Dict[str, Dict[str, Any]] = {}  # session id -> last message (subscribers only)
+        self._subscribers = []
+        self._on_command = None
+        self._snapshots = None
+
+    def start(self, on_snapshot: Callable, on_command: Callable, on_promoted: Callable,
+              snapshots: Callable[[], List[Dict[str, Any]]]):
+        self._on_command = on_command
+        self._snapshots = snapshots
+
+    def subscribe(self, callback: Callable):
+        """Register an extra snapshot consumer (stand-in for another worker)."""
+        self._subscribers.append(callback)
+        for message in self._snapshots() if self._snapshots else ():
+            callback(message)
+
+    def publish(self, message: Dict[str, Any]):
+        for callback in self._subscribers:
+            callback(message)
+
+    def request(self, action: str, **kwargs) -> Dict[str, Any]:
+        return self._on_command(action, kwargs)
+
+    def stop(self):
+        pass
+
+
+class UnixSocketBackend:
+    """
+    Ingester election through an exclusive flock on a lock file next to the
+    socket. If the ingester dies the lock is released and one of the
+    subscribers takes over on its next reconnect attempt.
+    """
+
+    def __init__(self, path: str, request_timeout: float = 10.0):
+        self.path = path
+        self.request_timeout = request_timeout
+        self.is_ingester = False
+        self.latest: Dict[str, Dict[str, Any]] = {}  # session id -> last message (subscribers only)
+        self._running = False
+        self._lock_file = None
+        self._server = None
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._conn = None
+        self._send_lock = threading.Lock()
+        # Commands waiting for a reply; written by request threads, resolved by the reader thread
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._next_id = 0
+        self._on_snapshot = None
+        self._on_command = None
+        self._on_promoted = None
+        self._snapshots = None
+
+    def start(self, on_snapshot: Callable, on_command: Callable, on_promoted: Callable,
+              snapshots: Callable[[], List[Dict[str, Any]]]):
+        self._on_snapshot = on_snapshot
+        self._on_command = on_command
+        self._on_promoted = on_promoted
+        self._snapshots = snapshots
+        self._running = True
+
+        if self._try_lock():
+            self._serve()
+        else:
+            threading.Thread(target=self._subscribe_loop, daemon=True).start()
+
+    def _try_lock(self) -> bool:
+        lock_file = open(f"{self.path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    # Ingester side
+
+    def _serve(self):
+        self.is_ingester = True
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        logger.info(f"Live state ingester (pid {os.getpid()}) publishing on {self.path}")
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            # A slow subscriber must not stall the parser thread for long
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, struct.pack("ll", 1, 0))
+            client = {"sock": conn, "lock": threading.Lock()}
+            # Full snapshots go out before any delta: publish() waits on the client's lock
+            with client["lock"]:
+                with self._clients_lock:
+                    self._clients.append(client)
+                try:
+                    for message in self._snapshots():
+                        _send_frame(conn, dict(message, type="snapshot"))
+                except OSError:
+                    joined = False
+                else:
+                    joined = True
+            if not joined:
+                self._drop(client)
+                continue
+            threading.Thread(target=self._serve_commands, args=(client,), daemon=True).start()
+
+    def _serve_commands(self, client):
+        conn = client["sock"]
+        while self._running:
+            try:
+                frame = _recv_frame(conn)
+            except (OSError, ValueError):
+                frame = None
+            if frame is None:
+                self._drop(client)
+                return
+            if frame.get("type") == "command":
+                try:
+                    result = self._on_command(frame["action"], frame.get("args", {}))
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+                self._send_to(client, {"type": "reply", "id": frame["id"], "result": result})
+
+    def _send_to(self, client, message):
+        try:
+            with client["lock"]:
+                _send_frame(client["sock"], message)
+        except OSError:
+            self._drop(client)
+
+    def _drop(self, client):
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        try:
+            # shutdown first: close alone does not wake a thread blocked in recv
+            client["sock"].shutdown(socket.SHUT_RDWR)
+            client["sock"].close()
+        except OSError:
+            pass
+
+    def publish(self, message: Dict[str, Any]):
+        message = dict(message, type="snapshot")
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            self._send_to(client, message)
+
+    # Subscriber side
+
+    def _subscribe_loop(self):
+        while self._running:
+            if self._try_lock():
+                logger.info(f"Live state ingester gone, worker {os.getpid()} taking over")
+                self._serve()
+                self._on_promoted()
+                return
+            try:
+                conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                conn.connect(self.path)
+            except OSError:
+                time.sleep(1.0)
+                continue
+
+            self._conn = conn
+            try:
+                while self._running:
+                    frame = _recv_frame(conn)
+                    if frame is None:
+                        break
+                    if frame.get("type") == "snapshot":
+                        _remember(self.latest, frame)
+                        self._on_snapshot(frame)
+                    elif frame.get("type") == "reply":
+                        with self._pending_lock:
+                            pending = self._pending.get(frame.get("id"))
+                        if pending is not None:
+                            pending["result"] = frame["result"]
+                            pending["event"].set()
+            except (OSError, ValueError) as e:
+                logger.error(f"Live state subscription error: {e}")
+            finally:
+                self._conn = None
+                conn.close()
+            time.sleep(1.0)
+
+    def request(self, action: str, **kwargs) -> Dict[str, Any]:
+        """Forward a recorder command to the ingester and wait for its reply."""
+        conn = self._conn
+        if conn is None:
+            return {"status": "error", "message": "Live state ingester is not reachable"}
+
+        with self._send_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            pending = {"event": threading.Event(), "result": None}
+            with self._pending_lock:
+                self._pending[request_id] = pending
+            try:
+                _send_frame(conn, {"type": "command", "id": request_id, "action": action, "args": kwargs})
+            except OSError as e:
+                with self._pending_lock:
+                    self._pending.pop(request_id, None)
+                return {"status": "error", "message": f"Live state ingester is not reachable: {e}"}
+
+        try:
+            if not pending["event"].wait(self.request_timeout):
+                return {"status": "error", "message": "Timed out waiting for the live state ingester"}
+            return pending["result"]
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+    def stop(self):
+        self._running = False
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            self._drop(client)
+        if self._server is not None:
+            self._server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+
+class LiveStateBus:
+    """Publishes live sessions from the ingester, applies them everywhere else."""
+
+    def __init__(self, backend=None, publish_interval: float = float(os.getenv("LIVE_PUBLISH_INTERVAL", 0.5))):
+        self.backend = backend or self._backend_from_env()
+        self.publish_interval = publish_interval
+        self._last_published: Dict[str, float] = {}  # session id -> monotonic time
+        self._lock = threading.Lock()
+        self._sessions = None
+        self._seq: Dict[str, int] = {}  # session id -> sequence number of the last message
+        self._epochs: Dict[str, int] = {}  # session id -> state epoch of the last message
+        self._sent_laps: Dict[str, Dict[str, int]] = {}  # session id -> driver -> last lap sent
+
+    @staticmethod
+    def _backend_from_env():
+        kind = os.getenv("LIVE_STATE_BACKEND", "local").lower()
+        if kind == "unix":
+            return UnixSocketBackend(os.getenv("LIVE_STATE_SOCKET", "/tmp/fastf1_live.sock"))
+        return InProcessBackend()
+
+    @property
+    def is_ingester(self) -> bool:
+        return self.backend.is_ingester
+
+    def remote_status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        latest = self.backend.latest.get(session_id)
+        return latest.get("recorder") if latest else None
+
+    def start(self, sessions, command_handler: Callable, on_promoted: Callable):
+        self._sessions = sessions
+        self.backend.start(sessions.apply_snapshot, command_handler, on_promoted, self.full_snapshots)
+
+    def maybe_publish(self, session):
+        """Publish a session snapshot if its interval has elapsed. Call from its parser thread."""
+        if time.monotonic() - self._last_published.get(session.session_id, 0.0) < self.publish_interval:
+            return
+        self.publish(session)
+
+    def publish(self, session):
+        """Publish the laps completed since the last message, or a full snapshot after a reset."""
+        self._last_published[session.session_id] = time.monotonic()
+        try:
+            with self._lock:
+                state = session.state
+                full = self._epochs.get(session.session_id) != state.epoch
+                message = self._message(session, full, advance=True)
+                if full:
+                    self._epochs[session.session_id] = state.epoch
+                    sent = self._sent_laps[session.session_id] = {}
+                    laps = message["state"]["lap_history"]
+                else:
+                    sent = self._sent_laps.setdefault(session.session_id, {})
+                    laps = message["laps"] = {
+                        driver_num: driver_laps
+                        for driver_num, history in list(state.lap_history.items())
+                        if (driver_laps := history.laps_after(sent.get(driver_num, 0)))
+                    }
+                for driver_num, driver_laps in laps.items():
+                    if driver_laps:
+                        sent[driver_num] = driver_laps[-1]["lap_number"]
+            self.backend.publish(message)
+        except Exception as e:
+            logger.error(f"Failed to publish live state: {e}")
+
+    def full_snapshots(self) -> List[Dict[str, Any]]:
+        """Full snapshots of every session, for a subscriber that just joined."""
+        if self._sessions is None:
+            return []
+        with self._lock:
+            return [self._message(session, full=True) for session in self._sessions.sessions()]
+
+    def _message(self, session, full: bool, advance: bool = False) -> Dict[str, Any]:
+        if advance:
+            self._seq[session.session_id] = self._seq.get(session.session_id, 0) + 1
+        return {
+            "session": session.session_id,
+            "seq": self._seq.get(session.session_id, 0),
+            "full": full,
+            "state": session.state.snapshot(lap_history=full),
+            "telemetry": session.state.telemetry.latest_rows(),
+            "recorder": session.recorder.local_status(),
+        }
+
+    def close_session(self, session_id: str):
+        """Tell subscribers a session was removed."""
+        self._last_published.pop(session_id, None)
+        with self._lock:
+            for published in (self._seq, self._epochs, self._sent_laps):
+                published.pop(session_id, None)
+        if self.is_ingester:
+            self.backend.publish({"session": session_id, "closed": True})
+
+    def request(self, action: str, **kwargs) -> Dict[str, Any]:
+        return self.backend.request(action, **kwargs)
+
+    def stop(self):
+        self.backend.stop()
+
+
+# Global instance
+live_bus = LiveStateBus()
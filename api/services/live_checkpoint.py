@@ -0,0 +1,123 @@
+"""
+Periodic checkpoints of the live state for restart recovery.
+A checkpoint is a compact JSON snapshot of one session's state together with
+the recording file and the byte offset the parser had reached, so a restarted
+process can restore the state and resume tailing from that offset instead
+of re-parsing the whole recording.
+Checkpoints older than LIVE_CHECKPOINT_MAX_AGE are from a session that has
+long ended: their state is still restored, but they are flagged stale so a
+restart never reconnects to the feed and appends to an old recording. They
+are only deleted when their session is removed.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+class LiveCheckpointer:
+    def __init__(self, directory: str = os.path.join("live_data", "checkpoints"),
+                 interval: float = float(os.getenv("LIVE_CHECKPOINT_INTERVAL", 10)),
+                 max_age: float = float(os.getenv("LIVE_CHECKPOINT_MAX_AGE", 300))):
+        self.directory = directory
+        self.interval = interval
+        self.max_age = max_age
+        self._last_saved: Dict[str, float] = {}  # recording file -> monotonic time
+
+    def path_for(self, recording_file: str) -> str:
+        name = os.path.splitext(os.path.basename(recording_file))[0]
+        return os.path.join(self.directory, f"{name}.checkpoint.json")
+
+    def maybe_save(self, session, recording_file: str, offset: int, is_recording: bool = True) -> bool:
+        """Write a checkpoint if the interval has elapsed since the last one for this recording."""
+        if time.monotonic() - self._last_saved.get(recording_file, 0.0) < self.interval:
+            return False
+        return self.save(session, recording_file, offset, is_recording)
+
+    def save(self, session, recording_file: str, offset: int, is_recording: bool = True) -> bool:
+        """Atomically write a checkpoint: temp file, fsync, then rename over the old one."""
+        self._last_saved[recording_file] = time.monotonic()
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "session": session.session_id,
+            "mode": session.recorder.mode,
+            "file": recording_file,
+            "offset": offset,
+            "is_recording": is_recording,
+            "saved_at": datetime.now().isoformat(),
+            "state": session.state.snapshot(),
+        }
+        path = self.path_for(recording_file)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(checkpoint, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write live checkpoint {path}: {e}")
+            return False
+
+    def _checkpoints(self):
+        """(path, checkpoint) of every readable checkpoint, newest first."""
+        if not os.path.isdir(self.directory):
+            return
+        candidates = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".checkpoint.json")
+        ]
+        for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+            try:
+                with open(path) as f:
+                    checkpoint = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Skipping unreadable live checkpoint {path}: {e}")
+                continue
+            if checkpoint.get("version") != CHECKPOINT_VERSION:
+                continue
+            # Checkpoints written before sessions existed belong to the default session
+            checkpoint.setdefault("session", "default")
+            yield path, checkpoint
+
+    def load_latest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the most recently written checkpoint of each session, keyed by
+        session id. Checkpoints older than max_age come back with "stale" set.
+        """
+        latest = {}
+        for path, checkpoint in self._checkpoints():
+            if checkpoint["session"] in latest:
+                continue
+            age = time.time() - os.path.getmtime(path)
+            checkpoint["stale"] = age > self.max_age
+            if checkpoint["stale"]:
+                logger.info(f"Live checkpoint {path} is stale ({age:.0f}s old); its recording won't be resumed")
+            latest[checkpoint["session"]] = checkpoint
+        return latest
+
+    def delete_session(self, session_id: str) -> int:
+        """Delete every checkpoint of a session; returns how many were deleted."""
+        deleted = 0
+        for path, checkpoint in list(self._checkpoints()):
+            if checkpoint["session"] != session_id:
+                continue
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError as e:
+                logger.error(f"Failed to delete live checkpoint {path}: {e}")
+        return deleted
+
+
+# Global instance
+checkpointer = LiveCheckpointer()
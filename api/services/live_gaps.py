@@ -0,0 +1,103 @@
+"""
+Live gap estimation from timing line crossings.
+IntervalToPositionAhead and GapToLeader in TimingData are often stale or
+missing during safety car periods and pit cycles. Every sector end and
+finish line crossing is a timing point along the race distance; the first
+car through a point is the leader there and the previous car through the
+same point is the car ahead in race order, so the interval matches the
+feed's IntervalToPositionAhead. A car lapping another is ahead of it on the
+road but not in race order, and is never its car ahead. Each crossing is
+O(1), so keeping estimates for the whole field current is O(cars) per
+message.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+# Timing points per lap: end of sector 1, end of sector 2, finish line
+POINTS_PER_LAP = 3
+
+
+def timing_point(laps_completed: int, sector: Optional[int] = None) -> int:
+    """
+    Index of a timing point along the race distance. A line crossing is
+    reported as the new lap count, a sector end as its index within the lap
+    that is currently being driven.
+    """
+    if sector is None:
+        return laps_completed * POINTS_PER_LAP
+    return laps_completed * POINTS_PER_LAP + sector + 1
+
+
+class GapEstimator:
+    """
+    Gap to the leader and interval to the car ahead in race order, per car,
+    as of the last timing point it crossed.
+    """
+
+    def __init__(self, history_laps: int = 30):
+        self.history_points = history_laps * POINTS_PER_LAP
+        self.first_crossing: Dict[int, float] = {}  # point -> time the leader crossed it
+        self.last_crossing: Dict[int, Tuple[str, float]] = {}  # point -> (driver, time) of the latest car through
+        self.cars: Dict[str, Dict[str, Any]] = {}
+        self._max_point = 0
+        self._min_point = 0
+
+    def crossing(self, driver_num: str, point: int, timestamp: float):
+        """Register a car passing a timing point and update its gap and interval."""
+        car = self.cars.get(driver_num)
+        if car is not None and point <= car["point"]:
+            return
+        if point < self._min_point:
+            return
+
+        leader_time = self.first_crossing.setdefault(point, timestamp)
+        ahead = self.last_crossing.get(point)
+        self.last_crossing[point] = (driver_num, timestamp)
+
+        self.cars[driver_num] = {
+            "point": point,
+            "time": timestamp,
+            "gap_to_leader": timestamp - leader_time,
+            "interval": timestamp - ahead[1] if ahead else 0.0,
+            "car_ahead": ahead[0] if ahead else None,
+        }
+
+        if point > self._max_point:
+            self._max_point = point
+            self._prune()
+
+    def _prune(self):
+        # Keep only the last history_points timing points; this also bounds memory for long sessions
+        while self._min_point < self._max_point - self.history_points:
+            self.first_crossing.pop(self._min_point, None)
+            self.last_crossing.pop(self._min_point, None)
+            self._min_point += 1
+
+    def estimate(self, driver_num: str) -> Optional[Dict[str, Any]]:
+        car = self.cars.get(driver_num)
+        if car is None:
+            return None
+        return {
+            "gap_to_leader": round(car["gap_to_leader"], 3),
+            "interval": round(car["interval"], 3),
+            "car_ahead": car["car_ahead"],
+            "laps_behind_leader": (self._max_point - car["point"]) // POINTS_PER_LAP,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "first_crossing": {str(p): t for p, t in self.first_crossing.items()},
+            "last_crossing": {str(p): list(c) for p, c in self.last_crossing.items()},
+            "cars": self.cars,
+            "max_point": self._max_point,
+            "min_point": self._min_point,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "GapEstimator":
+        estimator = cls()
+        estimator.first_crossing = {int(p): t for p, t in snapshot.get("first_crossing", {}).items()}
+        estimator.last_crossing = {int(p): tuple(c) for p, c in snapshot.get("last_crossing", {}).items()}
+        estimator.cars = snapshot.get("cars", {})
+        estimator._max_point = snapshot.get("max_point", 0)
+        estimator._min_point = snapshot.get("min_point", 0)
+        return estimator
@@ -4,15 +4,19 @@ import logging
 import threading
 import os
 import ast
-from api.services.live_state import live_state
+from api.services.live_checkpoint import checkpointer
+from api.services.live_bus import live_bus
 
 logger = logging.getLogger(__name__)
 
 class LiveParser:
-    def __init__(self, filename):
+    def __init__(self, filename, session, start_offset=0):
         self.filename = filename
+        self.session = session  # LiveSession whose state this parser feeds
+        self.offset = start_offset  # Byte offset of the next unparsed line
         self.running = False
         self.thread = None
+        self._checkpointed_offset = start_offset
 
     def start(self):
         self.running = True
@@ -21,9 +25,10 @@ class LiveParser:
         self.thread.start()
 
     def stop(self):
+        """Stop tailing and wait for the line in progress, so offset and state agree."""
         self.running = False
         if self.thread:
-            self.thread.join(timeout=1.0)
+            self.thread.join()
 
     def _tail_and_parse(self):
         # Wait for file to exist
@@ -36,52 +41,72 @@ class LiveParser:
 
         logger.info(f"Started parsing live file: {self.filename}")
         
-        with open(self.filename, 'r') as f:
-            # If we are attaching to an existing file, we might want to read from the beginning
-            # to build the current state.
+        with open(self.filename, 'rb') as f:
+            # Resume from the given offset (0 replays the file to build the current state)
+            f.seek(self.offset)
             while self.running:
                 line = f.readline()
-                if not line:
+                if not line or not line.endswith(b"\n"):
+                    # Nothing new or the writer is mid-line: retry from the last complete line
+                    f.seek(self.offset)
+                    self._checkpoint()
                     time.sleep(0.1)
                     continue
-                
-                self._process_line(line)
 
-    def _process_line(self, line):
-        # Skip empty lines
-        if not line.strip():
-            return
+                self.offset += len(line)
+                self._process_line(line.decode("utf-8", errors="replace"))
+                live_bus.maybe_publish(self.session)
+                self._checkpoint()
+
+    def _checkpoint(self):
+        # Runs on the parser thread, so the snapshot always matches self.offset
+        if self.offset != self._checkpointed_offset:
+            if checkpointer.maybe_save(self.session, self.filename, self.offset):
+                self._checkpointed_offset = self.offset
 
-        data = None
+    def _process_line(self, line):
         try:
-            # Try standard JSON first
-            data = json.loads(line)
-        except json.JSONDecodeError:
-            try:
-                # Try parsing as Python literal (handles single quotes)
-                # FastF1 sometimes writes string representation of dicts
-                data = ast.literal_eval(line)
-            except (ValueError, SyntaxError):
-                pass
-        except Exception:
+            for category, payload, timestamp in parse_feed_messages(line):
+                self.session.state.update(category, payload, timestamp)
+                logger.info(f"Updated state for {category}") # Debug logging
+        except Exception as e:
+            logger.error(f"Error processing line: {e}")
             pass
 
-        if not data:
-            return
 
+def parse_feed_messages(line):
+    """
+    Extract (category, payload, timestamp) tuples from one line of a recording.
+    Lines are either JSON or the Python repr FastF1 writes in debug mode.
+    """
+    # Skip empty lines
+    if not line.strip():
+        return []
+
+    data = None
+    try:
+        # Try standard JSON first
+        data = json.loads(line)
+    except json.JSONDecodeError:
         try:
-            # Check for SignalR message structure
-            if "M" in data and isinstance(data["M"], list):
-                for msg in data["M"]:
-                    # We are looking for the "feed" method
-                    if msg.get("M") == "feed" and "A" in msg and isinstance(msg["A"], list):
-                        args = msg["A"]
-                        if len(args) >= 2:
-                            category = args[0]
-                            payload = args[1]
-                            # timestamp = args[2] if len(args) > 2 else None
-                            live_state.update(category, payload)
-                            logger.info(f"Updated state for {category}") # Debug logging
-        except Exception as e:
-            logger.error(f"Error processing line: {e}")
+            # Try parsing as Python literal (handles single quotes)
+            # FastF1 sometimes writes string representation of dicts
+            data = ast.literal_eval(line)
+        except (ValueError, SyntaxError):
             pass
+    except Exception:
+        pass
+
+    if not data or not isinstance(data, dict):
+        return []
+
+    messages = []
+    # Check for SignalR message structure
+    if "M" in data and isinstance(data["M"], list):
+        for msg in data["M"]:
+            # We are looking for the "feed" method
+            if msg.get("M") == "feed" and "A" in msg and isinstance(msg["A"], list):
+                args = msg["A"]
+                if len(args) >= 2:
+                    messages.append((args[0], args[1], args[2] if len(args) > 2 else None))
+    return messages
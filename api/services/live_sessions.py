@@ -0,0 +1,185 @@
+"""
+Registry of live sessions.
+Each session has its own LiveRaceState and LiveTimingRecorder, so a live
+session can be recorded while a replay is ingested next to it. The number of
+sessions is bounded; every per-session structure (lap history, telemetry
+windows, gap estimator) is already fixed-size, so memory per session is too.
+"""
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from api.services.live_bus import live_bus
+from api.services.live_checkpoint import checkpointer
+from api.services.live_state import LiveRaceState
+from api.services.live_timing import LiveTimingRecorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+class LiveSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.created_at = datetime.now()
+        self.state = LiveRaceState()
+        self.recorder = LiveTimingRecorder(self)
+
+    @property
+    def is_active(self) -> bool:
+        return self.recorder.is_recording
+
+
+class LiveSessionRegistry:
+    def __init__(self, max_sessions: int = int(os.getenv("LIVE_MAX_SESSIONS", 4))):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, LiveSession] = {DEFAULT_SESSION: LiveSession(DEFAULT_SESSION)}
+        self._applied: Dict[str, int] = {}  # session id -> sequence number of the last bus message applied
+
+    def sessions(self) -> List[LiveSession]:
+        return list(self._sessions.values())
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        return self._sessions.get(session_id)
+
+    def get_or_create(self, session_id: str) -> LiveSession:
+        """
+        Return a session, creating it if needed. At capacity the oldest idle
+        session is evicted; raises ValueError if every session is active.
+        """
+        if not _SESSION_ID.match(session_id or ""):
+            raise ValueError("Session ids are 1-32 letters, digits, '-' or '_'")
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                return session
+
+            if len(self._sessions) >= self.max_sessions:
+                idle = [s for s in self._sessions.values() if s.session_id != DEFAULT_SESSION and not s.is_active]
+                if not idle:
+                    raise ValueError(f"Maximum of {self.max_sessions} live sessions reached")
+                evicted = min(idle, key=lambda s: s.created_at)
+                del self._sessions[evicted.session_id]
+                live_bus.close_session(evicted.session_id)
+                logger.info(f"Evicted idle live session {evicted.session_id}")
+
+            session = self._sessions[session_id] = LiveSession(session_id)
+            return session
+
+    def remove(self, session_id: str) -> Dict[str, Any]:
+        if not live_bus.is_ingester:
+            return live_bus.request("remove_session", session=session_id)
+        if session_id == DEFAULT_SESSION:
+            return {"status": "error", "message": "The default session cannot be removed"}
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {"status": "error", "message": f"Unknown session: {session_id}"}
+            if session.is_active:
+                return {"status": "error", "message": "Stop the session before removing it"}
+            del self._sessions[session_id]
+        live_bus.close_session(session_id)
+        checkpointer.delete_session(session_id)
+        return {"status": "success", "message": f"Session {session_id} removed"}
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            dict(session.recorder.get_status(), created_at=session.created_at.isoformat())
+            for session in list(self._sessions.values())
+        ]
+
+    # Recorder commands; forwarded to the ingester when this worker is not it
+
+    def start_recording(self, session_id: str, filename: str = None) -> Dict[str, Any]:
+        if not live_bus.is_ingester:
+            return live_bus.request("start_recording", session=session_id, filename=filename)
+        try:
+            session = self.get_or_create(session_id)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        return dict(session.recorder.start_recording(filename), session=session_id)
+
+    def start_replay(self, session_id: str, filename: str) -> Dict[str, Any]:
+        if not live_bus.is_ingester:
+            return live_bus.request("start_replay", session=session_id, filename=filename)
+        try:
+            session = self.get_or_create(session_id)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        return dict(session.recorder.start_replay(filename), session=session_id)
+
+    def stop_recording(self, session_id: str) -> Dict[str, Any]:
+        if not live_bus.is_ingester:
+            return live_bus.request("stop_recording", session=session_id)
+        session = self.get(session_id)
+        if session is None:
+            return {"status": "error", "message": f"Unknown session: {session_id}"}
+        return dict(session.recorder.stop_recording(), session=session_id)
+
+    def handle_command(self, action, args):
+        """Execute a recorder command forwarded by another worker."""
+        session_id = args.get("session", DEFAULT_SESSION)
+        if action == "start_recording":
+            return self.start_recording(session_id, args.get("filename"))
+        if action == "start_replay":
+            return self.start_replay(session_id, args.get("filename"))
+        if action == "stop_recording":
+            return self.stop_recording(session_id)
+        if action == "remove_session":
+            return self.remove(session_id)
+        return {"status": "error", "message": f"Unknown recorder command: {action}"}
+
+    # Mirroring on workers that are not the ingester
+
+    def apply_snapshot(self, message: Dict[str, Any]):
+        session_id = message.get("session", DEFAULT_SESSION)
+        if message.get("closed"):
+            if session_id != DEFAULT_SESSION:
+                with self._lock:
+                    self._sessions.pop(session_id, None)
+            self._applied.pop(session_id, None)
+            return
+        try:
+            session = self.get_or_create(session_id)
+        except ValueError as e:
+            logger.error(f"Cannot mirror live session {session_id}: {e}")
+            return
+        seq = message.get("seq", 0)
+        if message.get("full", True):
+            session.state.restore(message["state"])
+        elif seq > self._applied.get(session_id, 0):
+            session.state.apply_delta(message["state"], message.get("laps", {}))
+        else:
+            # Published before the full snapshot this worker got when it joined
+            return
+        self._applied[session_id] = seq
+        session.state.telemetry.ingest_rows(message.get("telemetry", {}))
+
+    def resume_from_checkpoints(self):
+        """
+        Restore sessions from their latest checkpoints: the default session
+        always, other sessions only if they were still being fed. Stale
+        checkpoints restore the state without resuming the recording.
+        """
+        resumed = {}
+        for session_id, checkpoint in checkpointer.load_latest().items():
+            if session_id != DEFAULT_SESSION and not checkpoint.get("is_recording"):
+                continue
+            try:
+                session = self.get_or_create(session_id)
+            except ValueError as e:
+                logger.error(f"Cannot restore live session {session_id}: {e}")
+                continue
+            resumed[session_id] = session.recorder.resume(checkpoint)
+        return resumed
+
+
+# Global instance
+live_sessions = LiveSessionRegistry()
@@ -1,33 +1,34 @@
 import logging
+import time
 from datetime import datetime
+import numpy as np
+from api.services.lap_history import DriverLapHistory, completed_lap_from_car
+from api.services.live_gaps import GapEstimator, timing_point
+from api.services.live_telemetry import TelemetryStore, telemetry_decoder, parse_utc
 
 logger = logging.getLogger(__name__)
 
 class LiveRaceState:
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(LiveRaceState, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    """State of one live session; instances are owned by the session registry."""
 
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
         self.reset()
 
     def reset(self):
+        # Bumped whenever the lap history is replaced, so the bus knows deltas no longer apply
+        self.epoch = getattr(self, "epoch", 0) + 1
         self.cars = {}  # DriverNumber -> {Position, Gap, Interval, ...}
         self.weather = {}
         self.track_status = {}
         self.session_status = {}
         self.timing_data = {}
         self.lap_count = {}
+        self.lap_history = {}  # DriverNumber -> DriverLapHistory
+        self.telemetry = TelemetryStore()  # Decoded CarData.z / Position.z windows
+        self.gaps = GapEstimator()  # Gaps/intervals from timing line crossings
         self.last_updated = datetime.now()
 
-    def update(self, category, data):
+    def update(self, category, data, timestamp=None):
         self.last_updated = datetime.now()
         logger.info(f"LiveState update: {category}")
         
@@ -43,27 +44,138 @@ class LiveRaceState:
                     for driver_num, timing in data["Lines"].items():
                         if driver_num not in self.cars:
                             self.cars[driver_num] = {}
-                        
+
+                        self._register_crossings(driver_num, timing, timestamp)
+
                         # Update car data recursively or shallow merge
                         # F1 data sends partial updates
                         self._deep_update(self.cars[driver_num], timing)
-                        
+
+                        # A new NumberOfLaps means the car just crossed the line
+                        if "NumberOfLaps" in timing:
+                            self._record_lap(driver_num)
+
             elif category == "TimingAppData":
                 if "Lines" in data:
                      for driver_num, app_data in data["Lines"].items():
                         if driver_num not in self.cars:
                             self.cars[driver_num] = {}
                         if "Stints" in app_data:
-                            self.cars[driver_num]["Stints"] = app_data["Stints"]
+                            self._merge_stints(self.cars[driver_num], app_data["Stints"])
                         if "Line" in app_data:
                              self.cars[driver_num]["Line"] = app_data["Line"] # Grid position etc
                              
             elif category == "LapCount":
                 self.lap_count = data
 
+            elif category in ("CarData.z", "Position.z"):
+                # Inflated off-process, samples land in self.telemetry asynchronously
+                telemetry_decoder.submit(self.telemetry, category, data)
+
         except Exception as e:
             logger.error(f"Error updating live state for {category}: {e}")
 
+    def _register_crossings(self, driver_num, timing, timestamp):
+        # Must run before the merge: the point depends on the laps completed so far
+        message_time = parse_utc(timestamp) if timestamp else np.nan
+        if np.isnan(message_time):
+            message_time = time.time()
+
+        if "NumberOfLaps" in timing:
+            self.gaps.crossing(driver_num, timing_point(int(timing["NumberOfLaps"])), message_time)
+            return
+
+        # Partial sector updates are dicts; the full list is only sent on (re)connect
+        sectors = timing.get("Sectors")
+        if isinstance(sectors, dict):
+            laps_completed = int(self.cars[driver_num].get("NumberOfLaps", 0))
+            for sector in (0, 1):
+                entry = sectors.get(str(sector))
+                if isinstance(entry, dict) and entry.get("Value"):
+                    self.gaps.crossing(driver_num, timing_point(laps_completed, sector), message_time)
+
+    def _record_lap(self, driver_num):
+        lap = completed_lap_from_car(self.cars[driver_num])
+        if lap["lap_number"] <= 0:
+            return
+        if driver_num not in self.lap_history:
+            self.lap_history[driver_num] = DriverLapHistory()
+        self.lap_history[driver_num].record(
+            lap["lap_number"], lap["lap_time"], lap["sectors"],
+            compound=lap["compound"], stint=lap["stint"], gap=lap["gap"]
+        )
+
+    def _merge_stints(self, car, stints):
+        # The first message carries the full list, later ones are partial {"index": {...}} updates
+        current = car.get("Stints")
+        if isinstance(stints, dict) and isinstance(current, list):
+            current = {str(i): stint for i, stint in enumerate(current)}
+        if isinstance(stints, dict) and isinstance(current, dict):
+            self._deep_update(current, stints)
+            car["Stints"] = current
+        else:
+            car["Stints"] = stints
+
+    def snapshot(self, lap_history: bool = True):
+        """
+        Compact, JSON-serialisable copy of the state for checkpoints and the
+        live bus; the bus sends lap history separately, as deltas.
+        """
+        snapshot = {
+            "cars": self.cars,
+            "weather": self.weather,
+            "track_status": self.track_status,
+            "session_status": self.session_status,
+            "lap_count": self.lap_count,
+            "gaps": self.gaps.snapshot(),
+            "last_updated": self.last_updated.isoformat(),
+        }
+        if lap_history:
+            snapshot["lap_history"] = {driver_num: history.laps() for driver_num, history in self.lap_history.items()}
+        return snapshot
+
+    def restore(self, snapshot):
+        """Replace the state with a snapshot produced by snapshot()."""
+        # Build everything first so concurrent readers never see a half-empty state
+        lap_history = {}
+        for driver_num, laps in snapshot.get("lap_history", {}).items():
+            lap_history[driver_num] = DriverLapHistory()
+            lap_history[driver_num].extend(laps)
+
+        self._restore_fields(snapshot)
+        self.lap_history = lap_history
+        self.epoch += 1
+
+    def apply_delta(self, snapshot, laps):
+        """
+        Replace the state with a snapshot taken without lap history, and
+        append laps ({driver number: laps as returned by laps()}) to it.
+        """
+        lap_history = self.lap_history
+        for driver_num, driver_laps in laps.items():
+            if driver_num not in lap_history:
+                # Copied, not added to, so concurrent readers never iterate a changing dict
+                lap_history = dict(lap_history, **{driver_num: DriverLapHistory()})
+            lap_history[driver_num].extend(driver_laps)
+        self._restore_fields(snapshot)
+        self.lap_history = lap_history
+
+    def _restore_fields(self, snapshot):
+        self.cars = snapshot.get("cars", {})
+        self.weather = snapshot.get("weather", {})
+        self.track_status = snapshot.get("track_status", {})
+        self.session_status = snapshot.get("session_status", {})
+        self.lap_count = snapshot.get("lap_count", {})
+        self.gaps = GapEstimator.from_snapshot(snapshot.get("gaps", {}))
+        if snapshot.get("last_updated"):
+            self.last_updated = datetime.fromisoformat(snapshot["last_updated"])
+
+    def get_driver_laps(self, driver_num, last=None):
+        history = self.lap_history.get(str(driver_num))
+        if history is None:
+            return None
+        return {"laps": history.laps(last), "stats": history.stats()}
+
     def _deep_update(self, target, source):
         for key, value in source.items():
             if isinstance(value, dict) and key in target and isinstance(target[key], dict):
@@ -88,6 +200,18 @@ class LiveRaceState:
                 entry["last_lap_time"] = data["LastLapTime"]
             if "Sectors" in data:
                 entry["sectors"] = data["Sectors"]
+
+            # Estimated from line crossings; used when the feed leaves gaps blank
+            estimate = self.gaps.estimate(driver_num)
+            if estimate is not None:
+                entry["estimated_gap_to_leader"] = estimate["gap_to_leader"]
+                entry["estimated_interval"] = estimate["interval"]
+                entry["laps_behind_leader"] = estimate["laps_behind_leader"]
+                if not entry.get("gap_to_leader"):
+                    entry["gap_to_leader"] = f"+{estimate['gap_to_leader']:.3f}"
+                interval = entry.get("interval")
+                if not (interval.get("Value") if isinstance(interval, dict) else interval):
+                    entry["interval"] = {"Value": f"+{estimate['interval']:.3f}", "Estimated": True}
             
             # Include raw data for completeness
             entry["raw"] = data
@@ -102,5 +226,3 @@ class LiveRaceState:
         
         leaderboard.sort(key=get_pos)
         return leaderboard
-
-live_state = LiveRaceState()
@@ -0,0 +1,282 @@
+"""
+Decoding of the compressed live telemetry streams (CarData.z, Position.z).
+The payloads are base64 encoded raw-deflate JSON. Inflating and parsing them
+happens in a separate worker process so neither the parser thread nor the
+event loop competes for the GIL at stream rate. Decoded samples come back as
+compact tuples and are written into fixed-size numpy ring buffers per car.
+"""
+import base64
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import weakref
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# CarData channel ids as sent by the F1 live timing feed
+CAR_CHANNELS = {"0": "rpm", "2": "speed", "3": "gear", "4": "throttle", "5": "brake", "45": "drs"}
+CAR_FIELDS = ["rpm", "speed", "gear", "throttle", "brake", "drs"]
+POSITION_FIELDS = ["x", "y", "z"]
+
+
+def inflate(payload: str) -> Any:
+    """Decode a base64 + raw deflate payload into its JSON content."""
+    return json.loads(zlib.decompress(base64.b64decode(payload), -zlib.MAX_WBITS))
+
+
+def parse_utc(value: Optional[str]) -> float:
+    """Parse feed timestamps ("2023-03-05T15:03:09.1234567Z") into epoch seconds."""
+    if not value:
+        return np.nan
+    text = value.rstrip("Z")
+    if "." in text:
+        # The feed uses up to 7 fractional digits, datetime accepts at most 6
+        head, fraction = text.split(".", 1)
+        text = f"{head}.{fraction[:6]}"
+    try:
+        return datetime.fromisoformat(text + "+00:00").timestamp()
+    except ValueError:
+        return np.nan
+
+
+def decode_message(category: str, payload: str) -> List[tuple]:
+    """
+    Inflate a CarData.z / Position.z message into flat sample tuples:
+    (driver_number, timestamp, *channels).
+    """
+    data = inflate(payload)
+    samples = []
+    if category == "CarData.z":
+        for entry in data.get("Entries", []):
+            ts = parse_utc(entry.get("Utc"))
+            for driver_num, car in entry.get("Cars", {}).items():
+                channels = car.get("Channels", {})
+                samples.append((driver_num, ts) + tuple(
+                    channels.get(channel_id, np.nan) for channel_id in CAR_CHANNELS
+                ))
+    elif category == "Position.z":
+        for entry in data.get("Position", []):
+            ts = parse_utc(entry.get("Timestamp"))
+            for driver_num, pos in entry.get("Entries", {}).items():
+                samples.append((driver_num, ts, pos.get("X", np.nan), pos.get("Y", np.nan), pos.get("Z", np.nan)))
+    return samples
+
+
+def _decode_worker(inbox, outbox):
+    """Worker process loop: inflate payloads until a None sentinel arrives."""
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        sink_id, category, payload = item
+        try:
+            outbox.put((sink_id, category, decode_message(category, payload)))
+        except Exception as e:
+            outbox.put((sink_id, category, f"{type(e).__name__}: {e}"))
+
+
+class SampleWindow:
+    """Rolling, array-backed window of timestamped samples for one car."""
+
+    def __init__(self, fields: List[str], capacity: int):
+        self.fields = fields
+        self.capacity = capacity
+        self.time = np.full(capacity, np.nan)
+        self.values = np.full((capacity, len(fields)), np.nan)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def extend(self, rows: List[tuple]):
+        for row in rows:
+            self.time[self._head] = row[0]
+            self.values[self._head] = row[1:]
+            self._head = (self._head + 1) % self.capacity
+            self._count += 1
+
+    def _record(self, i) -> Dict[str, Any]:
+        ts = self.time[i]
+        record = {"timestamp": None if np.isnan(ts) else datetime.fromtimestamp(ts, timezone.utc).isoformat()}
+        for field, value in zip(self.fields, self.values[i]):
+            record[field] = None if np.isnan(value) else float(value)
+        return record
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        if not self._count:
+            return None
+        return self._record((self._head - 1) % self.capacity)
+
+    def latest_row(self) -> Optional[List[float]]:
+        if not self._count:
+            return None
+        i = (self._head - 1) % self.capacity
+        return [float(self.time[i])] + [float(v) for v in self.values[i]]
+
+    def window(self, seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        size = len(self)
+        order = np.arange(self._head - size, self._head) % self.capacity
+        if seconds is not None and size:
+            newest = self.time[order[-1]]
+            order = order[self.time[order] >= newest - seconds]
+        return [self._record(i) for i in order]
+
+
+class TelemetryStore:
+    """Per-car telemetry windows for one live session."""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.car_data: Dict[str, SampleWindow] = {}
+        self.position: Dict[str, SampleWindow] = {}
+
+    def ingest(self, category: str, samples: List[tuple]):
+        if category == "CarData.z":
+            windows, fields = self.car_data, CAR_FIELDS
+        else:
+            windows, fields = self.position, POSITION_FIELDS
+
+        by_car: Dict[str, List[tuple]] = {}
+        for sample in samples:
+            by_car.setdefault(sample[0], []).append(sample[1:])
+
+        with self._lock:
+            for driver_num, rows in by_car.items():
+                if driver_num not in windows:
+                    windows[driver_num] = SampleWindow(fields, self.capacity)
+                windows[driver_num].extend(rows)
+
+    def latest_rows(self) -> Dict[str, Dict[str, List[float]]]:
+        """Latest raw sample per car, as published to other workers."""
+        with self._lock:
+            return {
+                "car_data": {num: w.latest_row() for num, w in self.car_data.items()},
+                "position": {num: w.latest_row() for num, w in self.position.items()},
+            }
+
+    def ingest_rows(self, rows: Dict[str, Dict[str, List[float]]]):
+        """Append published samples that are newer than what this store already holds."""
+        for key, category, windows in (("car_data", "CarData.z", self.car_data),
+                                       ("position", "Position.z", self.position)):
+            samples = []
+            for driver_num, row in rows.get(key, {}).items():
+                current = windows.get(driver_num)
+                if row and (current is None or row[0] > current.latest_row()[0]):
+                    samples.append((driver_num, *row))
+            if samples:
+                self.ingest(category, samples)
+
+    def latest(self, driver_num: str) -> Dict[str, Any]:
+        with self._lock:
+            car = self.car_data.get(driver_num)
+            pos = self.position.get(driver_num)
+            return {
+                "car_data": car.latest() if car else None,
+                "position": pos.latest() if pos else None,
+            }
+
+    def window(self, driver_num: str, seconds: Optional[float] = None) -> Dict[str, Any]:
+        with self._lock:
+            car = self.car_data.get(driver_num)
+            pos = self.position.get(driver_num)
+            return {
+                "car_data": car.window(seconds) if car else [],
+                "position": pos.window(seconds) if pos else [],
+            }
+
+    def positions(self) -> Dict[str, Any]:
+        """Latest X/Y/Z for every car, for drawing a live track map."""
+        with self._lock:
+            return {driver_num: window.latest() for driver_num, window in self.position.items()}
+
+
+class TelemetryDecoder:
+    """
+    Ships compressed payloads to a worker process and routes the decoded
+    samples back to the TelemetryStore they were submitted for.
+    """
+
+    def __init__(self, max_pending: int = 512):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._sinks = weakref.WeakValueDictionary()
+        self._process = None
+        self._inbox = None
+        self._outbox = None
+        self._collector = None
+
+    def _ensure_started(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+            # spawn avoids forking the parser/recorder threads into the worker
+            ctx = multiprocessing.get_context("spawn")
+            self._inbox = ctx.Queue(maxsize=self.max_pending)
+            self._outbox = ctx.Queue()
+            self._process = ctx.Process(target=_decode_worker, args=(self._inbox, self._outbox), daemon=True)
+            self._process.start()
+            self._collector = threading.Thread(target=self._collect, args=(self._outbox,), daemon=True)
+            self._collector.start()
+            logger.info(f"Started telemetry decoder process (pid {self._process.pid})")
+
+    def submit(self, store: TelemetryStore, category: str, payload: str):
+        """Queue a payload for decoding. Drops the message if the worker is saturated."""
+        self._ensure_started()
+        self._sinks[id(store)] = store
+        try:
+            self._inbox.put_nowait((id(store), category, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def _collect(self, outbox):
+        while True:
+            try:
+                item = outbox.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            sink_id, category, samples = item
+            if isinstance(samples, str):
+                logger.error(f"Error decoding {category}: {samples}")
+                continue
+            store = self._sinks.get(sink_id)
+            if store is not None:
+                store.ingest(category, samples)
+
+    def stop(self):
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                self._inbox.put_nowait(None)
+                self._outbox.put(None)
+            except (queue.Full, OSError):
+                pass
+            self._process.join(timeout=1.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def get_status(self):
+        return {
+            "running": self._process is not None and self._process.is_alive(),
+            "pid": self._process.pid if self._process is not None else None,
+            "dropped_messages": self.dropped,
+        }
+
+
+# Global instance
+telemetry_decoder = TelemetryDecoder()
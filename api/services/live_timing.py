@@ -6,36 +6,32 @@ import json
 from datetime import datetime
 from fastf1.livetiming.client import SignalRClient
 from api.services.live_parser import LiveParser
-from api.services.live_state import live_state
+from api.services.live_checkpoint import checkpointer
+from api.services.live_bus import live_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class LiveTimingRecorder:
-    _instance = None
-    _lock = threading.Lock()
-
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super(LiveTimingRecorder, cls).__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-
-    def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
+    """
+    Feeds one live session, either from the SignalR stream ("live") or from an
+    existing recording ("replay"). Created by the session registry; commands
+    from other workers are forwarded there, not here.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._lock = threading.Lock()
         self.is_recording = False
+        self.mode = None  # "live" or "replay"
         self.current_file = None
         self.start_time = None
         self.client = None
         self.thread = None
         self.parser = None
         self.output_dir = "live_data"
-        
+
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
@@ -47,43 +43,117 @@ class LiveTimingRecorder:
 
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"live_timing_{timestamp}.json"
-            
+                if self.session.session_id == "default":
+                    filename = f"live_timing_{timestamp}.json"
+                else:
+                    filename = f"live_timing_{self.session.session_id}_{timestamp}.json"
+
             if not filename.endswith('.json'):
                 filename += '.json'
-                
-            self.current_file = os.path.join(self.output_dir, filename)
-            
+
+            path = self._recording_path(filename)
+            if path is None:
+                return {"status": "error", "message": f"Invalid recording name: {filename}"}
+            self.current_file = path
+
             # Reset state before new recording
-            live_state.reset()
-            
-            # Create client
+            self.session.state.reset()
+
             try:
-                # FastF1 SignalRClient writes to the specified file
-                self.client = SignalRClient(filename=self.current_file, debug=True)
-                
-                # Run client in background thread
-                self.thread = threading.Thread(target=self._run_client)
-                self.thread.daemon = True
-                self.thread.start()
-                
-                # Start parser to read the file and update state
-                self.parser = LiveParser(self.current_file)
-                self.parser.start()
-                
-                self.is_recording = True
-                self.start_time = datetime.now()
-                
-                logger.info(f"Started recording live timing to {self.current_file}")
+                self._start(self.current_file)
+
+                logger.info(f"Started recording live timing to {self.current_file} (session {self.session.session_id})")
                 return {
-                    "status": "success", 
-                    "message": "Recording started", 
+                    "status": "success",
+                    "message": "Recording started",
                     "file": self.current_file
                 }
             except Exception as e:
                 logger.error(f"Failed to start recording: {e}")
                 return {"status": "error", "message": str(e)}
 
+    def start_replay(self, filename: str):
+        """Ingest an existing recording into this session without connecting to the stream."""
+        with self._lock:
+            if self.is_recording:
+                return {"status": "error", "message": "Already recording"}
+
+            path = self._recording_path(filename)
+            if path is None or not os.path.exists(path):
+                return {"status": "error", "message": f"Recording not found: {filename}"}
+
+            self.current_file = path
+            self.session.state.reset()
+            self._start_parser(path, mode="replay")
+
+            logger.info(f"Started replay of {path} (session {self.session.session_id})")
+            return {"status": "success", "message": "Replay started", "file": path}
+
+    def _recording_path(self, filename):
+        """A recording's path in output_dir, by file name only; None if it would resolve outside it."""
+        path = os.path.join(self.output_dir, os.path.basename(filename or ""))
+        root = os.path.realpath(self.output_dir)
+        real = os.path.realpath(path)
+        if real == root or os.path.commonpath([root, real]) != root:
+            return None
+        return path
+
+    def _start(self, path, filemode='w', offset=0):
+        """Start the SignalR client writing to path and a parser tailing it from offset."""
+        # FastF1 SignalRClient writes to the specified file
+        self.client = SignalRClient(filename=path, filemode=filemode, debug=True)
+
+        # Run client in background thread
+        self.thread = threading.Thread(target=self._run_client)
+        self.thread.daemon = True
+        self.thread.start()
+
+        # Start parser to read the file and update state
+        self._start_parser(path, mode="live", offset=offset)
+
+    def _start_parser(self, path, mode, offset=0):
+        self.parser = LiveParser(path, self.session, start_offset=offset)
+        self.parser.start()
+
+        self.mode = mode
+        self.is_recording = True
+        self.start_time = datetime.now()
+
+    def resume(self, checkpoint):
+        """
+        Restore the session state from a checkpoint. If the recording was still
+        active when it was written, and the checkpoint isn't stale, reconnect in
+        append mode (or restart the replay) and resume tailing the file from
+        the checkpointed offset.
+        """
+        with self._lock:
+            if self.is_recording:
+                return None
+
+            self.session.state.restore(checkpoint["state"])
+            self.current_file = checkpoint["file"]
+            stale = bool(checkpoint.get("stale"))
+            resumed = checkpoint.get("is_recording") and not stale and os.path.exists(self.current_file)
+            if resumed:
+                try:
+                    if checkpoint.get("mode") == "replay":
+                        self._start_parser(self.current_file, mode="replay", offset=checkpoint["offset"])
+                    else:
+                        self._start(self.current_file, filemode='a', offset=checkpoint["offset"])
+                except Exception as e:
+                    logger.error(f"Failed to resume recording from checkpoint: {e}")
+                    resumed = False
+
+            logger.info(f"Restored live session {self.session.session_id} from checkpoint of {self.current_file} "
+                        f"(offset {checkpoint['offset']}, recording resumed: {bool(resumed)})")
+            return {
+                "file": self.current_file,
+                "offset": checkpoint["offset"],
+                "saved_at": checkpoint.get("saved_at"),
+                "stale": stale,
+                "recording_resumed": bool(resumed)
+            }
+
     def _run_client(self):
         """Internal method to run the client."""
         try:
@@ -101,28 +171,34 @@ class LiveTimingRecorder:
         with self._lock:
             if not self.is_recording:
                 return {"status": "error", "message": "Not recording"}
-            
-            # Stop parser
+
+            # Stop the parser (waits for its thread) and leave a final checkpoint of where it got to
             if self.parser:
                 self.parser.stop()
+                checkpointer.save(self.session, self.current_file, self.parser.offset, is_recording=False)
                 self.parser = None
-            
+
             # Note: We cannot easily stop the SignalRClient thread as it blocks on network.
             # It will eventually timeout or we can try to close it if we had access to the loop.
             # For now, we just mark as stopped.
-            
+
             self.is_recording = False
+            live_bus.publish(self.session)
             return {"status": "success", "message": "Recording marked as stopped"}
 
     def get_status(self):
         """Get current recording status."""
+        if not live_bus.is_ingester:
+            return live_bus.remote_status(self.session.session_id) or self.local_status()
+        return self.local_status()
+
+    def local_status(self):
         return {
+            "session": self.session.session_id,
             "is_recording": self.is_recording,
+            "mode": self.mode,
             "current_file": self.current_file,
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "duration": (datetime.now() - self.start_time).total_seconds() if self.is_recording and self.start_time else 0,
-            "cars_tracked": len(live_state.cars)
+            "cars_tracked": len(self.session.state.cars)
         }
-
-# Global instance
-recorder = LiveTimingRecorder()
@@ -0,0 +1,142 @@
+"""
+Schedule-aware prewarming of the session cache.
+The first request after a session ends used to wait for session.load() to
+download and parse everything. A background thread follows the current
+season's schedule and, shortly after each session's scheduled end, loads it
+into the session cache and computes the heaviest derived tables (gaps, tyre
+strategy, fastest lap), so the rush of requests after the chequered flag
+finds warm data. Sessions whose data is not published yet are retried on the
+next poll until PREWARM_WINDOW has passed.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from api.services.derived import fastest_lap, gap_table, tyre_strategy
+from api.services.schedule import get_schedule
+from api.services.session_cache import session_cache
+
+logger = logging.getLogger(__name__)
+
+# Scheduled start to expected end; anything not listed is assumed to run an hour
+SESSION_DURATIONS = {
+    "Race": timedelta(hours=2),
+    "Sprint": timedelta(hours=1),
+    "Qualifying": timedelta(hours=1),
+    "Sprint Qualifying": timedelta(minutes=45),
+    "Sprint Shootout": timedelta(minutes=45),
+}
+DEFAULT_DURATION = timedelta(hours=1)
+
+SessionRef = Tuple[int, int, str]
+
+
+class SessionPrewarmer:
+    def __init__(self,
+                 enabled: bool = os.getenv("PREWARM_ENABLED", "true").lower() in ("1", "true", "yes"),
+                 delay: float = float(os.getenv("PREWARM_DELAY", 600)),
+                 window: float = float(os.getenv("PREWARM_WINDOW", 6 * 3600)),
+                 poll_interval: float = float(os.getenv("PREWARM_POLL_INTERVAL", 60))):
+        self.enabled = enabled
+        # Seconds after the scheduled end before the first attempt; timing data lags the flag
+        self.delay = timedelta(seconds=delay)
+        # How long after the scheduled end a session is still worth prewarming
+        self.window = timedelta(seconds=window)
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._warmed: Dict[SessionRef, str] = {}
+        self._attempts: Dict[SessionRef, int] = {}
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info("Session prewarmer started")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                for ref in self.due_sessions(datetime.now(timezone.utc)):
+                    if self._stop.is_set():
+                        break
+                    self.prewarm(*ref)
+            except Exception as e:
+                self._last_error = str(e)
+                logger.error(f"Prewarm pass failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def due_sessions(self, now: datetime) -> List[SessionRef]:
+        """Sessions of the running season that ended recently and are not warm yet."""
+        schedule = get_schedule(now.year)
+        due = []
+        for _, event in schedule.iterrows():
+            if event.get('EventFormat') == 'testing':
+                continue
+            for n in range(1, 6):
+                name = event.get(f'Session{n}')
+                start = event.get(f'Session{n}DateUtc')
+                if not name or pd.isna(start):
+                    continue
+                ready_at = pd.Timestamp(start).tz_localize(timezone.utc).to_pydatetime() \
+                    + SESSION_DURATIONS.get(name, DEFAULT_DURATION) + self.delay
+                ref = (now.year, int(event['RoundNumber']), name)
+                if ready_at <= now < ready_at + self.window and ref not in self._warmed:
+                    due.append(ref)
+        return due
+
+    def prewarm(self, year: int, round_number: int, session_name: str) -> bool:
+        """Load one session and its derived tables; False if its data is not available yet."""
+        ref = (year, round_number, session_name)
+        with self._lock:
+            self._attempts[ref] = self._attempts.get(ref, 0) + 1
+        try:
+            session = session_cache.get_session(year, round_number, session_name)
+            if not session_cache.is_cached(year, round_number, session_name):
+                logger.info(f"Data for {year} round {round_number} {session_name} not available yet")
+                return False
+            gap_table(session)
+            tyre_strategy(session)
+            fastest_lap(session)
+        except Exception as e:
+            self._last_error = f"{year} round {round_number} {session_name}: {e}"
+            logger.warning(f"Prewarming {year} round {round_number} {session_name} failed: {e}")
+            return False
+
+        with self._lock:
+            self._warmed[ref] = datetime.now(timezone.utc).isoformat()
+        logger.info(f"Prewarmed {year} round {round_number} {session_name}")
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "delay_seconds": self.delay.total_seconds(),
+                "window_seconds": self.window.total_seconds(),
+                "warmed": [
+                    {"year": ref[0], "round": ref[1], "session": ref[2], "warmed_at": warmed_at}
+                    for ref, warmed_at in self._warmed.items()
+                ],
+                "attempts": {f"{ref[0]}/{ref[1]}/{ref[2]}": count for ref, count in self._attempts.items()},
+                "last_error": self._last_error,
+            }
+
+
+# Global instance
+session_prewarmer = SessionPrewarmer()
@@ -0,0 +1,122 @@
+"""
+In-memory cache of final encoded responses.
+Entries hold the exact bytes a route produced (and a gzipped copy for larger
+bodies), keyed by path and normalised query, so a hit skips the session
+lookup, the pandas work and JSON serialisation. Eviction is LRU bounded by
+total bytes; TTLs are tiered by how final the data is.
+"""
+import gzip
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "gzipped", "expires", "size")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, ttl: float):
+        self.status = status
+        self.headers = [(k, v) for k, v in headers if k.lower() not in (b"content-length", b"content-encoding", b"x-cache")]
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+        self.expires = time.monotonic() + ttl
+        self.size = len(body) + (len(self.gzipped) if self.gzipped else 0)
+
+    def encoded(self, accept_gzip: bool) -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+        """Headers and body for the client's Accept-Encoding."""
+        headers = list(self.headers)
+        body = self.body
+        if self.gzipped is not None:
+            headers.append((b"vary", b"Accept-Encoding"))
+            if accept_gzip:
+                headers.append((b"content-encoding", b"gzip"))
+                body = self.gzipped
+        headers.append((b"content-length", str(len(body)).encode()))
+        return headers, body
+
+
+class ResponseCache:
+    def __init__(self,
+                 max_bytes: int = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", 256)) * 1024 * 1024),
+                 past_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL_PAST", 7 * 24 * 3600)),
+                 current_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL_CURRENT", 300))):
+        self.max_bytes = max_bytes
+        self.past_ttl = past_ttl
+        self.current_ttl = current_ttl
+        # A single entry may not take more than an eighth of the cache
+        self.max_entry_bytes = max_bytes // 8
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0}
+
+    def ttl_for(self, season: int) -> float:
+        """Past seasons are final; the running season can still change on a race weekend."""
+        return self.past_ttl if season < datetime.now().year else self.current_ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, status: int, headers: List[Tuple[bytes, bytes]], body: bytes,
+            ttl: float) -> Optional[CachedResponse]:
+        """Store a response; returns the entry, or None if the body is too large to cache."""
+        if len(body) > self.max_entry_bytes:
+            return None
+        entry = CachedResponse(status, headers, body, ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """Drop every entry, or only those whose path starts with prefix. Returns the count dropped."""
+        with self._lock:
+            keys = [k for k in self._entries if prefix is None or k.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                size_mb=round(self._bytes / (1024 * 1024), 2),
+                max_size_mb=round(self.max_bytes / (1024 * 1024), 2),
+                hit_ratio=round(self._stats["hits"] / lookups, 3) if lookups else None,
+                ttl_past_seconds=self.past_ttl,
+                ttl_current_seconds=self.current_ttl,
+            )
+
+
+# Global instance
+response_cache = ResponseCache()
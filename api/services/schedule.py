@@ -0,0 +1,22 @@
+"""
+Event schedules served stale-while-revalidate.
+fastf1.get_event_schedule hits the network for the running season; callers
+get the last good schedule immediately while it is refreshed in the background.
+"""
+import fastf1
+import pandas as pd
+
+from api.services.swr import SWRCache, season_ttl
+
+# The running season's schedule only changes on postponements and additions
+CURRENT_SEASON_TTL = 3600
+
+schedule_cache = SWRCache("schedule", max_entries=32)
+
+
+def get_schedule(year: int) -> pd.DataFrame:
+    """
+    Event schedule for a season. The frame is shared between requests,
+    so callers must filter into new frames rather than modify it in place.
+    """
+    return schedule_cache.get(year, lambda: fastf1.get_event_schedule(year), season_ttl(year, CURRENT_SEASON_TTL))
@@ -0,0 +1,447 @@
+"""
+Season results index: one compact columnar table of race and sprint results
+per season (driver, team, position, grid, points, status), queried with
+vectorised filters instead of loading sessions per request.
+Results are loaded in a bounded thread pool (sessions already in the session
+cache are reused, others are loaded in the worker processes and come back as
+Arrow tables) and persisted as Parquet. Each request only loads sessions
+that are due and not in the table yet: a race or sprint is due once
+SEASON_RESULTS_DELAY has passed since its scheduled end. Sessions that come
+back without results, or with rows missing a position or points (results
+not final yet), are retried after SEASON_RESULTS_RETRY seconds, and their
+rows are replaced when they load.
+Loading runs on a background thread per season, which owns the thread pool
+and saves the table; requests follow it and may stop following at any time
+(a streaming client going away) without holding up the load or other
+requests for the season.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import fastf1
+import pandas as pd
+
+from api.services.cancellation import wait
+from api.services.prewarm import DEFAULT_DURATION, SESSION_DURATIONS
+from api.services.schedule import get_schedule
+from api.services.session_cache import session_cache
+from api.services.workers import from_arrow, to_arrow, worker_pool
+
+logger = logging.getLogger(__name__)
+
+SEASON_RESULTS_DIR = os.getenv("SEASON_RESULTS_DIR", os.path.join("data", "season_results"))
+SEASON_RESULTS_WORKERS = int(os.getenv("SEASON_RESULTS_WORKERS", 4))
+# Classification and points are published a while after the flag
+SEASON_RESULTS_DELAY = timedelta(seconds=float(os.getenv("SEASON_RESULTS_DELAY", 3600)))
+SEASON_RESULTS_RETRY = float(os.getenv("SEASON_RESULTS_RETRY", 900))
+
+# Session identifier -> session name in the event schedule
+SESSION_NAMES = {"R": "Race", "S": "Sprint"}
+
+DTYPES = {
+    "round": "int16",
+    "session": "category",  # R or S
+    "event_name": "category",
+    "driver_number": "category",
+    "driver": "category",
+    "full_name": "category",
+    "country_code": "category",
+    "team_name": "category",
+    "team_color": "category",
+    "position": "float32",
+    "grid_position": "float32",
+    "points": "float32",
+    "status": "category",
+}
+COLUMNS = list(DTYPES)
+
+# (round, session, event name)
+SessionRef = Tuple[int, str, str]
+
+
+def _empty_table() -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in DTYPES.items()})
+
+
+def _concat(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return _empty_table()
+    # Categories differ between parts, so re-encode after concatenating
+    table = pd.concat(parts, ignore_index=True).astype(DTYPES)
+    return table.sort_values(['round', 'session', 'position'], kind='stable', ignore_index=True)
+
+
+def _incomplete(table: pd.DataFrame) -> pd.Series:
+    """Rows of a session whose results were not final when loaded."""
+    return table['position'].isna() | table['points'].isna()
+
+
+def _sessions_mask(table: pd.DataFrame, refs: set) -> pd.Series:
+    """Rows of the given (round, session) pairs."""
+    return pd.Series([key in refs for key in zip(table['round'], table['session'])], index=table.index, dtype=bool)
+
+
+def _session_end(event: pd.Series, session_type: str) -> Optional[datetime]:
+    """Scheduled end (UTC) of an event's race or sprint; the day after race day without session times."""
+    name = SESSION_NAMES[session_type]
+    for n in range(1, 6):
+        start = event.get(f'Session{n}DateUtc')
+        if event.get(f'Session{n}') == name and pd.notna(start):
+            return pd.Timestamp(start).to_pydatetime() + SESSION_DURATIONS.get(name, DEFAULT_DURATION)
+    if pd.isna(event['EventDate']):
+        return None
+    return pd.Timestamp(event['EventDate']).to_pydatetime() + timedelta(days=1)
+
+
+def _results_table(results: pd.DataFrame, round_number: int, session_type: str, event_name: str) -> pd.DataFrame:
+    if results is None or results.empty:
+        return _empty_table()
+    table = pd.DataFrame({
+        "round": round_number,
+        "session": session_type,
+        "event_name": event_name,
+        "driver_number": results.get('DriverNumber'),
+        "driver": results.get('Abbreviation'),
+        "full_name": results.get('FullName'),
+        "country_code": results.get('CountryCode'),
+        "team_name": results.get('TeamName'),
+        "team_color": results.get('TeamColor'),
+        "position": pd.to_numeric(results.get('Position'), errors='coerce'),
+        "grid_position": pd.to_numeric(results.get('GridPosition'), errors='coerce'),
+        "points": pd.to_numeric(results.get('Points'), errors='coerce'),
+        "status": results.get('Status'),
+    }, columns=COLUMNS)
+    return table.astype(DTYPES).reset_index(drop=True)
+
+
+def _load_results(year: int, round_number: int, session_type: str, event_name: str):
+    """Runs in a worker process: the session's results table as an Arrow stream."""
+    session = fastf1.get_session(year, round_number, session_type)
+    session.load(laps=False, telemetry=False, weather=False, messages=False)
+    return to_arrow(_results_table(session.results, round_number, session_type, event_name))
+
+
+def _session_results(year: int, round_number: int, session_type: str, event_name: str) -> pd.DataFrame:
+    if worker_pool.enabled and not session_cache.is_cached(year, round_number, session_type, laps=False,
+                                                           telemetry=False, weather=False, messages=False):
+        return from_arrow(worker_pool.run(_load_results, year, round_number, session_type, event_name)).astype(DTYPES)
+    session = session_cache.get_session(year, round_number, session_type, laps=False, telemetry=False, weather=False,
+                                        messages=False, store=False)
+    return _results_table(session.results, round_number, session_type, event_name)
+
+
+def team_mask(table: pd.DataFrame, team_name: str, session_type: str = 'R') -> pd.Series:
+    """Rows of a session type for teams whose name contains team_name."""
+    return (table['session'] == session_type) & table['team_name'].str.contains(team_name, case=False, na=False, regex=False)
+
+
+def driver_mask(table: pd.DataFrame, driver: str) -> pd.Series:
+    """Rows of a driver given by number ("1") or abbreviation ("VER")."""
+    if driver.isdigit():
+        return table['driver_number'] == driver
+    return table['driver'] == driver.upper()
+
+
+class _SeasonLoad:
+    """
+    One season's load in progress: the frames it has produced so far, which
+    any number of requests read in order while the loader appends to them.
+    """
+
+    def __init__(self):
+        self._frames: List[pd.DataFrame] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = threading.Condition()
+
+    def add(self, frame: pd.DataFrame):
+        with self._changed:
+            self._frames.append(frame)
+            self._changed.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._changed:
+            self._done = True
+            self._error = error
+            self._changed.notify_all()
+
+    def follow(self) -> Iterator[pd.DataFrame]:
+        """Every frame of the load, waiting for new ones until it is finished."""
+        seen = 0
+        while True:
+            with self._changed:
+                wait(lambda timeout: self._changed.wait_for(lambda: self._done or len(self._frames) > seen, timeout),
+                     "load")
+                frames = self._frames[seen:]
+                done, error = self._done, self._error
+            for frame in frames:
+                yield frame
+            seen += len(frames)
+            if done and seen == len(self._frames):
+                if error is not None:
+                    raise error
+                return
+
+
+class SeasonResultsStore:
+    def __init__(self, directory: str = SEASON_RESULTS_DIR, max_workers: int = SEASON_RESULTS_WORKERS):
+        self.directory = directory
+        self.max_workers = max_workers
+        self._tables: Dict[int, pd.DataFrame] = {}
+        # (year, round, session) -> monotonic time before which a session without final results is not retried
+        self._retry_at: Dict[Tuple[int, int, str], float] = {}
+        # Season -> its load in progress
+        self._loads: Dict[int, _SeasonLoad] = {}
+        self._lock = threading.Lock()
+        # Bumped whenever a season's table changes (rounds added or reloaded); keys the memoised aggregates below
+        self._versions: Dict[int, int] = {}
+        self._memo: Dict[Tuple[int, str], Tuple[int, Any]] = {}
+
+    def _path(self, year: int) -> str:
+        return os.path.join(self.directory, f"{year}.parquet")
+
+    def _table(self, year: int) -> pd.DataFrame:
+        table = self._tables.get(year)
+        if table is None:
+            table = _empty_table()
+            path = self._path(year)
+            if os.path.exists(path):
+                stored = pd.read_parquet(path)
+                if list(stored.columns) == COLUMNS:
+                    table = stored.astype(DTYPES)
+                else:
+                    logger.info(f"Season results table for {year} has an old layout, rebuilding it")
+            self._tables[year] = table
+        return table
+
+    def _due_sessions(self, year: int) -> List[SessionRef]:
+        """Races and sprints that ended at least SEASON_RESULTS_DELAY ago."""
+        schedule = get_schedule(year)
+        if schedule is None or schedule.empty:
+            return []
+        # Schedule times are naive UTC
+        now = datetime.utcnow()
+        due = []
+        for _, event in schedule.iterrows():
+            if event['RoundNumber'] <= 0:
+                continue
+            session_types = ['R', 'S'] if 'sprint' in str(event.get('EventFormat', '')) else ['R']
+            for session_type in session_types:
+                end = _session_end(event, session_type)
+                if end is not None and end + SEASON_RESULTS_DELAY <= now:
+                    due.append((int(event['RoundNumber']), session_type, event['EventName']))
+        return due
+
+    def iter_results(self, year: int) -> Iterator[pd.DataFrame]:
+        """
+        Yield the stored table first, then each missing or refreshed session as
+        it finishes loading. One load per season at a time, on a background
+        thread that persists the merged table; concurrent callers follow the
+        same load.
+        """
+        with self._lock:
+            load = self._loads.get(year)
+            if load is None:
+                load = self._loads[year] = _SeasonLoad()
+                threading.Thread(target=self._run_load, args=(year, load), name=f"season-results-{year}",
+                                 daemon=True).start()
+        return load.follow()
+
+    def _run_load(self, year: int, load: _SeasonLoad):
+        error = None
+        try:
+            self._load(year, load)
+        except Exception as e:
+            logger.error(f"Loading season results of {year} failed: {e}")
+            error = e
+        finally:
+            with self._lock:
+                self._loads.pop(year, None)
+            load.finish(error)
+
+    def _load(self, year: int, load: _SeasonLoad):
+        table = self._table(year)
+        stored = set(zip(table['round'], table['session']))
+        incomplete = set(zip(table.loc[_incomplete(table), 'round'], table.loc[_incomplete(table), 'session']))
+        now = time.monotonic()
+        missing = [
+            ref for ref in self._due_sessions(year)
+            if (ref[:2] not in stored or ref[:2] in incomplete) and self._retry_at.get((year,) + ref[:2], 0) <= now
+        ]
+        # Stored rows of sessions being reloaded are only served if the reload fails
+        refreshed = {ref[:2] for ref in missing if ref[:2] in stored}
+        current = table[~_sessions_mask(table, refreshed)] if refreshed else table
+        if not current.empty:
+            load.add(current)
+        if not missing:
+            return
+
+        loaded = []
+        replaced = set()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="season-results") as pool:
+                futures = {pool.submit(_session_results, year, *ref): ref for ref in missing}
+                for future in as_completed(futures):
+                    round_number, session_type, event_name = futures[future]
+                    key = (round_number, session_type)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # Usually data that is not published yet; retried on the next request
+                        logger.warning(f"Could not load {session_type} results of {year} round {round_number} ({event_name}): {e}")
+                        results = _empty_table()
+                    else:
+                        if results.empty or _incomplete(results).any():
+                            self._retry_at[(year,) + key] = time.monotonic() + SEASON_RESULTS_RETRY
+                        else:
+                            self._retry_at.pop((year,) + key, None)
+                    if results.empty:
+                        if key in refreshed:
+                            load.add(table[_sessions_mask(table, {key})])
+                        continue
+                    loaded.append(results)
+                    replaced.add(key)
+                    load.add(results)
+        finally:
+            # Keeps the sessions loaded so far if a later one brings the load down
+            if loaded:
+                self._save(year, _concat([table[~_sessions_mask(table, replaced)]] + loaded))
+
+    def get_results(self, year: int) -> pd.DataFrame:
+        """The full results table of a season, ordered by round, session and position."""
+        return _concat(list(self.iter_results(year)))
+
+    def _save(self, year: int, table: pd.DataFrame):
+        previous = self._tables.get(year)
+        if previous is not None and previous.astype(object).equals(table.astype(object)):
+            # A reload that brought nothing new keeps the aggregates built on the old table
+            return
+        self._tables[year] = table
+        self._versions[year] = self._versions.get(year, 0) + 1
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(year) + ".tmp"
+            table.to_parquet(tmp_path, index=False, compression="zstd")
+            os.replace(tmp_path, self._path(year))
+            logger.info(f"Saved {len(table)} results of {table['round'].nunique()} rounds for {year}")
+        except Exception as e:
+            logger.error(f"Could not persist season results for {year}: {e}")
+
+    def _memoised(self, year: int, name: str, compute: Callable[[pd.DataFrame], Any]) -> Any:
+        """Aggregate over a season's table, recomputed whenever its rows change."""
+        table = self.get_results(year)
+        version = self._versions.get(year, 0)
+        cached = self._memo.get((year, name))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = compute(table)
+        self._memo[(year, name)] = (version, value)
+        return value
+
+    def points_progression(self, year: int, by: str = 'driver') -> Dict[str, Any]:
+        """
+        Cumulative championship points (races plus sprints) after every round,
+        as a drivers-or-teams x rounds matrix ordered by current points.
+        """
+        column = 'driver' if by == 'driver' else 'team_name'
+
+        def compute(table: pd.DataFrame) -> Dict[str, Any]:
+            if table.empty:
+                return {"rounds": [], "series": []}
+            rounds = table.drop_duplicates('round')[['round', 'event_name']]
+            per_round = table.pivot_table(index=column, columns='round', values='points', aggfunc='sum',
+                                          fill_value=0, observed=True)
+            cumulative = per_round.reindex(columns=rounds['round']).fillna(0).cumsum(axis=1)
+            positions = cumulative.rank(axis=0, method='min', ascending=False).astype(int)
+            cumulative = cumulative.sort_values(cumulative.columns[-1], ascending=False, kind='stable')
+            positions = positions.loc[cumulative.index]
+
+            latest = table.drop_duplicates(column, keep='last').set_index(column).astype(object)
+            latest = latest.where(latest.notna(), None)
+            series = []
+            for name, points in cumulative.iterrows():
+                if by == 'driver':
+                    entry = {"driver": name, "full_name": latest.at[name, 'full_name'], "team": latest.at[name, 'team_name']}
+                else:
+                    entry = {"team": name, "team_color": latest.at[name, 'team_color']}
+                entry["points"] = [float(p) for p in points]
+                entry["positions"] = [int(p) for p in positions.loc[name]]
+                series.append(entry)
+            return {
+                "rounds": [{"round": int(r), "event_name": e} for r, e in zip(rounds['round'], rounds['event_name'])],
+                "series": series,
+            }
+
+        return self._memoised(year, f"progression:{by}", compute)
+
+    def team_results(self, year: int, team_name: str, session_type: str = 'R') -> pd.DataFrame:
+        table = self.get_results(year)
+        return table[team_mask(table, team_name, session_type)]
+
+    def teams(self, year: int) -> pd.DataFrame:
+        """Teams of the season, in the finishing order of the first race they appear in."""
+        table = self.get_results(year)
+        return table[['team_name', 'team_color']].drop_duplicates('team_name')
+
+    def drivers(self, year: int) -> pd.DataFrame:
+        """Every driver who started a race this season, with their latest team, by car number."""
+        table = self.get_results(year)
+        latest = table[table['session'] == 'R'].drop_duplicates('driver_number', keep='last')
+        order = pd.to_numeric(latest['driver_number'].astype(str), errors='coerce')
+        return latest.iloc[order.argsort(kind='stable')]
+
+    def head_to_head(self, year: int, driver1: str, driver2: str) -> Optional[Dict[str, Any]]:
+        """Race and sprint comparison of two drivers over the season; None if either never raced."""
+        table = self.get_results(year)
+        first = table[driver_mask(table, driver1)]
+        second = table[driver_mask(table, driver2)]
+        if first.empty or second.empty:
+            return None
+
+        keys = ['round', 'session', 'event_name']
+        columns = keys + ['position', 'grid_position', 'points']
+        both = first[columns].merge(second[columns], on=keys, suffixes=('_1', '_2'))
+        finished = both.dropna(subset=['position_1', 'position_2'])
+        races = finished[finished['session'] == 'R']
+        sprints = finished[finished['session'] == 'S']
+
+        def side(rows: pd.DataFrame, n: int) -> Dict[str, Any]:
+            other = 3 - n
+            return {
+                "driver": rows['driver'].iloc[-1],
+                "team": rows['team_name'].iloc[-1],
+                "race_ahead": int((races[f'position_{n}'] < races[f'position_{other}']).sum()),
+                "sprint_ahead": int((sprints[f'position_{n}'] < sprints[f'position_{other}']).sum()),
+                "grid_ahead": int((races[f'grid_position_{n}'] < races[f'grid_position_{other}']).sum()),
+                "points": float(both[f'points_{n}'].sum()),
+                "best_finish": int(races[f'position_{n}'].min()) if not races.empty else None,
+            }
+
+        return {
+            "driver1": side(first, 1),
+            "driver2": side(second, 2),
+            "races_compared": int(len(races)),
+            "sprints_compared": int(len(sprints)),
+            "rounds": [
+                {
+                    "round": int(row['round']),
+                    "session": row['session'],
+                    "event_name": row['event_name'],
+                    "driver1_position": float(row['position_1']) if pd.notna(row['position_1']) else None,
+                    "driver2_position": float(row['position_2']) if pd.notna(row['position_2']) else None,
+                    "driver1_points": float(row['points_1']) if pd.notna(row['points_1']) else None,
+                    "driver2_points": float(row['points_2']) if pd.notna(row['points_2']) else None,
+                }
+                for _, row in both.iterrows()
+            ],
+        }
+
+
+# Global instance
+season_results = SeasonResultsStore()
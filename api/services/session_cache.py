@@ -0,0 +1,342 @@
+"""
+In-memory cache of loaded FastF1 sessions and tables derived from them.
+FastF1's disk cache avoids re-downloading, but every request still paid for
+parsing and building the laps/telemetry frames in session.load(). Sessions
+are kept in an LRU keyed by (year, round, session), with event names resolved
+to rounds by the event resolver; concurrent requests for the same session
+share one load, and a request that needs more data (e.g. telemetry) loads
+the union of flags into a new object which then replaces the cached one,
+so readers of the old object are never disturbed.
+
+Each cached session also keeps its laps partitioned by driver, built once
+when the session is loaded: sorted by driver and lap number, with every
+driver's row range, so per-driver access is a slice.
+
+Cold sessions are first parsed in a worker process (api/services/workers.py),
+which leaves the parsed timing feeds in FastF1's disk cache, so the load in
+this process reads them back instead of parsing under the GIL. At most
+SESSION_LOAD_CONCURRENCY loads run here at a time.
+
+A load that comes back without lap data (typically a session that only just
+ended, before the timing data is published) is returned but not cached.
+
+Cached sessions are shared between requests: routes must copy before
+modifying any frame they get from a session.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+import fastf1
+import numpy as np
+import pandas as pd
+
+from api.services.cancellation import RequestCancelled, current_token, holding
+from api.services.event_resolver import event_resolver
+from api.services.workers import prefetch_session, worker_pool
+
+logger = logging.getLogger(__name__)
+
+LOAD_FLAGS = ("laps", "telemetry", "weather", "messages")
+SESSION_LOAD_CONCURRENCY = int(os.getenv("SESSION_LOAD_CONCURRENCY", 2))
+# FastF1's cached API parsers behind the slowest parts of each load flag
+PARSED_FEEDS = {"laps": ("_extended_timing_data",), "telemetry": ("car_data", "position_data")}
+
+SessionKey = Tuple[int, int, str]
+
+
+class LapPartition:
+    """A session's laps sorted by driver (in session order) then lap number, with each driver's row range."""
+    __slots__ = ("laps", "offsets")
+
+    def __init__(self, laps):
+        drivers, numbers = pd.factorize(laps['DriverNumber'])
+        order = np.lexsort((laps['LapNumber'].to_numpy(), drivers))
+        # Still a fastf1 Laps, bound to the session, so get_telemetry() keeps working on slices
+        self.laps = laps.iloc[order]
+        bounds = np.searchsorted(drivers[order], np.arange(len(numbers) + 1))
+        self.offsets: Dict[str, Tuple[int, int]] = {
+            str(number): (int(bounds[i]), int(bounds[i + 1])) for i, number in enumerate(numbers)
+        }
+
+    def driver(self, number: str):
+        """The driver's laps in lap order; None if the driver has no laps."""
+        bounds = self.offsets.get(number)
+        return self.laps.iloc[bounds[0]:bounds[1]] if bounds is not None else None
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        for number, (start, stop) in self.offsets.items():
+            yield number, self.laps.iloc[start:stop]
+
+
+class _CachedSession:
+    __slots__ = ("session", "flags", "loaded_at", "derived", "partition")
+
+    def __init__(self, session, flags: frozenset, partition: Optional[LapPartition] = None):
+        self.session = session
+        self.flags = flags
+        self.loaded_at = time.time()
+        self.derived: Dict[Hashable, Any] = {}
+        self.partition = partition
+
+
+def _has_laps(session) -> bool:
+    try:
+        return not session.laps.empty
+    except Exception:
+        # DataNotLoadedError when the lap data could not be loaded
+        return False
+
+
+def _parsed_on_disk(session, flags: frozenset) -> bool:
+    """Whether FastF1's disk cache already holds the parsed feeds a load with these flags reads."""
+    try:
+        if fastf1.Cache._CACHE_DIR is None:
+            return True
+        return all(
+            os.path.isfile(fastf1.Cache._get_cache_file_path(session.api_path, feed))
+            for flag in flags for feed in PARSED_FEEDS.get(flag, ())
+        )
+    except Exception:
+        # Unknown cache layout: load in this process as before
+        return True
+
+
+class SessionCache:
+    def __init__(self, max_sessions: int = int(os.getenv("SESSION_CACHE_SIZE", 4))):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[SessionKey, _CachedSession]" = OrderedDict()
+        self._aliases: Dict[Tuple[int, str, str], SessionKey] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[SessionKey, threading.Lock] = {}
+        # Cancel tokens (None outside requests) of the callers waiting for each load
+        self._waiters: Dict[SessionKey, list] = {}
+        self._load_slots = threading.BoundedSemaphore(max(SESSION_LOAD_CONCURRENCY, 1))
+        self._stats = {"hits": 0, "misses": 0, "upgrades": 0, "incomplete": 0, "evictions": 0, "derived_hits": 0, "derived_misses": 0,
+                       "prefetched": 0, "abandoned": 0}
+
+    @staticmethod
+    def _canonical_event(year: int, event):
+        """
+        The event's round when the resolver knows it, so every spelling of an
+        event shares one cache entry and FastF1 skips its own fuzzy matching.
+        """
+        try:
+            round_number = event_resolver.round_number(year, event)
+        except Exception as e:
+            logger.debug(f"Could not resolve {event!r} for {year}: {e}")
+            return event
+        return round_number if round_number is not None else event
+
+    def _resolve(self, year: int, event, session_type: str):
+        """Cache key of a session; the FastF1 object is only returned when it had to be created."""
+        alias = (year, str(event).strip().lower(), session_type.upper())
+        key = self._aliases.get(alias)
+        if key is not None:
+            return key, None
+        session = fastf1.get_session(year, event, session_type)
+        key = (year, int(session.event["RoundNumber"]), session.name)
+        self._aliases[alias] = key
+        return key, session
+
+    def get_session(self, year: int, event, session_type: str, laps: bool = True, telemetry: bool = True,
+                    weather: bool = True, messages: bool = True, store: bool = True):
+        """
+        Return a loaded session with at least the requested data.
+        Same arguments as fastf1.get_session() followed by Session.load().
+        With store=False a cached session is still used, but a fresh load is
+        not kept, so bulk scans over a season do not evict hot sessions.
+        """
+        requested = frozenset(
+            flag for flag, wanted in zip(LOAD_FLAGS, (laps, telemetry, weather, messages)) if wanted
+        )
+        name = event
+        event = self._canonical_event(year, event)
+        key, session = self._resolve(year, event, session_type)
+        # Lets is_loaded() answer for the name as requested, without resolving it
+        self._aliases.setdefault((year, str(name).strip().lower(), session_type.upper()), key)
+
+        with self._lock:
+            cached = self._sessions.get(key)
+            if cached is not None and requested <= cached.flags:
+                self._sessions.move_to_end(key)
+                self._stats["hits"] += 1
+                return cached.session
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+            waiter = current_token()
+            self._waiters.setdefault(key, []).append(waiter)
+
+        try:
+            # One load per session at a time; later callers find the result cached
+            with holding(key_lock, "load"):
+                abandoned = lambda: self._abandoned(key)
+                with self._lock:
+                    cached = self._sessions.get(key)
+                    if cached is not None and requested <= cached.flags:
+                        self._sessions.move_to_end(key)
+                        self._stats["hits"] += 1
+                        return cached.session
+                    flags = requested | (cached.flags if cached is not None else frozenset())
+                    self._stats["upgrades" if cached is not None else "misses"] += 1
+                if abandoned():
+                    raise RequestCancelled("load")
+
+                if session is None or cached is not None:
+                    session = fastf1.get_session(year, event, session_type)
+                if worker_pool.enabled and not _parsed_on_disk(session, flags):
+                    try:
+                        worker_pool.run(prefetch_session, year, event, session_type, flags, abandoned=abandoned)
+                        with self._lock:
+                            self._stats["prefetched"] += 1
+                    except Exception as e:
+                        logger.warning(f"Worker prefetch of {key} failed, loading in process: {e}")
+                with holding(self._load_slots, "load", abandoned):
+                    if abandoned():
+                        raise RequestCancelled("load")
+                    session.load(**{flag: flag in flags for flag in LOAD_FLAGS})
+                partition = LapPartition(session.laps) if store and "laps" in flags and _has_laps(session) else None
+
+                with self._lock:
+                    if "laps" in flags and not _has_laps(session):
+                        logger.warning(f"No lap data for {key} yet, not caching the session")
+                        self._stats["incomplete"] += 1
+                        return session
+                    if not store:
+                        return session
+                    entry = _CachedSession(session, flags, partition)
+                    if cached is not None:
+                        # Derived tables only depend on data the old object already had
+                        entry.derived = cached.derived
+                    self._sessions[key] = entry
+                    self._sessions.move_to_end(key)
+                    while len(self._sessions) > self.max_sessions:
+                        evicted, _ = self._sessions.popitem(last=False)
+                        self._key_locks.pop(evicted, None)
+                        self._stats["evictions"] += 1
+                        logger.info(f"Evicted session {evicted} from the session cache")
+                return session
+        except RequestCancelled:
+            with self._lock:
+                self._stats["abandoned"] += 1
+            raise
+        finally:
+            with self._lock:
+                waiters = self._waiters[key]
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+    def _abandoned(self, key: SessionKey) -> bool:
+        """Whether every caller waiting for key's load has been cancelled."""
+        with self._lock:
+            return all(waiter is not None and waiter.cancelled for waiter in self._waiters.get(key, ()))
+
+    def derived(self, session, name: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Memoise a table derived from a cached session (gaps, strategy, ...).
+        Entries live as long as the session stays cached.
+        """
+        with self._lock:
+            entry = next((e for e in self._sessions.values() if e.session is session), None)
+            if entry is not None and name in entry.derived:
+                self._stats["derived_hits"] += 1
+                return entry.derived[name]
+            self._stats["derived_misses"] += 1
+
+        value = compute()
+        if entry is not None:
+            with self._lock:
+                entry.derived[name] = value
+        return value
+
+    def derived_lru(self, session, group: Hashable, key: Hashable, compute: Callable[[], Any],
+                    max_entries: int) -> Any:
+        """
+        Like derived(), for tables asked for with many different parameters
+        (telemetry comparisons): the group keeps its max_entries most recently
+        used values per session, so arbitrary requests can't grow it without bound.
+        """
+        with self._lock:
+            entry = next((e for e in self._sessions.values() if e.session is session), None)
+            values = entry.derived.get(group) if entry is not None else None
+            if values is not None and key in values:
+                values.move_to_end(key)
+                self._stats["derived_hits"] += 1
+                return values[key]
+            self._stats["derived_misses"] += 1
+
+        value = compute()
+        if entry is not None and max_entries > 0:
+            with self._lock:
+                values = entry.derived.setdefault(group, OrderedDict())
+                values[key] = value
+                values.move_to_end(key)
+                while len(values) > max_entries:
+                    values.popitem(last=False)
+        return value
+
+    def lap_partition(self, session) -> Optional[LapPartition]:
+        """
+        The session's laps partitioned by driver; built at load time for
+        cached sessions, on the spot for others. None without lap data.
+        """
+        with self._lock:
+            entry = next((e for e in self._sessions.values() if e.session is session), None)
+            if entry is not None and entry.partition is not None:
+                return entry.partition
+        if not _has_laps(session):
+            return None
+        partition = LapPartition(session.laps)
+        if entry is not None:
+            with self._lock:
+                entry.partition = partition
+        return partition
+
+    def is_cached(self, year: int, event, session_type: str, laps: bool = True, telemetry: bool = True,
+                  weather: bool = True, messages: bool = True) -> bool:
+        requested = frozenset(
+            flag for flag, wanted in zip(LOAD_FLAGS, (laps, telemetry, weather, messages)) if wanted
+        )
+        event = self._canonical_event(year, event)
+        key = self._aliases.get((year, str(event).strip().lower(), session_type.upper()))
+        with self._lock:
+            cached = self._sessions.get(key) if key else None
+            return cached is not None and requested <= cached.flags
+
+    def is_loaded(self, year: int, event, session_type: str) -> bool:
+        """
+        Whether a session is in memory, going only by names it was requested
+        under before; never resolves the event, so it is safe on the event loop.
+        """
+        key = self._aliases.get((year, str(event).strip().lower(), session_type.upper()))
+        return key is not None and key in self._sessions
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._key_locks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                max_sessions=self.max_sessions,
+                sessions=[
+                    {
+                        "year": key[0],
+                        "round": key[1],
+                        "session": key[2],
+                        "loaded": sorted(entry.flags),
+                        "loaded_at": entry.loaded_at,
+                        "derived": [str(name) for name in entry.derived],
+                    }
+                    for key, entry in self._sessions.items()
+                ],
+            )
+
+
+# Global instance
+session_cache = SessionCache()
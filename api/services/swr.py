@@ -0,0 +1,160 @@
+"""
+Stale-while-revalidate cache for upstream calls (event schedules, Ergast).
+A fresh value is returned as is. A stale value is returned immediately while
+a single background thread refreshes it; parallel refreshes of the same key
+collapse into that one. If the refresh fails, the stale value keeps being
+served, and retries back off. Only a key that has never loaded blocks the
+caller, and concurrent first loads of a key share one upstream call.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Every cache, for the /cache/upstream metrics endpoint
+swr_caches: List["SWRCache"] = []
+
+
+# Freshness of data about finished seasons
+PAST_SEASON_TTL = 7 * 24 * 3600
+
+# Seconds before retrying a failed refresh, doubled per consecutive failure
+RETRY_BACKOFF = 5.0
+MAX_RETRY_BACKOFF = 300.0
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "error", "failures", "retry_at")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.error = None
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+def _flight() -> threading.Event:
+    """Completion event of an in-flight load; carries the error for waiters."""
+    event = threading.Event()
+    event.error = None
+    return event
+
+
+def season_ttl(year: int, current_ttl: float) -> float:
+    """Past seasons are final and only need an occasional refresh."""
+    return current_ttl if year >= datetime.now().year else PAST_SEASON_TTL
+
+
+class SWRCache:
+    def __init__(self, name: str, max_entries: int = 256):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stats = {"fresh": 0, "stale": 0, "loads": 0, "refreshes": 0, "refresh_errors": 0}
+        swr_caches.append(self)
+
+    def get(self, key: Hashable, loader: Callable[[], Any], ttl: float) -> Any:
+        """
+        Return the value for key, loading it with loader() on first use and
+        refreshing it in the background once it is older than ttl seconds.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    now = time.monotonic()
+                    if now - entry.fetched_at < ttl:
+                        self._stats["fresh"] += 1
+                        return entry.value
+                    self._stats["stale"] += 1
+                    if key not in self._inflight and now >= entry.retry_at:
+                        self._inflight[key] = _flight()
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return entry.value
+
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    done = self._inflight[key] = _flight()
+                    break
+
+            # Another caller is loading this key for the first time; share its outcome
+            waiting.wait()
+            if waiting.error is not None:
+                raise waiting.error
+
+        try:
+            value = loader()
+            self._store(key, value)
+            with self._lock:
+                self._stats["loads"] += 1
+            return value
+        except Exception as e:
+            done.error = e
+            raise
+        finally:
+            self._finish(key, done)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        done = self._inflight[key]
+        try:
+            value = loader()
+            self._store(key, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the stale value and back off before asking upstream again
+            logger.warning(f"{self.name}: refresh of {key} failed, serving stale value: {e}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.error = str(e)
+                    entry.failures += 1
+                    entry.retry_at = time.monotonic() + min(RETRY_BACKOFF * 2 ** (entry.failures - 1), MAX_RETRY_BACKOFF)
+        finally:
+            self._finish(key, done)
+
+    def _store(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(value)
+            while len(self._entries) > self.max_entries:
+                # Dicts keep insertion order and stores re-insert, so this drops the oldest load
+                del self._entries[next(iter(self._entries))]
+
+    def _finish(self, key: Hashable, done: threading.Event):
+        with self._lock:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+        done.set()
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return dict(
+                self._stats,
+                name=self.name,
+                entries=len(self._entries),
+                refreshing=len(self._inflight),
+                keys={
+                    str(key): {
+                        "age_seconds": round(now - entry.fetched_at, 1),
+                        "last_refresh_error": entry.error,
+                        "failed_refreshes": entry.failures,
+                    }
+                    for key, entry in self._entries.items()
+                },
+            )
@@ -0,0 +1,199 @@
+"""
+Process pool for heavy FastF1 work.
+Route handlers run in Starlette's thread pool, so a few session.load() calls
+(pure-Python parsing of the timing feeds) hold the GIL and starve cheap
+endpoints like /health or /live/leaderboard. Work that can be expressed as
+"arguments in, table out" runs in worker processes instead: parsing cold
+sessions into FastF1's disk cache, and loading season results. Tables come
+back as Arrow IPC streams, which cross the process boundary as one buffer and
+are read back without per-row work.
+
+Submissions are bounded: at most WORKER_QUEUE_SIZE jobs are queued or running,
+and callers wait up to WORKER_QUEUE_TIMEOUT for a slot before giving up with
+WorkerPoolBusy. With WORKER_PROCESSES=0 jobs run in the calling thread.
+A caller can pass abandoned=, polled while it waits: once it returns True
+the job is withdrawn if it has not started yet (a started job runs to the
+end, its result unused) and the caller gets RequestCancelled.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from api.services.cancellation import CANCEL_POLL_SECONDS, RequestCancelled
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", 2))
+WORKER_QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", 8))
+WORKER_QUEUE_TIMEOUT = float(os.getenv("WORKER_QUEUE_TIMEOUT", 30))
+WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", 600))
+
+
+class WorkerPoolBusy(Exception):
+    """Every slot of the worker queue stayed taken for WORKER_QUEUE_TIMEOUT."""
+
+
+def to_arrow(frame: pd.DataFrame) -> pa.Buffer:
+    """A DataFrame as an Arrow IPC stream (index dropped)."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def from_arrow(buffer) -> pd.DataFrame:
+    """The DataFrame of an Arrow IPC stream written by to_arrow()."""
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+def _init_worker():
+    # Same FastF1 cache as the API process, so what a worker parses is reused there
+    cache_dir = os.getenv("FASTF1_CACHE_DIR")
+    if cache_dir:
+        import fastf1
+        fastf1.Cache.enable_cache(cache_dir)
+    logging.basicConfig(level=logging.WARNING)
+
+
+def prefetch_session(year: int, event, session_type: str, flags) -> None:
+    """Load a session in a worker so FastF1's disk cache holds its parsed timing feeds."""
+    import fastf1
+    session = fastf1.get_session(year, event, session_type)
+    session.load(**{flag: flag in flags for flag in ("laps", "telemetry", "weather", "messages")})
+
+
+class WorkerPool:
+    def __init__(self, processes: int = WORKER_PROCESSES, queue_size: int = WORKER_QUEUE_SIZE,
+                 queue_timeout: float = WORKER_QUEUE_TIMEOUT, timeout: float = WORKER_TIMEOUT):
+        self.processes = processes
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(queue_size, 1))
+        self._queue_size = max(queue_size, 1)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "restarts": 0, "abandoned": 0,
+                       "queued_seconds": 0.0}
+        self._active = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the API process runs threads (live feed, prewarmer) that fork would copy mid-state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                logger.info(f"Started {self.processes} worker processes")
+            return self._executor
+
+    def run(self, fn: Callable[..., Any], *args, abandoned: Optional[Callable[[], bool]] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) in a worker process and return its result.
+        fn must be a module-level function; arguments and result are pickled.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        started = time.monotonic()
+        if not self._acquire_slot(abandoned):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise WorkerPoolBusy(f"{self._queue_size} jobs already queued for the worker processes")
+        release = True
+        try:
+            with self._lock:
+                self._stats["submitted"] += 1
+                self._stats["queued_seconds"] += time.monotonic() - started
+                self._active += 1
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+                result = self._result(future, abandoned)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool for the next job
+                with self._lock:
+                    self._executor = None
+                    self._stats["restarts"] += 1
+                raise
+            except RequestCancelled:
+                with self._lock:
+                    self._stats["abandoned"] += 1
+                if not future.cancel():
+                    # Still running in a worker: its slot is taken until it ends
+                    release = False
+                    future.add_done_callback(lambda _: self._slots.release())
+                raise
+            except Exception:
+                with self._lock:
+                    self._stats["failed"] += 1
+                raise
+            with self._lock:
+                self._stats["completed"] += 1
+            return result
+        finally:
+            with self._lock:
+                self._active -= 1
+            if release:
+                self._slots.release()
+
+    def _acquire_slot(self, abandoned: Optional[Callable[[], bool]]) -> bool:
+        if abandoned is None:
+            return self._slots.acquire(timeout=self.queue_timeout)
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if self._slots.acquire(timeout=max(min(remaining, CANCEL_POLL_SECONDS), 0)):
+                return True
+            if abandoned():
+                raise RequestCancelled("load")
+            if remaining <= CANCEL_POLL_SECONDS:
+                return False
+
+    def _result(self, future: Future, abandoned: Optional[Callable[[], bool]]) -> Any:
+        if abandoned is None:
+            return future.result(timeout=self.timeout)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                return future.result(timeout=max(min(remaining, CANCEL_POLL_SECONDS), 0))
+            except FutureTimeout:
+                # Not the builtin TimeoutError before Python 3.11
+                if remaining <= CANCEL_POLL_SECONDS:
+                    raise
+            if abandoned():
+                raise RequestCancelled("load")
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                processes=self.processes,
+                running=self._executor is not None,
+                active=self._active,
+                queue_size=self._queue_size,
+            )
+
+
+# Global instance
+worker_pool = WorkerPool()
@@ -9,8 +9,18 @@ from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from api.routes import events, results, laps, telemetry, drivers, weather, track_status, positions, pit_stops, circuits, race_control, sectors, gaps, tyres, teams, standings, ergast, live, reference, cache, reference, cache
+from api.routes import events, results, laps, telemetry, drivers, weather, track_status, positions, pit_stops, circuits, race_control, sectors, gaps, tyres, teams, standings, ergast, live, reference, cache, reference, cache, batch
 from api.models.schemas import ErrorResponse, ErrorDetail
+from api.middleware.http_cache import HTTPCacheMiddleware
+from api.middleware.response_cache import ResponseCacheMiddleware
+from api.middleware.admission import AdmissionMiddleware
+from api.middleware.cancellation import CancellationMiddleware
+from api.services.live_telemetry import telemetry_decoder
+from api.services.live_sessions import live_sessions
+from api.services.live_bus import live_bus
+from api.services.prewarm import session_prewarmer
+from api.services.historical_db import historical_sync
+from api.services.workers import worker_pool
 
 # Load environment variables
 load_dotenv()
@@ -27,9 +37,23 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events."""
     # Startup
     print("FastF1 API starting up...")
+    # Elect the live feed ingester among workers; the others mirror its state
+    live_bus.start(live_sessions, live_sessions.handle_command, on_promoted=live_sessions.resume_from_checkpoints)
+    if live_bus.is_ingester:
+        # Pick up live sessions interrupted by a restart from their last checkpoints
+        live_sessions.resume_from_checkpoints()
+    # Load sessions into the session cache as soon as they end
+    session_prewarmer.start()
+    # Keep the current season of the historical database in step with Ergast
+    historical_sync.start()
     yield
     # Shutdown
     print("FastF1 API shutting down...")
+    session_prewarmer.stop()
+    historical_sync.stop()
+    worker_pool.stop()
+    telemetry_decoder.stop()
+    live_bus.stop()
 
 
 # Create FastAPI app
@@ -40,6 +64,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost first: disconnect watching, admission control (cache hits and 304s skip it),
+# cached response bytes, then ETag / Cache-Control (before CORS so 304s still get CORS headers)
+app.add_middleware(CancellationMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(HTTPCacheMiddleware)
+
 # Configure CORS for Swift app
 app.add_middleware(
     CORSMiddleware,
@@ -122,6 +153,7 @@ app.include_router(reference.router, prefix="/api/v1", tags=["Reference Data"])
 app.include_router(cache.router, prefix="/api/v1", tags=["Cache Management"])
 app.include_router(reference.router, prefix="/api/v1", tags=["Reference Data"])
 app.include_router(cache.router, prefix="/api/v1", tags=["Cache Management"])
+app.include_router(batch.router, prefix="/api/v1", tags=["Batch"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from api.services import event_resolver as resolver_module
+from api.services.event_resolver import EventResolver
+
+EVENTS = [
+    (0, "Pre-Season Testing", "Sakhir", "Bahrain", "FORMULA 1 ARAMCO PRE-SEASON TESTING 2024"),
+    (1, "Bahrain Grand Prix", "Sakhir", "Bahrain", "FORMULA 1 GULF AIR BAHRAIN GRAND PRIX 2024"),
+    (6, "Miami Grand Prix", "Miami", "United States", "FORMULA 1 CRYPTO.COM MIAMI GRAND PRIX 2024"),
+    (7, "Emilia Romagna Grand Prix", "Imola", "Italy", "FORMULA 1 MSC CRUISES GRAN PREMIO DEL MADE IN ITALY E DELL'EMILIA-ROMAGNA 2024"),
+    (12, "British Grand Prix", "Silverstone", "United Kingdom", "FORMULA 1 QATAR AIRWAYS BRITISH GRAND PRIX 2024"),
+    (13, "Italian Grand Prix", "Monza", "Italy", "FORMULA 1 PIRELLI GRAN PREMIO D'ITALIA 2024"),
+    (19, "United States Grand Prix", "Austin", "United States", "FORMULA 1 PIRELLI UNITED STATES GRAND PRIX 2024"),
+    (20, "Mexico City Grand Prix", "Mexico City", "Mexico", "FORMULA 1 GRAN PREMIO DE LA CIUDAD DE MÉXICO 2024"),
+    (21, "São Paulo Grand Prix", "São Paulo", "Brazil", "FORMULA 1 LENOVO GRANDE PRÊMIO DE SÃO PAULO 2024"),
+    (22, "Las Vegas Grand Prix", "Las Vegas", "United States", "FORMULA 1 HEINEKEN SILVER LAS VEGAS GRAND PRIX 2024"),
+]
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    schedule = pd.DataFrame(EVENTS, columns=["RoundNumber", "EventName", "Location", "Country", "OfficialEventName"])
+    monkeypatch.setattr(resolver_module, "get_schedule", lambda year: schedule)
+    return EventResolver()
+
+
+@pytest.mark.parametrize("name", ["monza", "Monza", "Italian Grand Prix", "italian", "Italian GP", "13"])
+def test_names_of_one_event_resolve_to_its_round(resolver, name):
+    assert resolver.round_number(2024, name) == 13
+
+
+@pytest.mark.parametrize("name, round_number", [
+    ("sao paulo", 21),
+    ("São Paulo GP", 21),
+    ("imola", 7),
+    ("emilia", 7),
+    ("silverstone", 12),
+    ("mexico", 20),
+    ("bahrain", 1),
+])
+def test_locations_countries_and_partial_names(resolver, name, round_number):
+    assert resolver.round_number(2024, name) == round_number
+
+
+@pytest.mark.parametrize("name", ["grand prix", "Grand Prix", "gp", "formula 1 grand prix", "prix"])
+def test_generic_words_match_nothing(resolver, name):
+    assert resolver.round_number(2024, name) is None
+
+
+@pytest.mark.parametrize("name, round_number", [
+    ("united states", 19),
+    ("United States Grand Prix", 19),
+    ("miami", 6),
+    ("las vegas", 22),
+])
+def test_event_name_wins_over_a_shared_country(resolver, name, round_number):
+    assert resolver.round_number(2024, name) == round_number
+
+
+def test_country_of_several_rounds_is_a_miss(resolver):
+    # Imola and Monza are both in Italy
+    assert resolver.round_number(2024, "italy") is None
+    assert resolver.round_number(2024, "Italy") is None
+
+
+def test_substring_shared_by_several_events_is_a_miss(resolver):
+    # "united" is in both the United Kingdom and the United States
+    assert resolver.round_number(2024, "united") is None
+
+
+def test_testing_and_unknown_events_have_no_round(resolver):
+    assert resolver.round_number(2024, "Pre-Season Testing") is None
+    assert resolver.round_number(2024, "99") is None
+    assert resolver.round_number(2024, "atlantis") is None
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from api.services.live_bus import InProcessBackend, LiveStateBus
+from api.services.live_sessions import DEFAULT_SESSION, LiveSessionRegistry
+
+
+def _complete_lap(session, driver_num: str, lap_number: int):
+    session.state.update("TimingData", {"Lines": {driver_num: {
+        "NumberOfLaps": lap_number, "LastLapTime": {"Value": f"1:3{lap_number}.000"},
+    }}})
+
+
+def _lap_numbers(session, driver_num: str):
+    return [lap["lap_number"] for lap in session.state.lap_history[driver_num].laps()]
+
+
+@pytest.fixture
+def ingester():
+    return LiveSessionRegistry()
+
+
+@pytest.fixture
+def bus(ingester):
+    bus = LiveStateBus(backend=InProcessBackend(), publish_interval=0)
+    bus.start(ingester, ingester.handle_command, lambda: None)
+    return bus
+
+
+@pytest.fixture
+def session(ingester):
+    return ingester.get(DEFAULT_SESSION)
+
+
+def _subscribe(bus):
+    """A mirroring worker; returns its registry and the messages it received."""
+    mirror, received = LiveSessionRegistry(), []
+
+    def on_snapshot(message):
+        # Copied through JSON like on the socket, so later changes to the ingester's state don't leak in
+        message = json.loads(json.dumps(message))
+        received.append(message)
+        mirror.apply_snapshot(message)
+
+    bus.backend.subscribe(on_snapshot)
+    return mirror, received
+
+
+def test_joining_subscriber_gets_a_full_snapshot(bus, session):
+    _complete_lap(session, "1", 1)
+    _complete_lap(session, "1", 2)
+    mirror, received = _subscribe(bus)
+
+    assert [message["full"] for message in received] == [True]
+    assert _lap_numbers(mirror.get(DEFAULT_SESSION), "1") == [1, 2]
+
+
+def test_messages_after_the_first_carry_only_new_laps(bus, session):
+    mirror, received = _subscribe(bus)
+    _complete_lap(session, "1", 1)
+    bus.publish(session)
+    _complete_lap(session, "1", 2)
+    _complete_lap(session, "44", 1)
+    bus.publish(session)
+
+    delta = received[-1]
+    assert not delta["full"]
+    assert "lap_history" not in delta["state"]
+    assert {driver: [lap["lap_number"] for lap in laps] for driver, laps in delta["laps"].items()} == {"1": [2], "44": [1]}
+    assert [message["seq"] for message in received[1:]] == [1, 2]
+    mirrored = mirror.get(DEFAULT_SESSION)
+    assert _lap_numbers(mirrored, "1") == [1, 2]
+    assert _lap_numbers(mirrored, "44") == [1]
+
+    # Nothing new: the delta carries no laps
+    bus.publish(session)
+    assert received[-1]["laps"] == {}
+
+
+def test_reset_state_is_sent_in_full(bus, session):
+    mirror, received = _subscribe(bus)
+    for lap_number in (1, 2, 3):
+        _complete_lap(session, "1", lap_number)
+    bus.publish(session)
+
+    # Restoring a shorter history bumps the epoch; a delta could not remove laps
+    snapshot = session.state.snapshot()
+    snapshot["lap_history"]["1"] = snapshot["lap_history"]["1"][:1]
+    session.state.restore(snapshot)
+    bus.publish(session)
+
+    assert received[-1]["full"]
+    assert _lap_numbers(mirror.get(DEFAULT_SESSION), "1") == [1]
+
+
+def test_delta_older_than_the_joining_snapshot_is_ignored(bus, session):
+    _, received = _subscribe(bus)
+    _complete_lap(session, "1", 1)
+    bus.publish(session)
+    _complete_lap(session, "1", 2)
+    bus.publish(session)
+    late_delta = received[-1]
+    _complete_lap(session, "1", 3)
+    bus.publish(session)
+
+    # A worker joining now is sent state up to lap 3 before the earlier delta reaches it
+    mirror, _ = _subscribe(bus)
+    mirror.apply_snapshot(late_delta)
+    mirrored = mirror.get(DEFAULT_SESSION)
+    assert mirrored.state.cars["1"]["NumberOfLaps"] == 3
+    assert _lap_numbers(mirrored, "1") == [1, 2, 3]
+
+
+def test_closed_session_is_dropped_by_subscribers(bus, ingester):
+    replay = ingester.get_or_create("replay")
+    _complete_lap(replay, "1", 1)
+    bus.publish(replay)
+    mirror, received = _subscribe(bus)
+    assert mirror.get("replay") is not None
+
+    bus.close_session("replay")
+    assert received[-1] == {"session": "replay", "closed": True}
+    assert mirror.get("replay") is None
+
+    # A session of the same id starts over from a full snapshot
+    bus.publish(ingester.get_or_create("replay"))
+    assert received[-1]["full"]
+    assert received[-1]["seq"] == 1
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from api.services.live_gaps import POINTS_PER_LAP, GapEstimator, timing_point
+
+
+def test_timing_points_run_along_the_race_distance():
+    assert timing_point(0, 0) == 1
+    assert timing_point(0, 1) == 2
+    assert timing_point(1) == POINTS_PER_LAP
+    assert timing_point(1, 0) == POINTS_PER_LAP + 1
+
+
+def test_gap_and_interval_at_a_timing_point():
+    gaps = GapEstimator()
+    gaps.crossing("1", 3, 100.0)
+    gaps.crossing("4", 3, 101.5)
+    gaps.crossing("16", 3, 104.25)
+
+    assert gaps.estimate("1") == {"gap_to_leader": 0.0, "interval": 0.0, "car_ahead": None, "laps_behind_leader": 0}
+    assert gaps.estimate("4") == {"gap_to_leader": 1.5, "interval": 1.5, "car_ahead": "1", "laps_behind_leader": 0}
+    assert gaps.estimate("16") == {"gap_to_leader": 4.25, "interval": 2.75, "car_ahead": "4", "laps_behind_leader": 0}
+    assert gaps.estimate("44") is None
+
+
+def test_car_ahead_is_the_one_ahead_in_race_order():
+    gaps = GapEstimator()
+    gaps.crossing("1", 3, 100.0)
+    gaps.crossing("4", 3, 101.0)
+    # The leader laps car 2 before it reaches the line: it crosses behind car 1 on the road
+    gaps.crossing("1", 6, 190.0)
+    gaps.crossing("2", 3, 195.0)
+
+    estimate = gaps.estimate("2")
+    assert estimate["car_ahead"] == "4"
+    assert estimate["interval"] == 94.0
+    assert estimate["gap_to_leader"] == 95.0
+    assert estimate["laps_behind_leader"] == 1
+
+
+def test_old_or_repeated_points_are_ignored():
+    gaps = GapEstimator()
+    gaps.crossing("1", 4, 100.0)
+    gaps.crossing("1", 4, 120.0)
+    gaps.crossing("1", 3, 130.0)
+    assert gaps.cars["1"]["time"] == 100.0
+
+
+def test_history_is_bounded():
+    gaps = GapEstimator(history_laps=1)
+    for point in range(1, 11):
+        gaps.crossing("1", point, float(point))
+
+    assert set(gaps.first_crossing) == set(range(10 - POINTS_PER_LAP, 11))
+    assert set(gaps.last_crossing) == set(gaps.first_crossing)
+    # A car reporting a point that has been pruned gets no estimate from it
+    gaps.crossing("4", 2, 50.0)
+    assert gaps.estimate("4") is None
+
+
+def test_snapshot_round_trip():
+    gaps = GapEstimator()
+    gaps.crossing("1", 3, 100.0)
+    gaps.crossing("4", 3, 101.5)
+
+    restored = GapEstimator.from_snapshot(json.loads(json.dumps(gaps.snapshot())))
+    restored.crossing("16", 3, 103.0)
+    assert restored.estimate("4") == gaps.estimate("4")
+    assert restored.estimate("16")["car_ahead"] == "4"
+    assert restored.estimate("16")["gap_to_leader"] == pytest.approx(3.0)
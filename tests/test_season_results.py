@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from api.services import season_results as season_results_module
+from api.services.season_results import SeasonResultsStore, _results_table
+
+DUE = [(1, "R", "Bahrain Grand Prix"), (2, "R", "Saudi Arabian Grand Prix"), (3, "R", "Australian Grand Prix")]
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Loaded (year, round, session) in order; round n takes n * 0.2s."""
+    loaded = []
+
+    def session_results(year, round_number, session_type, event_name):
+        time.sleep(0.2 * round_number)
+        loaded.append((year, round_number, session_type))
+        results = pd.DataFrame({"DriverNumber": ["1"], "Abbreviation": ["VER"], "TeamName": ["Red Bull Racing"],
+                                "Position": [1], "Points": [25]})
+        return _results_table(results, round_number, session_type, event_name)
+
+    monkeypatch.setattr(season_results_module, "_session_results", session_results)
+    return loaded
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SeasonResultsStore(str(tmp_path))
+    store._due_sessions = lambda year: DUE
+    return store
+
+
+def test_sessions_are_streamed_as_they_load_and_saved(store, loads, tmp_path):
+    frames = list(store.iter_results(2024))
+    assert [int(frame["round"].iloc[0]) for frame in frames] == [1, 2, 3]
+    assert (tmp_path / "2024.parquet").exists()
+
+    # Everything is stored now; a second request loads nothing
+    assert len(store.get_results(2024)) == 3
+    assert len(loads) == 3
+
+
+def test_client_leaving_does_not_wait_for_the_load(store, loads):
+    started = time.monotonic()
+    stream = store.iter_results(2024)
+    next(stream)
+    stream.close()
+    assert time.monotonic() - started < 0.5
+
+    # The load carries on in the background and is saved
+    assert len(store.get_results(2024)) == 3
+    assert len(loads) == 3
+
+
+def test_concurrent_requests_share_one_load(store, loads):
+    tables = []
+    threads = [threading.Thread(target=lambda: tables.append(store.get_results(2024))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [len(table) for table in tables] == [3, 3, 3]
+    assert len(loads) == 3
+
+
+def test_failed_load_reaches_the_caller(store, loads):
+    def broken(year):
+        raise RuntimeError("schedule unavailable")
+
+    store._due_sessions = broken
+    with pytest.raises(RuntimeError, match="schedule unavailable"):
+        store.get_results(2024)
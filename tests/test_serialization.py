@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.services.cancellation import CancelToken, RequestCancelled, bound, checkpoint
+from utils import serialization
+from utils.serialization import dataframe_to_dict_list
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(serialization, "CHECKPOINT_ROWS", 10)
+
+
+def _frame(rows: int = 25) -> pd.DataFrame:
+    return pd.DataFrame({"Distance": np.arange(rows, dtype=float), "Speed": [np.nan] + [300.0] * (rows - 1)})
+
+
+def test_check_runs_before_and_every_batch_of_rows():
+    calls = []
+    records = dataframe_to_dict_list(_frame(), check=lambda: calls.append(1))
+    assert len(records) == 25
+    assert records[0] == {"Distance": 0.0, "Speed": None}
+    # Before the first row, then at rows 10 and 20
+    assert len(calls) == 3
+
+
+def test_cancelled_request_stops_serializing():
+    token = CancelToken()
+    calls = []
+
+    def check():
+        calls.append(1)
+        if len(calls) == 2:
+            token.cancel()
+        checkpoint("serialize")
+
+    with bound(token), pytest.raises(RequestCancelled) as raised:
+        try:
+            dataframe_to_dict_list(_frame(), check=check)
+        except Exception:
+            pytest.fail("RequestCancelled must get past the routes' `except Exception` handlers")
+    assert raised.value.stage == "serialize"
+    assert len(calls) == 2
+
+
+def test_already_cancelled_request_serializes_nothing():
+    token = CancelToken()
+    token.cancel()
+    with bound(token), pytest.raises(RequestCancelled):
+        dataframe_to_dict_list(_frame(), check=lambda: checkpoint("serialize"))
+
+
+def test_batch_sub_request_is_cancelled_with_its_batch():
+    batch = CancelToken()
+    with bound(CancelToken(parent=batch)):
+        assert len(dataframe_to_dict_list(_frame(), check=lambda: checkpoint("serialize"))) == 25
+        batch.cancel()
+        with pytest.raises(RequestCancelled):
+            dataframe_to_dict_list(_frame(), check=lambda: checkpoint("serialize"))
+
+
+def test_outside_a_request_nothing_is_cancelled():
+    assert len(dataframe_to_dict_list(_frame(), check=lambda: checkpoint("serialize"))) == 25
+    assert dataframe_to_dict_list(pd.DataFrame(), check=lambda: pytest.fail("not called for empty frames")) == []
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from api.services import cancellation
+from api.services import session_cache as session_cache_module
+from api.services.cancellation import CancelToken, RequestCancelled, bound
+from api.services.session_cache import SessionCache
+
+
+class FakeSession:
+    """Stands in for a fastf1 Session; load() blocks until the upstream gate opens."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.event = {"RoundNumber": 5}
+        self.name = "Race"
+        self.api_path = "/static/2024/monza/race/"
+
+    def load(self, **flags):
+        self.upstream.gate.wait()
+        self.upstream.loads.append(flags)
+        self.laps = self.upstream.laps
+
+
+class Upstream:
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.loads = []
+        self.laps = pd.DataFrame({"DriverNumber": ["1", "1", "44"], "LapNumber": [2, 1, 1]})
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = Upstream()
+    monkeypatch.setattr(cancellation, "CANCEL_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(session_cache_module.fastf1, "get_session", lambda *args: FakeSession(upstream))
+    monkeypatch.setattr(session_cache_module.event_resolver, "round_number", lambda year, event: 5)
+    monkeypatch.setattr(session_cache_module.worker_pool, "processes", 0)
+    return upstream
+
+
+@pytest.fixture
+def cache():
+    return SessionCache(max_sessions=2)
+
+
+def _request(cache, token=None, outcomes=None, **flags):
+    """Run get_session in a thread as a request holding token; its outcome lands in outcomes."""
+    outcomes = outcomes if outcomes is not None else []
+
+    def run():
+        try:
+            with bound(token or CancelToken()):
+                outcomes.append(cache.get_session(2024, "Monza", "R", **flags))
+        except RequestCancelled as e:
+            outcomes.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcomes
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_load(cache, upstream):
+    upstream.gate.clear()
+    outcomes = []
+    threads = [_request(cache, outcomes=outcomes)[0] for _ in range(3)]
+    _wait_for(lambda: len(cache._waiters.get((2024, 5, "Race"), ())) == 3)
+    upstream.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(upstream.loads) == 1
+    assert len({id(session) for session in outcomes}) == 1
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["hits"]) == (1, 2)
+    assert not cache._waiters
+
+
+def test_loaded_session_is_found_under_any_spelling(cache, upstream):
+    session = cache.get_session(2024, "Monza", "R")
+    assert cache.get_session(2024, "monza ", "r") is session
+    assert cache.is_loaded(2024, "Monza", "R")
+    assert len(upstream.loads) == 1
+
+
+def test_more_data_loads_the_union_into_a_new_object(cache, upstream):
+    first = cache.get_session(2024, "Monza", "R", telemetry=False)
+    cache.derived(first, "gaps", lambda: "table")
+    second = cache.get_session(2024, "Monza", "R", weather=False)
+
+    assert second is not first
+    assert upstream.loads[-1] == {"laps": True, "telemetry": True, "weather": True, "messages": True}
+    assert cache.derived(second, "gaps", lambda: "recomputed") == "table"
+    assert cache.get_stats()["upgrades"] == 1
+
+
+def test_session_without_laps_is_returned_but_not_cached(cache, upstream):
+    upstream.laps = pd.DataFrame({"DriverNumber": [], "LapNumber": []})
+    cache.get_session(2024, "Monza", "R")
+    cache.get_session(2024, "Monza", "R")
+    assert len(upstream.loads) == 2
+    assert cache.get_stats()["incomplete"] == 2
+
+
+def test_cancelled_waiter_leaves_while_the_load_goes_on(cache, upstream):
+    upstream.gate.clear()
+    loading, loaded = _request(cache)
+    _wait_for(lambda: cache._waiters)
+    token = CancelToken()
+    waiting, left = _request(cache, token)
+    _wait_for(lambda: len(cache._waiters[(2024, 5, "Race")]) == 2)
+
+    token.cancel()
+    waiting.join(timeout=2)
+    assert isinstance(left[0], RequestCancelled) and left[0].stage == "load"
+
+    upstream.gate.set()
+    loading.join()
+    assert not isinstance(loaded[0], RequestCancelled)
+    assert cache.is_loaded(2024, "Monza", "R")
+    assert cache.get_stats()["abandoned"] == 1
+
+
+def test_load_is_given_up_only_once_every_waiter_is_gone(cache, upstream):
+    # Every load slot is taken, so the first caller waits for one holding the session's lock
+    cache._load_slots = threading.BoundedSemaphore(1)
+    cache._load_slots.acquire()
+    first_token, second_token = CancelToken(), CancelToken()
+    first, first_outcome = _request(cache, first_token)
+    _wait_for(lambda: cache._waiters)
+    second, second_outcome = _request(cache, second_token)
+    _wait_for(lambda: len(cache._waiters[(2024, 5, "Race")]) == 2)
+
+    # The second caller still wants the session: the load carries on
+    first_token.cancel()
+    time.sleep(0.2)
+    assert first.is_alive() and not first_outcome
+
+    second_token.cancel()
+    first.join(timeout=2)
+    second.join(timeout=2)
+    assert [outcome.stage for outcome in first_outcome + second_outcome] == ["load", "load"]
+    assert not upstream.loads
+    assert not cache._waiters
+    assert cache.get_stats()["abandoned"] == 2
+
+    # Nothing is left held: the next caller loads the session
+    cache._load_slots.release()
+    assert cache.get_session(2024, "Monza", "R") is not None
+    assert len(upstream.loads) == 1
+
+
+def test_abandoned_load_still_serves_a_remaining_waiter(cache, upstream):
+    cache._load_slots = threading.BoundedSemaphore(1)
+    cache._load_slots.acquire()
+    first_token = CancelToken()
+    first, first_outcome = _request(cache, first_token)
+    _wait_for(lambda: cache._waiters)
+    second, second_outcome = _request(cache)
+    _wait_for(lambda: len(cache._waiters[(2024, 5, "Race")]) == 2)
+
+    first_token.cancel()
+    cache._load_slots.release()
+    first.join(timeout=2)
+    second.join(timeout=2)
+    assert len(upstream.loads) == 1
+    assert first_outcome[0] is second_outcome[0]
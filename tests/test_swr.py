@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+
+from api.services import swr
+from api.services.swr import SWRCache
+
+
+@pytest.fixture
+def cache():
+    cache = SWRCache("test")
+    yield cache
+    swr.swr_caches.remove(cache)
+
+
+def _settle(cache: SWRCache, timeout: float = 5.0):
+    """Wait for background refreshes to finish."""
+    deadline = time.monotonic() + timeout
+    while cache._inflight:
+        assert time.monotonic() < deadline, "refresh did not finish"
+        time.sleep(0.01)
+
+
+class Upstream:
+    """Loader returning 1, 2, 3, ...; fails while failing is set, blocks while gate is cleared."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self):
+        self.gate.wait()
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("upstream down")
+        return self.calls
+
+
+def test_fresh_value_is_served_without_calling_upstream(cache):
+    upstream = Upstream()
+    assert cache.get("key", upstream, ttl=60) == 1
+    assert cache.get("key", upstream, ttl=60) == 1
+    assert upstream.calls == 1
+    assert cache.get_stats()["fresh"] == 1
+
+
+def test_stale_value_is_served_while_one_refresh_runs(cache):
+    upstream = Upstream()
+    cache.get("key", upstream, ttl=60)
+
+    upstream.gate.clear()
+    started = time.monotonic()
+    assert [cache.get("key", upstream, ttl=0) for _ in range(5)] == [1] * 5
+    assert time.monotonic() - started < 0.5
+    assert cache.get_stats()["refreshing"] == 1
+
+    upstream.gate.set()
+    _settle(cache)
+    assert cache.get("key", upstream, ttl=60) == 2
+    assert upstream.calls == 2
+    assert cache.get_stats()["refreshes"] == 1
+
+
+def test_failed_refresh_keeps_the_stale_value_and_backs_off(cache, monkeypatch):
+    monkeypatch.setattr(swr, "RETRY_BACKOFF", 0.2)
+    upstream = Upstream()
+    cache.get("key", upstream, ttl=60)
+
+    upstream.failing = True
+    assert cache.get("key", upstream, ttl=0) == 1
+    _settle(cache)
+    stats = cache.get_stats()
+    assert stats["refresh_errors"] == 1
+    assert stats["keys"]["key"]["last_refresh_error"] == "upstream down"
+    assert stats["keys"]["key"]["failed_refreshes"] == 1
+
+    # Within the backoff the stale value is served without asking upstream again
+    assert cache.get("key", upstream, ttl=0) == 1
+    _settle(cache)
+    assert upstream.calls == 2
+
+    time.sleep(0.25)
+    upstream.failing = False
+    assert cache.get("key", upstream, ttl=0) == 1
+    _settle(cache)
+    assert cache.get("key", upstream, ttl=60) == 3
+    assert cache.get_stats()["keys"]["key"]["last_refresh_error"] is None
+
+
+def test_concurrent_first_loads_share_one_call(cache):
+    upstream = Upstream()
+    upstream.gate.clear()
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(cache.get("key", upstream, ttl=60))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    upstream.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert values == [1] * 4
+    assert upstream.calls == 1
+
+
+def test_failed_first_load_reaches_every_caller(cache):
+    upstream = Upstream()
+    upstream.failing = True
+    upstream.gate.clear()
+    errors = []
+
+    def load():
+        try:
+            cache.get("key", upstream, ttl=60)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    upstream.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert upstream.calls == 1
+    # Nothing was stored; the next caller tries again
+    upstream.failing = False
+    assert cache.get("key", upstream, ttl=60) == 2
+
+
+def test_oldest_entries_are_evicted():
+    cache = SWRCache("bounded", max_entries=2)
+    try:
+        for key in ("a", "b", "c"):
+            cache.get(key, lambda: key, ttl=60)
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get("a", lambda: "reloaded", ttl=60) == "reloaded"
+    finally:
+        swr.swr_caches.remove(cache)
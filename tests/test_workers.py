@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from api.services import workers
+from api.services.cancellation import RequestCancelled
+from api.services.workers import WorkerPool, WorkerPoolBusy
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(workers, "CANCEL_POLL_SECONDS", 0.05)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(processes=1, queue_size=1, queue_timeout=0.2, timeout=30)
+    yield pool
+    pool.stop()
+
+
+def test_job_slower_than_the_poll_interval_returns_its_result(pool):
+    # Several polls time out while the job runs; none of them may end the wait
+    assert pool.run(time.sleep, 0.5, abandoned=lambda: False) is None
+    stats = pool.get_stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 0
+
+
+def test_abandoned_caller_gets_request_cancelled(pool):
+    pool.run(time.sleep, 0, abandoned=lambda: False)  # start the worker process
+    deadline = time.monotonic() + 0.2
+    with pytest.raises(RequestCancelled) as raised:
+        pool.run(time.sleep, 1.0, abandoned=lambda: time.monotonic() > deadline)
+    assert raised.value.stage == "load"
+    assert pool.get_stats()["abandoned"] == 1
+
+
+def test_job_past_the_timeout_raises():
+    pool = WorkerPool(processes=1, queue_size=1)
+    try:
+        pool.run(time.sleep, 0, abandoned=lambda: False)  # start the worker process
+        pool.timeout = 0.3
+        with pytest.raises(FutureTimeout):
+            pool.run(time.sleep, 2.0, abandoned=lambda: False)
+        assert pool.get_stats()["failed"] == 1
+    finally:
+        pool.stop()
+
+
+def test_abandoned_job_keeps_its_slot_until_it_ends(pool):
+    pool.run(time.sleep, 0, abandoned=lambda: False)
+    with pytest.raises(RequestCancelled):
+        pool.run(time.sleep, 0.6, abandoned=lambda: True)
+    # The job is still running in the worker, so the only slot is taken
+    with pytest.raises(WorkerPoolBusy):
+        pool.run(time.sleep, 0)
+    time.sleep(0.6)
+    assert pool.run(time.sleep, 0) is None
+
+
+def test_without_processes_jobs_run_in_the_calling_thread():
+    pool = WorkerPool(processes=0)
+    assert pool.run(sorted, [3, 1, 2]) == [1, 2, 3]
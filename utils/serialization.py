@@ -4,9 +4,12 @@ Optimized for Swift app consumption.
 """
 import pandas as pd
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 
+# Rows serialized between calls of dataframe_to_dict_list's check
+CHECKPOINT_ROWS = 5000
+
 
 def datetime_to_iso8601(dt: Any) -> Optional[str]:
     """Convert datetime to ISO 8601 format string (Swift-compatible)."""
@@ -38,13 +41,17 @@ def clean_numeric(value: Any) -> Optional[float]:
         return None
 
 
-def dataframe_to_dict_list(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def dataframe_to_dict_list(df: pd.DataFrame, check: Optional[Callable[[], None]] = None) -> List[Dict[str, Any]]:
     """
     Convert Pandas DataFrame to list of dictionaries.
     Handles datetime serialization and NaN values for Swift compatibility.
+    check, if given, is called before and every CHECKPOINT_ROWS rows and may
+    raise to stop early (routes pass a cancellation checkpoint).
     """
     if df is None or df.empty:
         return []
+    if check is not None:
+        check()
     
     # Replace NaN with None for JSON serialization
     df = df.replace({np.nan: None})
@@ -54,7 +61,9 @@ def dataframe_to_dict_list(df: pd.DataFrame) -> List[Dict[str, Any]]:
     
     # Process each record to handle datetime and numeric types
     result = []
-    for record in records:
+    for i, record in enumerate(records):
+        if check is not None and i and i % CHECKPOINT_ROWS == 0:
+            check()
         processed = {}
         for key, value in record.items():
             # Handle datetime columns